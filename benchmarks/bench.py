@@ -0,0 +1,353 @@
+"""
+    Benchmarks of the game's hot paths: Game.move, Game.isGameOver,
+    Game.createNewPrey, Arena.step, EventManager.Post fan-out, Gui.notify
+    (with a stub canvas, so no display is needed), FrameRasterizer.render
+    and a whole tick going from the model to the canvas, compared with the
+    queue architecture of archive/project_part1.py, and how long app.py
+    takes to play a short game with the null renderer, which must not
+    import tkinter.
+
+    Usage:
+        python benchmarks/bench.py --output results.json
+        python benchmarks/bench.py --output new.json --compare results.json
+    With --compare, benchmarks whose median got more than --threshold
+    slower are reported and the exit status is 1.
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import queue
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "game"))
+
+from arena import Arena
+from event_manager import *
+from model import Game
+from snake_body import RunLengthSnakeBody, SnakeBody
+
+
+SNAKE_LENGTHS = (5, 100, 1000, 10000)
+LISTENER_COUNTS = (1, 10, 100)
+ARENA_SIZES = (10, 100, 500)
+
+
+class StubRoot():
+    """
+        Stands in for tkinter.Tk, doing nothing.
+    """
+    def bind(self, *args): pass
+    def after(self, *args): pass
+    def after_idle(self, *args): pass
+    def event_generate(self, *args, **kwargs): pass
+    def destroy(self): pass
+
+
+class StubCanvas():
+    """
+        Stands in for tkinter.Canvas. It keeps the arguments of every item
+        so that the cost of building them is still paid.
+    """
+    def __init__(self, *args, **kwargs):
+        self.items = {}
+        self.nextItem = 0
+
+    def pack(self): pass
+
+    def create(self, *args, **kwargs):
+        self.nextItem += 1
+        self.items[self.nextItem] = args
+        return self.nextItem
+
+    create_line = create_rectangle = create_text = create_window = create
+
+    def coords(self, item, *points):
+        self.items[item] = points
+
+    def itemconfigure(self, item, **options):
+        self.items[item] = options
+
+    def delete(self, item):
+        del self.items[item]
+
+    def tag_raise(self, *args): pass
+
+
+def makeGui(game: Game, eventManager: EventManager, renderMode: str = "incremental") -> "view.Gui":
+    """
+        Builds a Gui on stub Tk widgets. view, and tkinter with it, is only
+        imported here, so the benchmarks that do not draw run without Tk.
+    """
+    import view
+
+    tk, canvas = view.Tk, view.Canvas
+    view.Tk, view.Canvas = StubRoot, StubCanvas
+    try:
+        return view.Gui(game, eventManager, 500, 300, "green", "yellow", 15, renderMode=renderMode)
+    finally:
+        view.Tk, view.Canvas = tk, canvas
+
+
+def makeGame(length: int, moves: int, eventManager: EventManager = None, bodyModel: type = SnakeBody) -> Game:
+    """
+        Returns a game whose snake is a straight line of the given length,
+        heading left, on a board wide enough to make the given number of
+        moves without hitting a wall or the prey.
+    """
+    headX = 5 + 10 * moves
+    width = headX + 10 * length + 10
+    game = Game(eventManager or EventManager(), width, 300, seed=1, bodyModel=bodyModel)
+    game.setSnakeCoordinates((headX + 10 * i, 150) for i in reversed(range(length)))
+    game.preyCoordinates = (0, 280, 10, 290)
+    game.publishFrame()
+    return game
+
+
+def measure(operation, iterations: int, setup=None) -> dict:
+    """
+        Times operation() one call at a time and returns latency percentiles
+        (microseconds) and throughput (operations per second).
+    """
+    clock = time.perf_counter_ns
+    samples = []
+    for _ in range(iterations):
+        if setup is not None:
+            setup()
+        start = clock()
+        operation()
+        samples.append(clock() - start)
+    return summarize(samples)
+
+
+def summarize(samples: list) -> dict:
+    """
+        Returns the latency percentiles (microseconds) and throughput
+        (operations per second) of a list of timings in nanoseconds.
+    """
+    iterations = len(samples)
+    samples = sorted(samples)
+    total = sum(samples)
+    percentile = lambda p: samples[min(len(samples) - 1, int(p / 100 * len(samples)))] / 1000
+    return {
+        "iterations": iterations,
+        "mean_us": total / iterations / 1000,
+        "p50_us": percentile(50),
+        "p90_us": percentile(90),
+        "p99_us": percentile(99),
+        "ops_per_sec": iterations / (total / 1e9) if total else float("inf")}
+
+
+def benchModel(iterations: int) -> dict:
+    results = {}
+    for length in SNAKE_LENGTHS:
+        game = makeGame(length, iterations)
+        results[f"Game.move/length={length}"] = measure(game.move, iterations)
+        freePoint = (game.snakeCoordinates[-1][0] - 10, 150)
+        results[f"Game.isGameOver/length={length}"] = measure(lambda: game.isGameOver(freePoint), iterations)
+        results[f"Game.createNewPrey/length={length}"] = measure(game.createNewPrey, iterations)
+        game = makeGame(length, iterations, bodyModel=RunLengthSnakeBody)
+        results[f"Game.move[run length]/length={length}"] = measure(game.move, iterations)
+    return results
+
+
+def benchArena(iterations: int) -> dict:
+    from tournament import greedyPolicy
+
+    results = {}
+    for count in ARENA_SIZES:
+        arena = Arena(EventManager(), 2000, 2000, preyCount=8, seed=1)
+        def refill():
+            while len(arena.alive) < count: # keep the number of snakes steady
+                arena.addSnake(policy=greedyPolicy)
+        refill()
+        arena.start()
+        results[f"Arena.step/snakes={count}"] = measure(arena.step, iterations, setup=refill)
+    return results
+
+
+def benchEventManager(iterations: int) -> dict:
+    class Listener():
+        def notify(self, event): pass
+
+    results = {}
+    for count in LISTENER_COUNTS:
+        eventManager = EventManager()
+        for _ in range(count):
+            eventManager.RegisterListener(Listener())
+        results[f"EventManager.Post/listeners={count}"] = measure(lambda: eventManager.Post(TICK_EVENT), iterations)
+        # only one of the listeners wants ticks
+        eventManager = EventManager()
+        for _ in range(count - 1):
+            eventManager.Subscribe(GameOverEvent, Listener().notify)
+        eventManager.Subscribe(TickEvent, Listener().notify)
+        results[f"EventManager.Post/subscribers={count},interested=1"] = measure(lambda: eventManager.Post(TICK_EVENT), iterations)
+    return results
+
+
+def benchGui(iterations: int) -> dict:
+    results = {}
+    for renderMode in ("full", "incremental"):
+        for length in SNAKE_LENGTHS:
+            eventManager = EventManager()
+            game = makeGame(length, iterations, eventManager)
+            gui = makeGui(game, eventManager, renderMode)
+            gui.notify(TICK_EVENT) # draw the whole snake once
+            def move():
+                game.move()
+                game.publishFrame()
+            results[f"Gui.notify[{renderMode}]/length={length}"] = measure(lambda: gui.notify(TICK_EVENT), iterations, setup=move)
+            results[f"SnakeRenderer.interpolate[{renderMode}]/length={length}"] = measure(lambda: gui.snakeRenderer.interpolate(0.5), iterations)
+    return results
+
+
+def benchRasterizer(iterations: int) -> dict:
+    from rasterizer import FrameRasterizer
+
+    results = {}
+    rasterizer = FrameRasterizer(500, 300, "green", "yellow", 15, batchSize=1)
+    for length in SNAKE_LENGTHS[:3]: # the longest snakes do not fit on a 500x300 board
+        # winding through the frame row by row, from the top
+        rows = [[(5 + 10 * i, 10 * row) for i in range(50)] for row in range(30)]
+        snake = [point for row, points in enumerate(rows) for point in (points if row % 2 else reversed(points))][:length]
+        states = [(snake, (200, 280, 210, 290), 10)]
+        results[f"FrameRasterizer.render/length={length}"] = measure(lambda: rasterizer.render(states), iterations)
+    return results
+
+
+def loadArchive():
+    """
+        Imports archive/project_part1.py, which expects its constants to be
+        defined by its __main__ block.
+    """
+    spec = importlib.util.spec_from_file_location("project_part1", os.path.join(ROOT, "archive", "project_part1.py"))
+    archive = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(archive)
+    archive.WINDOW_WIDTH, archive.WINDOW_HEIGHT = 500, 300
+    return archive
+
+
+def benchArchitectures(iterations: int) -> dict:
+    """
+        Times one whole tick, from moving the snake to updating the canvas,
+        in the event manager architecture of game/ and in the queue
+        architecture of archive/project_part1.py.
+    """
+    results = {}
+    archive = loadArchive()
+    for length in SNAKE_LENGTHS:
+        # archive: Game.move, a "move" task on the queue, QueueHandler drains it
+        gameQueue = queue.Queue()
+        game = archive.Game(gameQueue)
+        newGame = makeGame(length, iterations)
+        game.snakeCoordinates = list(newGame.snakeCoordinates)
+        game.preyCoordinates = (5, 285)
+        archive.WINDOW_WIDTH = newGame.WINDOW_WIDTH
+        archive.gui = gui = type("StubGui", (), {})()
+        gui.root, gui.canvas, gui.snakeIcon, gui.preyIcon, gui.score = StubRoot(), StubCanvas(), 1, 2, 3
+        handler = archive.QueueHandler(gameQueue, gui)
+        def archiveTick():
+            game.move()
+            gameQueue.put_nowait({"move": game.snakeCoordinates})
+            handler.queueHandler()
+        results[f"tick[archive queue]/length={length}"] = measure(archiveTick, iterations)
+
+        # game/: Game.tick posts to the bridge, which the Tk thread drains into Gui.notify
+        for renderMode in ("full", "incremental"):
+            eventManager = EventManager()
+            game = makeGame(length, iterations, eventManager)
+            gui = makeGui(game, eventManager, renderMode)
+            gui.notify(TICK_EVENT)
+            def tick():
+                game.tick()
+                gui.bridge.drain()
+            results[f"tick[event manager, {renderMode}]/length={length}"] = measure(tick, iterations)
+    return results
+
+
+STARTUP_SCRIPT = """
+import runpy, sys, time
+start = time.perf_counter()
+sys.path.insert(0, {gameDir!r})
+sys.argv = ["app.py", "--renderer", "null", "--tick-rate", "1e6", "--seed", "1"]
+runpy.run_path({app!r}, run_name="__main__")
+print("STARTUP", time.perf_counter() - start, "tkinter" in sys.modules)
+"""
+
+
+def benchStartup(iterations: int) -> dict:
+    """
+        Runs app.py with the null renderer in fresh interpreters (the game
+        runs into the wall within a few ticks) and times it, from the
+        interpreter being ready to the game being over. Raises if tkinter
+        was imported.
+    """
+    gameDir = os.path.join(ROOT, "game")
+    script = STARTUP_SCRIPT.format(gameDir=gameDir, app=os.path.join(gameDir, "app.py"))
+    samples = []
+    for _ in range(max(1, iterations // 200)):
+        output = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True).stdout
+        _, elapsed, tkinterLoaded = output.splitlines()[-1].split()
+        if tkinterLoaded == "True":
+            raise RuntimeError("the null renderer imported tkinter")
+        samples.append(int(float(elapsed) * 1e9))
+    return {"startup[null renderer]": summarize(samples)}
+
+
+def gitCommit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return ""
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """
+        Returns the benchmarks whose median latency grew by more than
+        threshold (a fraction) compared to the baseline.
+    """
+    regressions = []
+    for name, result in results.items():
+        old = baseline.get(name)
+        if old and result["p50_us"] > old["p50_us"] * (1 + threshold):
+            regressions.append((name, old["p50_us"], result["p50_us"]))
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the snake game")
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--output", metavar="PATH", help="write the results to a JSON file")
+    parser.add_argument("--compare", metavar="PATH", help="flag regressions against an earlier JSON file")
+    parser.add_argument("--threshold", type=float, default=0.2, help="slowdown of the median that counts as a regression")
+    args = parser.parse_args()
+
+    results = {}
+    for bench in (benchModel, benchArena, benchEventManager, benchGui, benchRasterizer, benchArchitectures, benchStartup):
+        results.update(bench(args.iterations))
+
+    print(f"{'benchmark':60} {'p50 us':>9} {'p99 us':>9} {'ops/s':>12}")
+    for name, result in results.items():
+        print(f"{name:60} {result['p50_us']:9.2f} {result['p99_us']:9.2f} {result['ops_per_sec']:12.0f}")
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump({
+                "commit": gitCommit(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "results": results}, file, indent=2)
+
+    if args.compare:
+        with open(args.compare) as file:
+            regressions = compare(results, json.load(file)["results"], args.threshold)
+        for name, old, new in regressions:
+            print(f"REGRESSION {name}: p50 {old:.2f} us -> {new:.2f} us")
+        if regressions:
+            sys.exit(1)
@@ -1,22 +1,70 @@
-import threading
+import argparse
 
+from autopilot import Autopilot
+from display import BACKGROUND_COLOUR, ICON_COLOUR, SNAKE_ICON_WIDTH
 from event_manager import EventManager
-from model import Game
-from view import Gui
+from model import DEFAULT_CONFIG, Game
+from profiling import MetricsExporter, Profiler
+from renderers import BACKENDS, loadRenderer
+from replay import ReplayPlayer, ReplayRecorder
+from scheduler import FixedTimestepScheduler
 
 
-WINDOW_WIDTH = 500           
-WINDOW_HEIGHT = 300 
-SNAKE_ICON_WIDTH = 15  
-BACKGROUND_COLOUR = "green" 
-ICON_COLOUR = "yellow" 
+FRAME_RATE = 60 # frames drawn per second
 
 
 if __name__ == "__main__":
-    eventManager = EventManager()
-    game = Game(eventManager, WINDOW_WIDTH, WINDOW_HEIGHT)
-    gui = Gui(game, eventManager, WINDOW_WIDTH, WINDOW_HEIGHT, BACKGROUND_COLOUR, ICON_COLOUR, SNAKE_ICON_WIDTH)
+    parser = argparse.ArgumentParser(description="Tkinter Snake")
+    parser.add_argument("--tick-rate", type=float, help="snake updates per second (default: 1 / SPEED)")
+    parser.add_argument("--frame-rate", type=float, default=FRAME_RATE, help="frames drawn per second, 0 to draw only on ticks")
+    parser.add_argument("--renderer", choices=sorted(BACKENDS), default="tk", help="how the game is shown")
+    parser.add_argument("--headless", action="store_true", help="run the game without a window (same as --renderer null)")
+    parser.add_argument("--seed", type=int, help="seed used to place the prey")
+    parser.add_argument("--set", action="append", default=[], metavar="NAME=VALUE",
+        help="change a gameplay constant (SPEED, COLLISION_PROXIMITY, THRESHOLD, WINDOW_WIDTH, WINDOW_HEIGHT)")
+    parser.add_argument("--record", metavar="PATH", help="record the game to a replay file")
+    parser.add_argument("--replay", metavar="PATH", help="watch a replay file instead of playing")
+    parser.add_argument("--autopilot", action="store_true", help="let the bot play instead of the arrow keys")
+    parser.add_argument("--autopilot-budget", type=float, default=0.002, help="seconds of CPU the bot may use per tick")
+    parser.add_argument("--profile", action="store_true", help="time the hot paths and show them on the canvas")
+    parser.add_argument("--metrics-file", metavar="PATH", help="append profiling metrics to a file (implies --profile)")
+    parser.add_argument("--spectator-port", type=int, metavar="PORT", help="broadcast the game to spectators on this TCP port")
+    parser.add_argument("--spectator-unix", metavar="PATH", help="broadcast the game to spectators on this Unix socket")
+    args = parser.parse_args()
 
-    threading.Thread(target = game.superloop, daemon=True).start()
+    try:
+        config = DEFAULT_CONFIG.override(args.set)
+    except ValueError as error:
+        parser.error(str(error))
+    eventManager = EventManager()
+    scheduler = FixedTimestepScheduler(args.tick_rate or 1 / config.SPEED)
+    if args.replay:
+        player = ReplayPlayer(open(args.replay, "rb"), eventManager)
+        game = player.game
+        run = player.play
+    else:
+        player = None
+        game = Game.fromConfig(eventManager, config, args.seed)
+        run = game.superloop
+    if args.record:
+        ReplayRecorder(game, eventManager, open(args.record, "wb"))
+    if args.autopilot:
+        Autopilot(game, args.autopilot_budget).drive(eventManager)
+    profiler = Profiler() if args.profile or args.metrics_file else None
+    if profiler:
+        profiler.attach(game, eventManager)
+    if args.metrics_file:
+        MetricsExporter(profiler, args.metrics_file, extra=lambda: {"snakeLength": len(game.snakeCoordinates)}).start()
+    if args.spectator_port or args.spectator_unix:
+        from spectator import SpectatorServer
+        SpectatorServer(game, eventManager).start(port = args.spectator_port, unixPath = args.spectator_unix)
 
-    gui.root.mainloop()
+    renderer = loadRenderer("null" if args.headless else args.renderer)(game, eventManager,
+        BACKGROUND_COLOUR = BACKGROUND_COLOUR, ICON_COLOUR = ICON_COLOUR, SNAKE_ICON_WIDTH = SNAKE_ICON_WIDTH,
+        bindKeys = player is None and not args.autopilot, frameRate = args.frame_rate, profiler = profiler)
+    renderer.run(run, scheduler)
+    print(f"{'Game over' if not game.gameNotOver else 'Stopped'}, score: {game.score}, late ticks: {scheduler.lateness.summary()}")
+    print(f"Key press to move latency: {game.inputLatency.summary()}, dropped key presses: {game.droppedInputs}")
+    summary = renderer.summary()
+    if summary:
+        print(summary)
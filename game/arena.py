@@ -0,0 +1,231 @@
+"""
+    Arena mode: many snakes, steered by players or bots, share one board
+    and compete for several prey.
+
+    Usage:
+        python arena.py --snakes 200 --prey 8 --width 2000 --height 2000
+"""
+
+import argparse
+import random
+import time
+from functools import partial
+from typing import Callable, Dict, List, Optional, Tuple
+
+from event_manager import *
+from free_cells import FreeCellIndex
+from model import DIRECTION_STEPS, DIRECTIONS, STEP, X_OFFSET, Y_OFFSET, Game, GameConfig, KeyPress, configForBoard
+from rng import SplitMix64
+from scheduler import FixedTimestepScheduler
+from snake_body import SnakeBody
+
+
+Policy = Callable[[Game], Optional[str]]
+
+
+class Arena():
+    """
+        This class runs many snakes on one board. Every snake is a Game
+        with its own EventManager, which receives that snake's direction
+        change, score, game over and tick events; the arena's EventManager
+        receives a TickEvent per step and a CreateNewPreyEvent per prey.
+
+        All the snake bodies share one occupancy dictionary (point -> number
+        of segments on it) and one FreeCellIndex, both updated as heads are
+        added and tails removed, so checking a new head against every other
+        snake is a single lookup and a step costs O(number of snakes).
+        The snakes move at the same time: a head is checked against the
+        board as it was before the step (tails included, as in
+        Game.isGameOver), and heads entering the same cell all die.
+        Dead snakes are taken off the board.
+        Each snake's preyCoordinates is kept on the prey closest to its
+        head, so policies written for Game (such as tournament.greedyPolicy)
+        can steer arena snakes.
+    """
+    START_LENGTH = 5
+    PLACEMENT_TRIES = 100 # random spots tried for a new snake
+
+    def __init__(self, eventManager: EventManager, WINDOW_WIDTH: int, WINDOW_HEIGHT: int, preyCount: int = 3, seed: int = None,
+        config: GameConfig = None) -> None:
+        """
+            config holds the gameplay constants of every snake, as in Game.
+        """
+        self.eventManager = eventManager
+        self.config = configForBoard(config, WINDOW_WIDTH, WINDOW_HEIGHT)
+        self.WINDOW_WIDTH = WINDOW_WIDTH
+        self.WINDOW_HEIGHT = WINDOW_HEIGHT
+        self.preyCount = preyCount
+        self.seed = random.getrandbits(63) if seed is None else seed
+        self.random = SplitMix64(self.seed) # used to place the snakes and the prey
+        self.freeCells = FreeCellIndex.forGrid(WINDOW_WIDTH, WINDOW_HEIGHT, X_OFFSET, Y_OFFSET, STEP, self.config.THRESHOLD)
+        self.occupancy: Dict[Tuple[int, int], int] = dict() # segments of all the snakes on each point
+        self.prey: Dict[Tuple[int, int], Tuple[int, int, int, int]] = dict() # prey centre -> rectangle
+        self.snakes: List[Game] = [] # every snake that joined, in order
+        self.alive: List[Game] = [] # the snakes still playing
+        self.policies: Dict[Game, Policy] = dict() # bot controlled snakes
+        self.tickCount = 0
+
+    def addSnake(self, eventManager: EventManager = None, policy: Policy = None, length: int = START_LENGTH) -> Game:
+        """
+            Puts a new straight snake on a random free spot and returns its
+            Game. Players steer it with its whenAnArrowKeyIsPressed method;
+            if a policy is given, it is asked for a direction before every step.
+        """
+        for _ in range(self.PLACEMENT_TRIES):
+            head = self.freeCells.sample(self.random)
+            if head is None:
+                break
+            code = self.random.randint(0, len(DIRECTIONS) - 1)
+            dx, dy = DIRECTION_STEPS[code]
+            x, y = head
+            coordinates = [(x - i * dx, y - i * dy) for i in reversed(range(length))] # from tail to head
+            if all(self.isInside(point) and point not in self.occupancy and point not in self.prey for point in coordinates):
+                break
+        else:
+            head = None
+        if head is None:
+            raise ValueError("no room for another snake")
+
+        snake = Game(eventManager or EventManager(), self.WINDOW_WIDTH, self.WINDOW_HEIGHT, self.seed,
+            bodyModel=partial(SnakeBody, occupancy=self.occupancy), startCoordinates=coordinates, freeCells=self.freeCells,
+            config=self.config)
+        snake.direction = snake.appliedDirection = DIRECTIONS[code]
+        self.snakes.append(snake)
+        self.alive.append(snake)
+        if policy is not None:
+            self.policies[snake] = policy
+        self.aimAtPrey(snake)
+        return snake
+
+    def isInside(self, point: Tuple[int, int]) -> bool:
+        x, y = point
+        return 0 <= x <= self.WINDOW_WIDTH and 0 <= y <= self.WINDOW_HEIGHT
+
+    def createNewPrey(self) -> None:
+        """
+            Places prey on random free cells until there are preyCount of
+            them, or no cell is free. The cells under the prey are marked
+            as occupied so that neither prey nor snakes are put on them.
+        """
+        while len(self.prey) < self.preyCount:
+            cell = self.freeCells.sample(self.random)
+            if cell is None:
+                break
+            x, y = cell
+            self.freeCells.occupy(cell)
+            self.prey[cell] = (x - 5, y - 5, x + 5, y + 5)
+            self.eventManager.Post(CREATE_NEW_PREY_EVENT)
+
+    def aimAtPrey(self, snake: Game) -> None:
+        """
+            Sets the snake's preyCoordinates to the prey closest to its head.
+        """
+        if self.prey:
+            x, y = snake.snakeCoordinates[-1]
+            closest = min(self.prey, key=lambda cell: abs(cell[0] - x) + abs(cell[1] - y))
+            snake.preyCoordinates = self.prey[closest]
+
+    def step(self) -> None:
+        """
+            Moves every snake still playing by one cell.
+        """
+        for snake, policy in self.policies.items():
+            if snake.gameNotOver:
+                direction = policy(snake)
+                if direction is not None:
+                    snake.whenAnArrowKeyIsPressed(KeyPress(direction))
+
+        # every snake picks its new head
+        moves = []
+        heads: Dict[Tuple[int, int], int] = dict()
+        for snake in self.alive:
+            snake.applyNextInput()
+            if snake.direction != snake.appliedDirection:
+                snake.appliedDirection = snake.direction
+                snake.eventManager.Post(DIRECTION_CHANGE_EVENT)
+            head = snake.calculateNewCoordinates()
+            moves.append((snake, head))
+            heads[head] = heads.get(head, 0) + 1
+
+        # check the heads against the board before anyone moves
+        occupancy, isInside = self.occupancy, self.isInside
+        survivors, dead = [], []
+        for snake, head in moves:
+            if not isInside(head) or head in occupancy or heads[head] > 1:
+                dead.append(snake)
+            else:
+                survivors.append((snake, head))
+
+        eaten = False
+        for snake, head in survivors:
+            snake.snakeCoordinates.append(head)
+            if self.prey.pop(head, None) is not None:
+                eaten = True
+                snake.score += 1
+                snake.eventManager.Post(UPDATE_SCORE_EVENT)
+            else:
+                snake.snakeCoordinates.popTail()
+            snake.tickCount += 1
+
+        for snake in dead:
+            snake.gameNotOver = False
+            body = snake.snakeCoordinates
+            while len(body):
+                body.popTail()
+            snake.eventManager.Post(GAME_OVER_EVENT)
+        if dead:
+            self.alive = [snake for snake in self.alive if snake.gameNotOver]
+
+        if eaten:
+            self.createNewPrey()
+        for snake in self.alive:
+            self.aimAtPrey(snake)
+        self.tickCount += 1
+        for snake in self.alive:
+            snake.eventManager.Post(TICK_EVENT)
+        self.eventManager.Post(TICK_EVENT)
+
+    def start(self) -> None:
+        """
+            Places the first prey, once the snakes have joined.
+        """
+        self.createNewPrey()
+        for snake in self.alive:
+            self.aimAtPrey(snake)
+
+    def run(self, scheduler: FixedTimestepScheduler = None) -> None:
+        """
+            Starts the arena and steps it until every snake is dead,
+            as fast as possible or at the rate of the given scheduler.
+        """
+        self.start()
+        if scheduler is None:
+            while self.alive:
+                self.step()
+        else:
+            scheduler.run(self.step, lambda: bool(self.alive))
+
+
+if __name__ == "__main__":
+    from tournament import greedyPolicy
+
+    parser = argparse.ArgumentParser(description="Run an arena of bots headless")
+    parser.add_argument("--snakes", type=int, default=200)
+    parser.add_argument("--prey", type=int, default=8)
+    parser.add_argument("--width", type=int, default=2000)
+    parser.add_argument("--height", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-ticks", type=int, default=10000)
+    args = parser.parse_args()
+
+    arena = Arena(EventManager(), args.width, args.height, args.prey, args.seed)
+    for _ in range(args.snakes):
+        arena.addSnake(policy=greedyPolicy)
+    arena.start()
+    start = time.perf_counter()
+    while arena.alive and arena.tickCount < args.max_ticks:
+        arena.step()
+    elapsed = time.perf_counter() - start
+    best = max(arena.snakes, key=lambda snake: snake.score)
+    print(f"{arena.tickCount} ticks in {elapsed:.2f}s ({arena.tickCount / elapsed:.0f} ticks/s), "
+        f"{len(arena.alive)} snakes left, best score {best.score}")
@@ -0,0 +1,371 @@
+import math
+import time
+from collections import deque
+from itertools import repeat
+from typing import Iterator, List, Optional
+
+from event_manager import *
+from model import DIRECTION_STEPS, DIRECTIONS, STEP, X_OFFSET, Y_OFFSET, Game, KeyPress
+
+
+INFINITY = 1 << 30
+SLICE = 256 # cells of work between two looks at the clock
+
+
+class Autopilot():
+    """
+        A bot that steers the snake towards the prey. It keeps a distance
+        field over the grid (the number of moves from each free cell to the
+        prey, going around the snake) and updates it incrementally as the
+        snake moves: a cell freed by the tail can only shorten distances,
+        which spread out from it; a cell taken by the head only lengthens
+        the distances of the cells whose shortest paths all went through
+        it, and only those are recomputed. The field is rebuilt when a new
+        prey appears, in slices spread over as many ticks as it takes.
+        Before taking the best move it checks that the snake could still
+        reach its own tail from there, looking at no more than
+        REACH_LIMIT cells. All of this work stops when the tick's budget
+        of seconds is spent; the snake then keeps the last direction found
+        safe, or failing that takes a greedy step towards the prey.
+
+        Use it as a policy (autopilot(game) returns the direction for the
+        next move) or call drive() to steer a game through its EventManager.
+    """
+    REACH_LIMIT = 4096 # a region with this many free cells is taken as room enough to follow the tail
+
+    def __init__(self, game: Game, budget: float = 0.002) -> None:
+        self.game = game
+        self.budget = budget
+        self.columns = (game.WINDOW_WIDTH - X_OFFSET) // STEP + 1
+        self.rows = (game.WINDOW_HEIGHT - Y_OFFSET) // STEP + 1
+        size = self.columns * self.rows
+        self.blocked = bytearray(size) # cells covered by the snake
+        self.distance: List[int] = [INFINITY] * size
+        self.lastTick = None
+        self.lastPrey = None
+        self.lastTail = None
+        self.lastLength = 0
+        self.rebuilding: Optional[Iterator[None]] = None # the rebuild of the distance field under way, if any
+        self.safeDirection = None # the last direction that passed canReachTail
+        self.fallbacks = 0 # moves chosen without the distance field or the tail check because of the budget
+        self.neighbours = [self.cellNeighbours(cell) for cell in range(size)]
+        self.incrementalLimit = size // 4 # steps of an incremental update after which rebuilding the field is cheaper
+
+    def cellNeighbours(self, cell: int) -> tuple:
+        column, row = cell % self.columns, cell // self.columns
+        neighbours = []
+        if column > 0: neighbours.append(cell - 1)
+        if column < self.columns - 1: neighbours.append(cell + 1)
+        if row > 0: neighbours.append(cell - self.columns)
+        if row < self.rows - 1: neighbours.append(cell + self.columns)
+        return tuple(neighbours)
+
+    def cell(self, point: tuple) -> int:
+        """
+            Returns the cell index of a point, or None if it is off the board.
+        """
+        column, row = (point[0] - X_OFFSET) // STEP, (point[1] - Y_OFFSET) // STEP
+        if 0 <= column < self.columns and 0 <= row < self.rows:
+            return row * self.columns + column
+        return None
+
+    def preyCell(self) -> int:
+        prey = self.game.preyCoordinates
+        return self.cell((prey[0] + 5, prey[1] + 5))
+
+    # distance field
+
+    def startRebuild(self) -> None:
+        """
+            Starts recomputing the whole distance field. Until catchUp()
+            finished it, the field is not used and only the blocked cells
+            are kept up to date.
+        """
+        self.rebuilding = self.rebuild()
+
+    def rebuild(self) -> Iterator[None]:
+        """
+            Recomputes the whole distance field with a breadth first search
+            from the prey, yielding every SLICE cells so that the work can
+            be spread over several ticks. A cell the head enters meanwhile
+            has its distance reset and is not searched through.
+        """
+        distance, blocked, neighbours = self.distance, self.blocked, self.neighbours
+        for start in range(0, len(distance), 16 * SLICE):
+            end = min(start + 16 * SLICE, len(distance))
+            distance[start:end] = repeat(INFINITY, end - start)
+            yield
+        prey = self.preyCell()
+        if prey is None:
+            return
+        distance[prey] = 0
+        queue = deque([prey])
+        steps = 0
+        while queue:
+            cell = queue.popleft()
+            nextDistance = distance[cell] + 1
+            for neighbour in neighbours[cell]:
+                if not blocked[neighbour] and distance[neighbour] > nextDistance:
+                    distance[neighbour] = nextDistance
+                    queue.append(neighbour)
+            steps += 1
+            if not steps % SLICE:
+                yield
+
+    def catchUp(self, deadline: float) -> bool:
+        """
+            Carries on with the rebuild under way until it is done or the
+            deadline passed, and returns whether the field is up to date.
+        """
+        if self.rebuilding is None:
+            return True
+        for _ in self.rebuilding:
+            if time.perf_counter() > deadline:
+                return False
+        self.rebuilding = None
+        return True
+
+    def release(self, cell: int, deadline: float) -> None:
+        """
+            The tail left cell: distances can only get shorter, spreading out
+            from it. If that takes past the deadline, or touches so many cells
+            that a rebuild is cheaper, the field is rebuilt instead.
+        """
+        distance, blocked, neighbours = self.distance, self.blocked, self.neighbours
+        blocked[cell] = 0
+        if self.rebuilding is not None:
+            return
+        best = min((distance[neighbour] for neighbour in neighbours[cell] if not blocked[neighbour]), default=INFINITY)
+        if best == INFINITY:
+            return
+        distance[cell] = best + 1
+        queue = deque([cell])
+        steps = 0
+        while queue:
+            current = queue.popleft()
+            nextDistance = distance[current] + 1
+            for neighbour in neighbours[current]:
+                if not blocked[neighbour] and distance[neighbour] > nextDistance:
+                    distance[neighbour] = nextDistance
+                    queue.append(neighbour)
+            steps += 1
+            if not steps % SLICE and (steps > self.incrementalLimit or time.perf_counter() > deadline):
+                self.startRebuild()
+                return
+
+    def block(self, cell: int, deadline: float) -> None:
+        """
+            The head entered cell: the cells whose every shortest path went
+            through it are found level by level, then recomputed from the
+            cells around them. If that takes past the deadline, or touches
+            so many cells that a rebuild is cheaper, the field is rebuilt
+            instead.
+        """
+        distance, blocked, neighbours = self.distance, self.blocked, self.neighbours
+        blocked[cell] = 1
+        old = distance[cell]
+        distance[cell] = INFINITY
+        if old == INFINITY or self.rebuilding is not None:
+            return
+        affected = set()
+        queue = deque(neighbour for neighbour in neighbours[cell] if not blocked[neighbour] and distance[neighbour] == old + 1)
+        steps = 0
+        while queue: # in order of distance, so a cell's supporters are decided before it
+            steps += 1
+            if not steps % SLICE and (steps > self.incrementalLimit or time.perf_counter() > deadline):
+                self.startRebuild()
+                return
+            current = queue.popleft()
+            if current in affected:
+                continue
+            parentDistance = distance[current] - 1
+            if any(distance[neighbour] == parentDistance and not blocked[neighbour] and neighbour not in affected for neighbour in neighbours[current]):
+                continue # still has a shortest path avoiding the head
+            affected.add(current)
+            for neighbour in neighbours[current]:
+                if not blocked[neighbour] and distance[neighbour] == distance[current] + 1:
+                    queue.append(neighbour)
+        if not affected:
+            return
+        # recompute the affected cells, starting from their unaffected neighbours
+        for current in affected:
+            distance[current] = INFINITY
+        for i, current in enumerate(affected):
+            if not i % SLICE and time.perf_counter() > deadline:
+                self.startRebuild()
+                return
+            best = min((distance[neighbour] for neighbour in neighbours[current] if not blocked[neighbour] and neighbour not in affected), default=INFINITY)
+            if best != INFINITY:
+                distance[current] = best + 1
+        queue = deque(sorted((current for current in affected if distance[current] != INFINITY), key=distance.__getitem__))
+        while queue:
+            steps += 1
+            if not steps % SLICE and (steps > self.incrementalLimit or time.perf_counter() > deadline):
+                self.startRebuild()
+                return
+            current = queue.popleft()
+            nextDistance = distance[current] + 1
+            for neighbour in neighbours[current]:
+                if neighbour in affected and distance[neighbour] > nextDistance:
+                    distance[neighbour] = nextDistance
+                    queue.append(neighbour)
+
+    def sync(self, deadline: float) -> None:
+        """
+            Brings the blocked cells and the distance field up to date with
+            the game, incrementally when the game made exactly one move.
+            A new prey, or a game that jumped (restored or seeked), starts
+            a rebuild of the field instead; a jump also marks the blocked
+            cells again, which costs O(length).
+        """
+        game = self.game
+        snake = game.snakeCoordinates
+        prey = game.preyCoordinates
+        if self.lastTick is not None and game.tickCount == self.lastTick + 1:
+            if prey != self.lastPrey:
+                self.startRebuild() # release() and block() then only mark the cells
+            if len(snake) == self.lastLength and self.lastTail != snake[0]:
+                self.release(self.cell(self.lastTail), deadline)
+            head = self.cell(snake[-1])
+            if head is not None:
+                self.block(head, deadline)
+        elif game.tickCount != self.lastTick or prey != self.lastPrey:
+            blocked = self.blocked
+            blocked[:] = bytes(len(blocked))
+            for point in snake:
+                cell = self.cell(point)
+                if cell is not None:
+                    blocked[cell] = 1
+            self.startRebuild()
+        self.lastTick, self.lastPrey = game.tickCount, prey
+        self.lastTail, self.lastLength = snake[0], len(snake)
+
+    # choosing a move
+
+    def candidates(self) -> list:
+        """
+            Returns the (direction, cell) of every move that does not hit
+            a wall or the snake right away.
+        """
+        game = self.game
+        x, y = game.snakeCoordinates[-1]
+        reverse = DIRECTIONS.index(game.appliedDirection) ^ 1
+        moves = []
+        for code, (dx, dy) in enumerate(DIRECTION_STEPS):
+            cell = self.cell((x + dx, y + dy))
+            if code != reverse and cell is not None and not self.blocked[cell]:
+                moves.append((DIRECTIONS[code], cell))
+        return moves
+
+    def canReachTail(self, start: int, deadline: float, regions: list) -> Optional[bool]:
+        """
+            Checks whether, after moving to start, the snake could still
+            follow its own tail (or has room for its whole length, or for
+            REACH_LIMIT cells). Returns None if the deadline passed first.
+            regions holds the searches already made for this move as
+            (cells seen, cells next to the tail, finished); a start inside
+            one of them is usually answered without searching again.
+        """
+        room = min(len(self.game.snakeCoordinates), self.REACH_LIMIT)
+        for seen, exits, finished in regions:
+            if start in seen:
+                if len(seen) > room or any(exit != start for exit in exits):
+                    return True
+                if finished:
+                    return False
+        blocked, neighbours = self.blocked, self.neighbours
+        tail = self.cell(self.game.snakeCoordinates[0])
+        seen, exits = {start}, []
+        queue = deque([start])
+        answer = False
+        steps = 0
+        while queue:
+            steps += 1
+            current = queue.popleft()
+            for neighbour in neighbours[current]:
+                if neighbour == tail:
+                    exits.append(current)
+                if neighbour not in seen and not blocked[neighbour]:
+                    seen.add(neighbour)
+                    queue.append(neighbour)
+            if len(seen) > room or exits and exits[-1] != start:
+                answer = True
+                break
+            if not steps % SLICE and time.perf_counter() > deadline:
+                answer = None
+                break
+        regions.append((seen, exits, not queue))
+        return answer
+
+    def greedy(self, moves: list) -> Optional[str]:
+        """
+            Cheap fallback: the move closest to the prey as the crow flies.
+        """
+        prey = self.preyCell()
+        if not moves or prey is None:
+            return moves[0][0] if moves else None
+        preyColumn, preyRow = prey % self.columns, prey // self.columns
+        return min(moves, key=lambda move: abs(move[1] % self.columns - preyColumn) + abs(move[1] // self.columns - preyRow))[0]
+
+    def fallback(self, moves: list) -> Optional[str]:
+        """
+            Move taken when the budget ran out: the last direction found
+            safe if it does not hit anything right away, else the greedy step.
+        """
+        self.fallbacks += 1
+        for direction, cell in moves:
+            if direction == self.safeDirection:
+                return direction
+        return self.greedy(moves)
+
+    def __call__(self, game: Game = None) -> Optional[str]:
+        """
+            Returns the direction to take on the next move.
+        """
+        deadline = time.perf_counter() + self.budget
+        self.sync(deadline)
+        moves = self.candidates()
+        if not moves:
+            return None
+        if not self.catchUp(deadline):
+            return self.fallback(moves)
+        moves.sort(key=lambda move: self.distance[move[1]])
+        regions = []
+        for direction, cell in moves:
+            reachable = self.canReachTail(cell, deadline, regions)
+            if reachable is None:
+                return self.fallback(moves)
+            if reachable:
+                self.safeDirection = direction
+                return direction
+        return moves[0][0]
+
+    def drive(self, eventManager: EventManager) -> None:
+        """
+            Steers the game: after every tick (and once the first prey is
+            placed) the next direction is queued like a key press.
+        """
+        eventManager.Subscribe(TickEvent, self.steer)
+        eventManager.Subscribe(CreateNewPreyEvent, self.steer)
+
+    def steer(self, event: Event) -> None:
+        if self.game.gameNotOver:
+            direction = self(self.game)
+            if direction is not None:
+                self.game.whenAnArrowKeyIsPressed(KeyPress(direction))
+
+
+def autopilotPolicy(game: Game) -> Optional[str]:
+    """
+        Tournament policy playing with an Autopilot kept on the game.
+        Its time budget is lifted, so that its moves, like the results of
+        a tournament, only depend on the seed and not on the CPU load.
+    """
+    autopilot = autopilots.get(id(game))
+    if autopilot is None or autopilot.game is not game:
+        autopilots.clear() # the previous games are over
+        autopilot = autopilots[id(game)] = Autopilot(game, budget=math.inf)
+    return autopilot(game)
+
+
+autopilots = {}
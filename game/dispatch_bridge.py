@@ -0,0 +1,92 @@
+import threading
+import time
+from collections import deque
+from typing import Callable
+
+from event_manager import Event, TickEvent
+from metrics import Histogram
+
+
+class TkDispatchBridge():
+    """
+        Carries events posted on any thread over to the Tk thread.
+        It is registered with the EventManager in place of the Gui: events
+        are queued on the posting thread and handed to the Gui on the Tk
+        thread, in order, when the Tk thread drains the queue, every
+        POLL_INTERVAL and before each frame the Gui draws. Other threads
+        only append to the queue and never call Tk, which would block them
+        until the Tk thread is free. When the Gui falls behind, only the
+        newest TickEvent of a batch is delivered, since every tick redraws
+        the whole frame anyway.
+    """
+    POLL_INTERVAL = 5 # ms
+
+    def __init__(self, root, handler: Callable[[Event], None]) -> None:
+        """
+            Must be created on the Tk thread. handler is called on the Tk
+            thread with every event that is delivered.
+        """
+        self.root = root
+        self.handler = handler
+        self.queue = deque()
+        self.drainScheduled = False # a drain is waiting for Tk to be idle, Tk thread only
+        self.tkThread = threading.get_ident()
+        #metrics
+        self.latency = Histogram() # time from Post to delivery on the Tk thread
+        self.maxQueueDepth = 0
+        self.delivered = 0
+        self.coalescedTicks = 0
+        root.after(self.POLL_INTERVAL, self.poll)
+
+    @property
+    def queueDepth(self) -> int:
+        return len(self.queue)
+
+    def notify(self, event: Event) -> None:
+        """
+            Queues an event. This is safe to call from any thread.
+        """
+        self.queue.append((time.perf_counter(), event))
+        if threading.get_ident() == self.tkThread and not self.drainScheduled:
+            self.drainScheduled = True
+            self.root.after_idle(self.drain)
+
+    def drain(self) -> None:
+        """
+            Delivers every queued event to the handler. Runs on the Tk thread.
+        """
+        self.drainScheduled = False
+        events = []
+        while self.queue:
+            events.append(self.queue.popleft())
+        if len(events) > self.maxQueueDepth:
+            self.maxQueueDepth = len(events)
+
+        lastTick = None
+        for i, (posted, event) in enumerate(events):
+            if isinstance(event, TickEvent):
+                lastTick = i
+        now = time.perf_counter()
+        for i, (posted, event) in enumerate(events):
+            if isinstance(event, TickEvent) and i != lastTick:
+                self.coalescedTicks += 1
+                continue
+            self.latency.record(now - posted)
+            self.delivered += 1
+            self.handler(event)
+
+    def poll(self) -> None:
+        if self.queue:
+            self.drain()
+        self.root.after(self.POLL_INTERVAL, self.poll)
+
+    def summary(self) -> dict:
+        """
+            Returns the bridge metrics as a dictionary.
+        """
+        return {
+            "queueDepth": self.queueDepth,
+            "maxQueueDepth": self.maxQueueDepth,
+            "delivered": self.delivered,
+            "coalescedTicks": self.coalescedTicks,
+            "latency": self.latency.summary()}
@@ -0,0 +1,8 @@
+"""
+    How a game looks, the same in the Tk window (see app.py) and in the
+    frames the rasterizer draws. The window size is part of GameConfig.
+"""
+
+SNAKE_ICON_WIDTH = 15
+BACKGROUND_COLOUR = "green"
+ICON_COLOUR = "yellow"
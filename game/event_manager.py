@@ -1,60 +1,122 @@
-from typing import Dict
+from itertools import count
+from typing import Callable, Dict, List, Tuple, Type
 
 
 class Event(object):
     """
     A superclass for any event that may be generated 
     by an object and sent to the EventManager.
+    Events carry no data (listeners read the model), so they are
+    immutable and a single instance of each is reused for every Post.
     """
-    def __init__(self) -> None:
-        pass
+    __slots__ = ()
+    name = "Event"
 
 
 class TickEvent(Event):
-    def __init__(self) -> None:
-        self.name = "Move Event"
+    __slots__ = ()
+    name = "Move Event"
 
 
 class UpdateScoreEvent(Event):
-    def __init__(self) -> None:
-        self.name = "Update Score Event"
+    __slots__ = ()
+    name = "Update Score Event"
 
 
 class GameOverEvent(Event):
-    def __init__(self) -> None:
-        self.name = "Game Over Event"
+    __slots__ = ()
+    name = "Game Over Event"
 
 
 class CreateNewPreyEvent(Event):
-    def __init__(self) -> None:
-        self.name = "Create New Prey Event"
+    __slots__ = ()
+    name = "Create New Prey Event"
+
+
+class DirectionChangeEvent(Event):
+    __slots__ = ()
+    name = "Direction Change Event"
+
+
+class GameStartEvent(Event):
+    __slots__ = ()
+    name = "Game Start Event"
+
+
+# shared instances, post these instead of creating new events
+TICK_EVENT = TickEvent()
+UPDATE_SCORE_EVENT = UpdateScoreEvent()
+GAME_OVER_EVENT = GameOverEvent()
+CREATE_NEW_PREY_EVENT = CreateNewPreyEvent()
+DIRECTION_CHANGE_EVENT = DirectionChangeEvent()
+GAME_START_EVENT = GameStartEvent()
 
 
 class EventManager(object):
     """
     Coordinates communication between the model, view, and controller.
+    Handlers subscribe to an event class (and receive its subclasses too).
+    The handlers of each posted event class are resolved once and cached
+    until a subscription changes, so Post only calls the interested handlers.
     """    
     
     def __init__(self) -> None:
         self.listeners = dict()
+        self.subscriptions: List[Tuple[int, Type[Event], Callable[[Event], None]]] = []
+        self.handlerCache: Dict[Type[Event], Tuple[Callable[[Event], None], ...]] = dict()
+        self.order = count()
 
     def RegisterListener(self, listener: object) -> None:
         """
         Adds a listener. The listener will recieve posted events
         through its notify(event) call.
         """    
-        self.listeners[listener] = 1
+        if listener not in self.listeners:
+            self.listeners[listener] = 1
+            self.Subscribe(Event, listener.notify)
 
     def UnregisterListener(self, listener: object) -> None:
         """
         Removes a listener.
         """    
-        if listener in self.listener.keys():
+        if listener in self.listeners:
             del self.listeners[listener]
+            self.Unsubscribe(Event, listener.notify)
+
+    def Subscribe(self, eventType: Type[Event], handler: Callable[[Event], None]) -> None:
+        """
+        Calls handler(event) for every posted event of class eventType.
+        """
+        self.subscriptions.append((next(self.order), eventType, handler))
+        self.handlerCache = dict()
+
+    def Unsubscribe(self, eventType: Type[Event], handler: Callable[[Event], None]) -> None:
+        """
+        Removes a handler added with Subscribe.
+        """
+        for subscription in self.subscriptions:
+            if subscription[1] is eventType and subscription[2] == handler:
+                self.subscriptions.remove(subscription)
+                self.handlerCache = dict()
+                return
+
+    def handlersFor(self, eventType: Type[Event]) -> Tuple[Callable[[Event], None], ...]:
+        """
+        Returns the handlers of an event class, in subscription order.
+        """
+        handlers = self.handlerCache.get(eventType)
+        if handlers is None:
+            handlers = tuple(handler for _, subscribedType, handler in self.subscriptions if issubclass(eventType, subscribedType))
+            self.handlerCache[eventType] = handlers
+        return handlers
 
     def Post(self, event: Event) -> None:
         """
-        Post new event. The event will be broadcasted to all listeners.
+        Post new event. The event will be broadcasted to all listeners
+        subscribed to its class.
         """
-        for listener in self.listeners.keys():
-            listener.notify(event)
\ No newline at end of file
+        handlers = self.handlerCache.get(event.__class__)
+        if handlers is None:
+            handlers = self.handlersFor(event.__class__)
+        for handler in handlers:
+            handler(event)
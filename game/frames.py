@@ -0,0 +1,195 @@
+import time
+from array import array
+from typing import Iterator, Optional, Tuple
+
+from snake_body import RunLengthSnakeBody
+
+
+class PointRing():
+    """
+        Snake coordinates stored as int32 x, y pairs in a ring buffer that
+        is reused from frame to frame: adding a head and dropping the tail
+        allocate nothing. It can be read like a SnakeBody (len, indexing
+        from either end, iteration from tail to head).
+    """
+    def __init__(self, capacity: int = 64) -> None:
+        self.capacity = capacity
+        self.data = array("i", bytes(8 * capacity))
+        self.start = 0 # position of the tail
+        self.length = 0
+
+    def append(self, point: Tuple[int, int]) -> None:
+        if self.length == self.capacity:
+            self.grow()
+        i = 2 * ((self.start + self.length) % self.capacity)
+        self.data[i], self.data[i + 1] = point
+        self.length += 1
+
+    def popTail(self) -> None:
+        self.start = (self.start + 1) % self.capacity
+        self.length -= 1
+
+    def clear(self) -> None:
+        self.start = self.length = 0
+
+    def grow(self) -> None:
+        points = list(self)
+        self.capacity *= 2
+        self.data = array("i", bytes(8 * self.capacity))
+        self.clear()
+        for point in points:
+            self.append(point)
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __getitem__(self, index: int) -> Tuple[int, int]:
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError("frame index out of range")
+        i = 2 * ((self.start + index) % self.capacity)
+        return (self.data[i], self.data[i + 1])
+
+    def __iter__(self) -> Iterator[Tuple[int, int]]:
+        end = self.start + self.length
+        for part in (self.data[2 * self.start:2 * min(end, self.capacity)], self.data[:2 * max(0, end - self.capacity)]):
+            numbers = iter(part)
+            yield from zip(numbers, numbers)
+
+
+class Frame():
+    """
+        The state of a game after a tick: what a view needs to draw it.
+        It has the attributes a renderer reads from a Game (tickCount,
+        score, gameNotOver, preyCoordinates and snakeCoordinates), so it
+        can be drawn in place of the game. The snake is copied into a
+        PointRing, or into a RunLengthSnakeBody of its own if the game's
+        snake is one, so that frames take O(turns) memory too.
+        version grows by one with every frame the game publishes.
+    """
+    def __init__(self) -> None:
+        self.version = 0
+        self.sequence = 0 # odd while the frame is being written
+        self.epoch = None # changes when the snake is replaced rather than moved
+        self.tickCount = 0
+        self.score = 0
+        self.gameNotOver = True
+        self.preyCoordinates = tuple()
+        self.snakeCoordinates = PointRing()
+
+    def copyFrom(self, source, epoch: int) -> None:
+        """
+            Makes this frame a copy of source, a Game or another Frame.
+            If the snake has the same epoch and only moved since this frame
+            was written, only the new heads are copied and the old tail
+            dropped, so a copy costs O(moves) rather than O(length).
+        """
+        snake, points = source.snakeCoordinates, self.snakeCoordinates
+        runLength = isinstance(snake, RunLengthSnakeBody)
+        if runLength != isinstance(points, RunLengthSnakeBody): # the game switched body model
+            points = self.snakeCoordinates = RunLengthSnakeBody() if runLength else PointRing()
+            self.epoch = None
+        moves = source.tickCount - self.tickCount
+        if epoch != self.epoch or not 0 <= moves <= len(snake) or len(points) + moves < len(snake):
+            if runLength:
+                points.copyRuns(snake)
+            else:
+                points.clear()
+                for point in snake:
+                    points.append(point)
+        else:
+            for i in range(moves, 0, -1):
+                points.append(snake[-i])
+            while len(points) > len(snake):
+                points.popTail()
+        self.epoch = epoch
+        self.tickCount = source.tickCount
+        self.score = source.score
+        self.gameNotOver = source.gameNotOver
+        self.preyCoordinates = source.preyCoordinates
+
+
+class FramePublisher():
+    """
+        The game thread publishes a Frame at the end of every tick, into
+        one of BUFFERS frames that are reused in turn (triple buffering):
+        the newest frame is left alone while the next one is written, and
+        readers have two more ticks to copy it before it is reused.
+        Readers never take a lock. Like a seqlock, every frame has a
+        sequence number that is odd while it is written; a FrameReader
+        copies the newest frame and checks that its sequence did not change
+        meanwhile, otherwise it copies again.
+    """
+    BUFFERS = 3
+
+    def __init__(self) -> None:
+        self.frames = [Frame() for _ in range(self.BUFFERS)]
+        self.latest: Optional[int] = None # index of the newest complete frame
+        self.version = 0
+        self.body = None # the snake body the frames were copied from
+        self.epoch = 0
+
+    def publish(self, game) -> None:
+        """
+            Publishes the current state of the game. Must be called from
+            the game thread only, between moves.
+        """
+        if game.snakeCoordinates is not self.body: # a new body (restore, setSnakeCoordinates): copy it whole
+            self.body = game.snakeCoordinates
+            self.epoch += 1
+        index = 0 if self.latest is None else (self.latest + 1) % self.BUFFERS
+        frame = self.frames[index]
+        frame.sequence += 1
+        frame.copyFrom(game, self.epoch)
+        self.version += 1
+        frame.version = self.version
+        frame.sequence += 1
+        self.latest = index
+
+
+class FrameReader():
+    """
+        Reads the frames of a FramePublisher from any thread. poll() copies
+        the newest frame into the reader's own frame, which the publisher
+        never touches, so it can be read at leisure; frames that were
+        already read are not copied again.
+    """
+    def __init__(self, publisher: FramePublisher) -> None:
+        self.publisher = publisher
+        self.frame = Frame()
+        self.skipped = 0 # frames published but never read, because a newer one came first
+        self.retries = 0 # copies started over because the frame was being rewritten
+
+    def poll(self) -> Optional[Frame]:
+        """
+            Returns the reader's frame, updated to the newest published
+            frame, or None if no frame was published since the last poll.
+        """
+        publisher, frame = self.publisher, self.frame
+        while True:
+            latest = publisher.latest
+            if latest is None:
+                return None
+            source = publisher.frames[latest]
+            sequence = source.sequence
+            version = source.version
+            if sequence & 1: # the writer lapped the readers and is rewriting this frame
+                self.retries += 1
+                time.sleep(0)
+                continue
+            if version <= frame.version:
+                if source.sequence == sequence:
+                    return None
+                continue
+            try:
+                frame.copyFrom(source, source.epoch)
+            except (IndexError, RuntimeError): # the frame changed under us
+                pass
+            if source.sequence == sequence:
+                if frame.version:
+                    self.skipped += version - frame.version - 1
+                frame.version = version
+                return frame
+            self.retries += 1
+            frame.epoch = None # the copy may be torn, copy it whole next time
@@ -0,0 +1,124 @@
+from functools import lru_cache
+from typing import Dict, Iterable, List, Tuple
+
+
+class FreeCellIndex():
+    """
+        Keeps track of which cells of a grid are not covered by the snake,
+        so that a free cell can be picked at random quickly however full
+        the board is. Each cell has a fixed position in the cells list; a
+        Fenwick tree over the positions counts the free cells, so occupying
+        or releasing a cell and picking the k-th free cell are O(log n).
+        The cell picked for a random number only depends on which cells are
+        free, not on the order they were occupied in, so a game restored
+        from a snapshot or a replay keyframe places the same prey.
+        Cells that are not part of the index (for example the ones too close
+        to the walls for a prey) are ignored.
+        The cells, their positions and the tree of an empty board never
+        change, so copies of an index share them (see forGrid()).
+    """
+    def __init__(self, cells: Iterable[Tuple[int, int]]) -> None:
+        self.cells: List[Tuple[int, int]] = list(cells)
+        self.position: Dict[Tuple[int, int], int] = {cell: i for i, cell in enumerate(self.cells)}
+        self.topBit = 1 << (len(self.cells).bit_length() - 1) if self.cells else 0
+        size = len(self.cells)
+        emptyTree = [0] + [1] * size # emptyTree[i] counts the cells in positions (i - lowbit(i), i]
+        for i in range(1, size + 1):
+            parent = i + (i & -i)
+            if parent <= size:
+                emptyTree[parent] += emptyTree[i]
+        self.emptyTree = emptyTree
+        self.reset()
+
+    @classmethod
+    def forGrid(cls, WINDOW_WIDTH: int, WINDOW_HEIGHT: int, xOffset: int, yOffset: int, step: int, margin: int = 0) -> "FreeCellIndex":
+        """
+            Returns an index of the cells of a grid (see gridCells), all free.
+            The cells of each grid are listed and indexed once, then shared
+            by the indexes of every game on that grid.
+        """
+        return gridIndex(WINDOW_WIDTH, WINDOW_HEIGHT, xOffset, yOffset, step, margin).copy()
+
+    def copy(self) -> "FreeCellIndex":
+        """
+            Returns an index of the same cells, all free.
+        """
+        index = object.__new__(type(self))
+        index.cells, index.position, index.topBit, index.emptyTree = self.cells, self.position, self.topBit, self.emptyTree
+        index.reset()
+        return index
+
+    def reset(self) -> None:
+        """
+            Marks every cell as free.
+        """
+        size = len(self.cells)
+        self.free = bytearray(b"\x01") * size
+        self.freeCount = size
+        self.tree = list(self.emptyTree) # tree[i] counts the free cells in positions (i - lowbit(i), i]
+
+    def update(self, i: int, delta: int) -> None:
+        tree, size = self.tree, len(self.cells)
+        i += 1
+        while i <= size:
+            tree[i] += delta
+            i += i & -i
+
+    def occupy(self, cell: Tuple[int, int]) -> None:
+        i = self.position.get(cell)
+        if i is not None and self.free[i]:
+            self.free[i] = 0
+            self.freeCount -= 1
+            self.update(i, -1)
+
+    def release(self, cell: Tuple[int, int]) -> None:
+        i = self.position.get(cell)
+        if i is not None and not self.free[i]:
+            self.free[i] = 1
+            self.freeCount += 1
+            self.update(i, 1)
+
+    def isFree(self, cell: Tuple[int, int]) -> bool:
+        i = self.position.get(cell)
+        return i is not None and bool(self.free[i])
+
+    def freeCell(self, k: int) -> Tuple[int, int]:
+        """
+            Returns the k-th free cell (0 <= k < freeCount), in cells order.
+        """
+        tree, size = self.tree, len(self.cells)
+        position, remaining, step = 0, k + 1, self.topBit
+        while step:
+            if position + step <= size and tree[position + step] < remaining:
+                position += step
+                remaining -= tree[position]
+            step >>= 1
+        return self.cells[position]
+
+    def sample(self, random) -> Tuple[int, int]:
+        """
+            Returns a random free cell, or None if there is none.
+            random must have a randint(a, b) method.
+        """
+        if not self.freeCount:
+            return None
+        return self.freeCell(random.randint(0, self.freeCount - 1))
+
+
+def gridCells(WINDOW_WIDTH: int, WINDOW_HEIGHT: int, xOffset: int, yOffset: int, step: int, margin: int = 0) -> List[Tuple[int, int]]:
+    """
+        Returns the cells (x, y) of the grid the snake moves on, that is
+        x = xOffset + step * column and y = yOffset + step * row, which are
+        at least margin away from the walls.
+    """
+    xs = [x for x in range(xOffset, WINDOW_WIDTH + 1, step) if margin <= x <= WINDOW_WIDTH - margin]
+    ys = [y for y in range(yOffset, WINDOW_HEIGHT + 1, step) if margin <= y <= WINDOW_HEIGHT - margin]
+    return [(x, y) for y in ys for x in xs]
+
+
+@lru_cache(maxsize=16)
+def gridIndex(WINDOW_WIDTH: int, WINDOW_HEIGHT: int, xOffset: int, yOffset: int, step: int, margin: int) -> FreeCellIndex:
+    """
+        The index forGrid() copies for a grid. It is never changed.
+    """
+    return FreeCellIndex(gridCells(WINDOW_WIDTH, WINDOW_HEIGHT, xOffset, yOffset, step, margin))
@@ -0,0 +1,84 @@
+from typing import Dict
+
+
+class Histogram():
+    """
+        A cheap histogram of durations (in seconds).
+        Values are counted in buckets whose bounds are powers of two
+        microseconds, so recording a value is a couple of integer operations
+        and percentiles are accurate to within a factor of two.
+    """
+    BUCKETS = 32 # the last bucket holds everything above ~35 minutes
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        self.buckets = [0] * self.BUCKETS
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, value: float) -> None:
+        """
+            Adds a duration to the histogram. Negative values count as 0.
+        """
+        if value < 0:
+            value = 0.0
+        bucket = int(value * 1e6).bit_length()
+        self.buckets[bucket if bucket < self.BUCKETS else self.BUCKETS - 1] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def copy(self) -> "Histogram":
+        other = Histogram()
+        other.buckets = list(self.buckets)
+        other.count, other.total, other.max = self.count, self.total, self.max
+        return other
+
+    def since(self, earlier: "Histogram") -> "Histogram":
+        """
+            Returns a histogram of the values recorded since earlier, a
+            copy of this histogram taken before. Its max is the bound of
+            the highest bucket recorded since, capped by the max of this
+            histogram, so it is accurate to within a factor of two.
+        """
+        other = Histogram()
+        other.buckets = [n - m for n, m in zip(self.buckets, earlier.buckets)]
+        other.count = self.count - earlier.count
+        other.total = self.total - earlier.total
+        top = max((bucket for bucket, n in enumerate(other.buckets) if n), default=None)
+        if top is not None:
+            other.max = self.max if top == self.BUCKETS - 1 else min((1 << top) / 1e6, self.max)
+        return other
+
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, p: float) -> float:
+        """
+            Returns the upper bound (in seconds) of the bucket holding
+            the p-th percentile (0 < p <= 100).
+        """
+        if not self.count:
+            return 0.0
+        rank = p / 100 * self.count
+        seen = 0
+        for bucket, n in enumerate(self.buckets):
+            seen += n
+            if seen >= rank:
+                return min((1 << bucket) / 1e6, self.max)
+        return self.max
+
+    def summary(self) -> Dict[str, float]:
+        """
+            Returns the main statistics of the histogram as a dictionary.
+        """
+        return {
+            "count": self.count,
+            "mean": self.mean(),
+            "p50": self.percentile(50),
+            "p99": self.percentile(99),
+            "max": self.max}
@@ -1,63 +1,232 @@
 import random
+import struct
+import sys
 import time
+from array import array
+from collections import deque
+from typing import Iterable, NamedTuple, Tuple, Union
 from event_manager import *
+from frames import FramePublisher
+from free_cells import FreeCellIndex, gridCells
+from metrics import Histogram
+from rng import SplitMix64
+from scheduler import FixedTimestepScheduler
+from snake_body import SnakeBody
+
+np = None # numpy is only needed by BatchGame, which imports it so that other games start without it
+
+
+DIRECTIONS = ("Left", "Right", "Up", "Down") # direction codes, the opposite of code d is d ^ 1
+DIRECTION_STEPS = ((-10, 0), (10, 0), (0, -10), (0, 10)) # (dx, dy) of one move in each direction
+INITIAL_SNAKE = ((495, 0), (485, 0), (475, 0), (465, 0), (455, 0)) # starting snake, from tail to head
+STEP = 10 # distance the snake moves every tick
+X_OFFSET, Y_OFFSET = INITIAL_SNAKE[0][0] % STEP, INITIAL_SNAKE[0][1] % STEP # the snake moves on the cells (X_OFFSET + STEP * i, Y_OFFSET + STEP * j)
+
+
+class KeyPress(NamedTuple):
+    """
+        Stands in for a Tk key event when the snake is steered by something
+        other than the keyboard: Game.whenAnArrowKeyIsPressed(KeyPress("Up")).
+    """
+    keysym: str
+
+
+class GameConfig(NamedTuple):
+    """
+        The gameplay constants of a Game. Make a variant with
+        DEFAULT_CONFIG._replace(THRESHOLD=30) or DEFAULT_CONFIG.override(["THRESHOLD=30"]).
+        override() checks the new values; call validate() after _replace().
+    """
+    SPEED: float = 0.05 # speed of snake updates (sec)
+    COLLISION_PROXIMITY: int = 10 # sets how close the snake must come to the prey to eat it
+    THRESHOLD: int = 15 # sets how close prey can be to borders
+    WINDOW_WIDTH: int = 500
+    WINDOW_HEIGHT: int = 300
+
+    def override(self, assignments: Iterable[str]) -> "GameConfig":
+        """
+            Returns a copy with the constants given as "NAME=VALUE" changed.
+        """
+        changes = {}
+        for assignment in assignments:
+            name, _, value = assignment.partition("=")
+            if name not in self._fields:
+                raise ValueError(f"unknown constant {name!r}, expected one of {', '.join(self._fields)}")
+            changes[name] = type(getattr(self, name))(value)
+        return self._replace(**changes).validate()
+
+    def validate(self) -> "GameConfig":
+        """
+            Returns the config, or raises ValueError if a game cannot be
+            played with it: the starting snake must be on the board, and
+            at least one cell THRESHOLD away from the walls must be left
+            for the prey. Sizes must fit the int16 numbers of GameState.
+        """
+        LIMIT = 2 ** 15 - 1
+        if not self.SPEED > 0:
+            raise ValueError(f"SPEED must be positive, got {self.SPEED}")
+        if not 0 < self.COLLISION_PROXIMITY <= LIMIT:
+            raise ValueError(f"COLLISION_PROXIMITY must be between 1 and {LIMIT}, got {self.COLLISION_PROXIMITY}")
+        width = max(x for x, y in INITIAL_SNAKE)
+        height = max(y for x, y in INITIAL_SNAKE)
+        if not width <= self.WINDOW_WIDTH <= LIMIT or not height <= self.WINDOW_HEIGHT <= LIMIT:
+            raise ValueError(f"the window must be between {width}x{height} and {LIMIT}x{LIMIT} to hold the snake,"
+                f" got {self.WINDOW_WIDTH}x{self.WINDOW_HEIGHT}")
+        if self.THRESHOLD < 0:
+            raise ValueError(f"THRESHOLD must not be negative, got {self.THRESHOLD}")
+        for size, offset in ((self.WINDOW_WIDTH, X_OFFSET), (self.WINDOW_HEIGHT, Y_OFFSET)):
+            first = offset + STEP * max(0, -(-(self.THRESHOLD - offset) // STEP)) # first cell at least THRESHOLD from the wall
+            if first > size - self.THRESHOLD:
+                raise ValueError(f"THRESHOLD {self.THRESHOLD} leaves no cell for the prey on a"
+                    f" {self.WINDOW_WIDTH}x{self.WINDOW_HEIGHT} window")
+        return self
+
+
+DEFAULT_CONFIG = GameConfig()
+
+
+def configForBoard(config: GameConfig, WINDOW_WIDTH: int, WINDOW_HEIGHT: int) -> GameConfig:
+    """
+        Returns config, or the default constants if it is None, for a
+        board of the given size. Raises ValueError if config is for a
+        board of another size.
+    """
+    if config is None:
+        return DEFAULT_CONFIG._replace(WINDOW_WIDTH=WINDOW_WIDTH, WINDOW_HEIGHT=WINDOW_HEIGHT)
+    if (config.WINDOW_WIDTH, config.WINDOW_HEIGHT) != (WINDOW_WIDTH, WINDOW_HEIGHT):
+        raise ValueError(f"the board is {WINDOW_WIDTH}x{WINDOW_HEIGHT} but the config is for {config.WINDOW_WIDTH}x{config.WINDOW_HEIGHT}")
+    return config
 
 
 class Game():
     '''
         This class implements the game functionalities.
     '''
-    def __init__(self, eventManager: EventManager, WINDOW_WIDTH: int, WINDOW_HEIGHT: int):
+    MAX_QUEUED_KEYS = 3 # how many key presses can wait for the next moves
+
+    def __init__(self, eventManager: EventManager, WINDOW_WIDTH: int, WINDOW_HEIGHT: int, seed: int = None, bodyModel: type = SnakeBody,
+        startCoordinates: Iterable[Tuple[int, int]] = INITIAL_SNAKE, freeCells: FreeCellIndex = None, config: GameConfig = None):
         """
            This initializer sets the initial snake coordinate list, movement
            direction, and arranges for the first prey to be created.
+           Games created with the same seed place their prey identically.
+           bodyModel stores the snake: SnakeBody, or RunLengthSnakeBody
+           for giant boards where the snake is very long.
+           startCoordinates and freeCells let an Arena put many snakes,
+           sharing one index of free cells, on the same board.
+           config holds the gameplay constants, the defaults if it is None;
+           its window size must be the size of the board.
         """
         self.eventManager = eventManager
+        self.config = config = configForBoard(config, WINDOW_WIDTH, WINDOW_HEIGHT)
         self.WINDOW_WIDTH = WINDOW_WIDTH
         self.WINDOW_HEIGHT = WINDOW_HEIGHT
         self.score = 0
         self.direction = "Left" #initial direction of the snake
+        self.appliedDirection = self.direction # direction used by the last move
+        self.inputs = deque() # (key, time pressed) waiting to be applied, one per move
+        self.inputLatency = Histogram() # time from a key press to the move that applied it
+        self.droppedInputs = 0 # key presses ignored because the queue was full
+        self.seed = random.getrandbits(63) if seed is None else seed
+        self.random = SplitMix64(self.seed) # used to place the prey
         self.gameNotOver = True
+        self.tickCount = 0 # number of moves made so far
         self.preyCoordinates = tuple() # this variable keeps track of the current preys position    
-        self.snakeCoordinates = [
-            (495, 0), 
-            (485, 0), 
-            (475, 0),
-            (465, 0), 
-            (455, 0)]
+        #cells a new prey can be placed on, the ones under the snake are marked as occupied
+        self.freeCells = freeCells or FreeCellIndex.forGrid(WINDOW_WIDTH, WINDOW_HEIGHT, X_OFFSET, Y_OFFSET, STEP, config.THRESHOLD)
+        self.bodyModel = bodyModel
+        self.snakeCoordinates = bodyModel(startCoordinates, self.freeCells)
+        self.scheduler = None # set by superloop, can be used to change the tick rate while playing
+        self.frames = FramePublisher() # the state after every tick, for readers on other threads
+
+    @classmethod
+    def fromConfig(cls, eventManager: EventManager, config: GameConfig, seed: int = None, **options) -> "Game":
+        """
+            Creates a game on a board of the size the config gives.
+            Raises ValueError if the config cannot be played.
+        """
+        config.validate()
+        return cls(eventManager, config.WINDOW_WIDTH, config.WINDOW_HEIGHT, seed, config=config, **options)
 
-    def superloop(self) -> None:
+    def superloop(self, scheduler: FixedTimestepScheduler = None) -> None:
         """
             This method implements a main loop
             of the game. It constantly generates "move" 
             tasks to cause the constant movement of the snake.
-            Use the SPEED constant to set how often the move tasks
-            are generated.
+            Use the SPEED constant of the config to set how often the move tasks
+            are generated, or pass a scheduler to control the tick rate.
+        """
+        SPEED = self.config.SPEED # speed of snake updates (sec)
+        self.scheduler = scheduler or FixedTimestepScheduler(1 / SPEED)
+        self.start()
+        self.scheduler.run(self.tick, lambda: self.gameNotOver)
+
+    def start(self) -> None:
+        """
+            Places the first prey, publishes the starting position and
+            posts a GameStartEvent, before the first move.
         """
-        SPEED = 0.05 # speed of snake updates (sec)
         self.createNewPrey()
-        while self.gameNotOver:
-            self.move()
-            tickEvent = TickEvent()
-            self.eventManager.Post(tickEvent)
-            time.sleep(SPEED)
+        self.publishFrame()
+        self.eventManager.Post(GAME_START_EVENT)
+
+    def tick(self) -> None:
+        """
+            This method runs a single step of the game:
+            it moves the snake, publishes a frame of the new state
+            and lets the listeners know.
+        """
+        self.move()
+        self.publishFrame()
+        self.eventManager.Post(TICK_EVENT)
+
+    def publishFrame(self) -> None:
+        """
+            Publishes the current state to self.frames. Other threads read
+            the game through a frames.FrameReader instead of its attributes,
+            which move() changes as they read them.
+        """
+        self.frames.publish(self)
 
     def whenAnArrowKeyIsPressed(self, e) -> None:
         """ 
             This method is bound to the arrow keys
             and is called when one of those is clicked.
-            It sets the movement direction based on 
-            the key that was pressed by the gamer.
-            Use as is.
+            It queues the key that was pressed by the gamer;
+            move() applies one queued key per tick, so quick
+            presses within one tick are all played in order.
+            Keys reversing or repeating the direction the snake 
+            will have by then are ignored, as are keys pressed while 
+            MAX_QUEUED_KEYS keys are already waiting.
         """
-        currentDirection = self.direction
+        try:
+            currentDirection = self.inputs[-1][0] if self.inputs else self.direction
+        except IndexError: # move() took the last key in the meantime
+            currentDirection = self.direction
         #ignore invalid keys
-        if (currentDirection == "Left" and e.keysym == "Right" or 
+        if (e.keysym == currentDirection or
+            currentDirection == "Left" and e.keysym == "Right" or 
             currentDirection == "Right" and e.keysym == "Left" or
             currentDirection == "Up" and e.keysym == "Down" or
             currentDirection == "Down" and e.keysym == "Up"):
             return
-        self.direction = e.keysym
+        if len(self.inputs) >= self.MAX_QUEUED_KEYS:
+            self.droppedInputs += 1
+            return
+        self.inputs.append((e.keysym, time.perf_counter()))
+
+    def applyNextInput(self) -> None:
+        """
+            Takes the next queued key, if any, and makes it the direction
+            of this move unless it would reverse the snake into its body.
+            It records how long the key waited to be applied.
+        """
+        if not self.inputs:
+            return
+        keysym, pressedAt = self.inputs.popleft()
+        if DIRECTIONS.index(keysym) ^ 1 != DIRECTIONS.index(self.appliedDirection):
+            self.direction = keysym
+            self.inputLatency.record(time.perf_counter() - pressedAt)
 
     def move(self) -> None:
         """ 
@@ -67,6 +236,7 @@ class Game():
             If based on this new movement, the prey has been 
             captured, it adds a task to the queue for the updated
             score and also creates a new prey.
+            It first applies the next queued arrow key, if any.
             It also calls a corresponding method to check if 
             the game should be over. 
             The snake coordinates list (representing its length 
@@ -77,8 +247,11 @@ class Game():
             """
                 This function checks if the snake has eaten the prey
                 when moving to its new coordinates.
+                There is nothing to eat once the board is full.
             """
-            COLLISION_PROXIMITY = 10 # sets how close the snake must come to the prey to eat it
+            if not self.preyCoordinates:
+                return False
+            COLLISION_PROXIMITY = self.config.COLLISION_PROXIMITY # sets how close the snake must come to the prey to eat it
             xSnake, ySnake = newSnakeCoordinates
             xPrey, yPrey = self.preyCoordinates[0] + 5, self.preyCoordinates[1] + 5
             if abs(xSnake - xPrey) < COLLISION_PROXIMITY and abs(ySnake - yPrey) < COLLISION_PROXIMITY:
@@ -86,6 +259,12 @@ class Game():
 
             return False 
 
+        self.applyNextInput()
+        direction = self.direction
+        if direction != self.appliedDirection: # let the listeners know the snake turned
+            self.appliedDirection = direction
+            self.eventManager.Post(DIRECTION_CHANGE_EVENT)
+
         newSnakeCoordinates = self.calculateNewCoordinates() # get new snake coordinates
         
         self.isGameOver(newSnakeCoordinates) # check if the game is over
@@ -94,11 +273,54 @@ class Game():
 
         if isPreyEaten(newSnakeCoordinates): # check if the prey has been eaten
             self.score += 1
-            updateScoreEvent = UpdateScoreEvent()
-            self.eventManager.Post(updateScoreEvent)
+            self.eventManager.Post(UPDATE_SCORE_EVENT)
             self.createNewPrey()
         else: # remove first coordinate from snake coordinate
-            self.snakeCoordinates.pop(0)
+            self.snakeCoordinates.popTail()
+
+        self.tickCount += 1
+
+    def setSnakeCoordinates(self, coordinates) -> None:
+        """
+            Replaces the snake by one with the given coordinates,
+            from tail to head.
+        """
+        self.freeCells.reset()
+        self.snakeCoordinates = self.bodyModel(coordinates, self.freeCells)
+
+    def configure(self, config: GameConfig) -> None:
+        """
+            Switches the game to another config, board size included,
+            keeping the snake where it is.
+        """
+        self.config = config
+        self.WINDOW_WIDTH, self.WINDOW_HEIGHT = config.WINDOW_WIDTH, config.WINDOW_HEIGHT
+        self.freeCells = FreeCellIndex.forGrid(config.WINDOW_WIDTH, config.WINDOW_HEIGHT, X_OFFSET, Y_OFFSET, STEP, config.THRESHOLD)
+        self.setSnakeCoordinates(list(self.snakeCoordinates))
+
+    def snapshot(self) -> bytes:
+        """
+            Returns the whole state of the game packed into a small bytes
+            buffer (see GameState), to pause, checkpoint or fork the game.
+        """
+        return GameState.capture(self).toBytes()
+
+    def restore(self, snapshot: bytes) -> None:
+        """
+            Puts the game back in the state of a snapshot.
+        """
+        GameState.fromBuffer(snapshot).applyTo(self)
+
+    @classmethod
+    def fromSnapshot(cls, snapshot: bytes, eventManager: EventManager = None, bodyModel: type = SnakeBody) -> "Game":
+        """
+            Creates a new game in the state of a snapshot.
+        """
+        state = GameState.fromBuffer(snapshot)
+        config = state.config or DEFAULT_CONFIG._replace(WINDOW_WIDTH=state.WINDOW_WIDTH, WINDOW_HEIGHT=state.WINDOW_HEIGHT)
+        game = cls.fromConfig(eventManager or EventManager(), config, bodyModel=bodyModel)
+        state.applyTo(game)
+        return game
 
     def calculateNewCoordinates(self) -> tuple:
         """
@@ -107,18 +329,19 @@ class Game():
             coordinates list based on the movement
             direction and the current coordinate of 
             head of the snake.
-            It is used by the move() method.    
+            It is used by the move() method, after it has
+            set appliedDirection.
         """
         lastX, lastY = self.snakeCoordinates[-1]
         newCoordinates = None
         # check the snakes direction
-        if self.direction == "Left":
+        if self.appliedDirection == "Left":
             newCoordinates = (lastX - 10, lastY)
-        elif self.direction == "Right":
+        elif self.appliedDirection == "Right":
             newCoordinates = (lastX + 10, lastY)
-        elif self.direction == "Up":
+        elif self.appliedDirection == "Up":
             newCoordinates = (lastX, lastY - 10)
-        elif self.direction == "Down":
+        elif self.appliedDirection == "Down":
             newCoordinates = (lastX, lastY + 10)    
 
         return newCoordinates
@@ -135,30 +358,313 @@ class Game():
         x, y = snakeCoordinates
         if x < 0 or x > self.WINDOW_WIDTH or y < 0 or y > self.WINDOW_HEIGHT: # checking if snake is off the screen
             self.gameNotOver = False
-            gameOverEvent = GameOverEvent()
-            self.eventManager.Post(gameOverEvent)
+            self.eventManager.Post(GAME_OVER_EVENT)
 
         if snakeCoordinates in self.snakeCoordinates: # checking if snake tried to eat itself
             self.gameNotOver = False
-            gameOverEvent = GameOverEvent()
-            self.eventManager.Post(gameOverEvent)
+            self.eventManager.Post(GAME_OVER_EVENT)
 
     def createNewPrey(self) -> None:
         """ 
-            This methods randomly picks an x and a y as the coordinate 
-            of the new prey and uses that to calculate the 
+            This methods randomly picks a cell of the grid the snake
+            moves on, that the snake is not covering, as the coordinate
+            (x, y) of the new prey and uses that to calculate the 
             coordinates (x - 5, y - 5, x + 5, y + 5). 
-            It then adds a "prey" task to the queue with the calculated
-            rectangle coordinates as its value. This is used by the 
-            queue handler to represent the new prey.                    
-            To make playing the game easier, set the x and y to be THRESHOLD
-            away from the walls. 
-        """
-       
-        THRESHOLD = 15   # sets how close prey can be to borders
-        x, y = random.randint(0 + THRESHOLD, self.WINDOW_WIDTH - THRESHOLD), random.randint(0 + THRESHOLD, self.WINDOW_HEIGHT - THRESHOLD) # random x and y coordinates for new prey      
+            It then posts a CreateNewPreyEvent; the view reads the
+            rectangle coordinates to represent the new prey.
+            To make playing the game easier, the x and y are at least
+            THRESHOLD away from the walls.
+            If no cell is free, the snake has filled the board: there is
+            no prey any more and the game is over, won.
+        """
+        cell = self.freeCells.sample(self.random) # random free cell for the new prey
+        if cell is None:
+            self.preyCoordinates = tuple()
+            self.gameNotOver = False
+            self.eventManager.Post(GAME_OVER_EVENT)
+            return
+        x, y = cell
         preyCoordinates = (x - 5, y - 5, x + 5, y + 5) # prey coordinates
         self.preyCoordinates = preyCoordinates 
 
-        createNewPreyEvent = CreateNewPreyEvent()
-        self.eventManager.Post(createNewPreyEvent)   
\ No newline at end of file
+        self.eventManager.Post(CREATE_NEW_PREY_EVENT)
+
+
+class GameState():
+    """
+        A compact copy of the state of a Game: integers for the direction
+        and flags, and the snake and prey coordinates as array('h')
+        (2 bytes per number instead of a tuple of ints per point).
+        It packs into a small bytes buffer with toBytes(); fromBuffer()
+        reads one back without copying the snake coordinates.
+        The layout is a HEADER, the CONFIG if FLAG_CONFIG is set, then the
+        snake, tail first, as little endian int16 x, y pairs. Buffers
+        written before the flags other than FLAG_GAME_NOT_OVER existed
+        have a prey and no config.
+    """
+    __slots__ = ("WINDOW_WIDTH", "WINDOW_HEIGHT", "tickCount", "score", "direction", "gameNotOver", "rngState", "prey", "body", "config")
+    HEADER = struct.Struct("<HHIiBBQ4hI") # width, height, tick, score, direction code, flags, rng state, prey, snake length
+    CONFIG = struct.Struct("<dhh")        # SPEED, COLLISION_PROXIMITY, THRESHOLD
+    FLAG_GAME_NOT_OVER = 1
+    FLAG_NO_PREY = 2 # the prey in the header is zeros
+    FLAG_CONFIG = 4
+
+    def __init__(self, WINDOW_WIDTH: int, WINDOW_HEIGHT: int, tickCount: int, score: int, direction: int, 
+        gameNotOver: bool, rngState: int, prey, body, config: GameConfig = None) -> None:
+        self.WINDOW_WIDTH = WINDOW_WIDTH
+        self.WINDOW_HEIGHT = WINDOW_HEIGHT
+        self.tickCount = tickCount
+        self.score = score
+        self.direction = direction # index into DIRECTIONS
+        self.gameNotOver = gameNotOver
+        self.rngState = rngState
+        self.prey = prey # (x1, y1, x2, y2) of the prey rectangle, or None if there is no prey
+        self.body = body # x1, y1, x2, y2, ... from tail to head, an array('h') or a memoryview of one
+        self.config = config # None if unknown
+
+    @classmethod
+    def capture(cls, game: Game) -> "GameState":
+        body = array("h")
+        for point in game.snakeCoordinates:
+            body.extend(point)
+        prey = array("h", game.preyCoordinates) if game.preyCoordinates else None
+        return cls(game.WINDOW_WIDTH, game.WINDOW_HEIGHT, game.tickCount, game.score, DIRECTIONS.index(game.appliedDirection),
+            game.gameNotOver, game.random.state, prey, body, game.config)
+
+    def applyTo(self, game: Game) -> None:
+        """
+            Puts a game in this state, and in its config if it has one.
+            Without a config, the game must have the same board size.
+        """
+        if self.config is not None and self.config != game.config:
+            game.configure(self.config)
+        game.tickCount = self.tickCount
+        game.score = self.score
+        game.direction = game.appliedDirection = DIRECTIONS[self.direction]
+        game.gameNotOver = self.gameNotOver
+        game.inputs.clear()
+        game.random.state = self.rngState
+        game.preyCoordinates = tuple(self.prey) if self.prey is not None else tuple()
+        body = self.body
+        game.setSnakeCoordinates(zip(body[0::2], body[1::2]))
+
+    def toBytes(self) -> bytes:
+        body = self.body if isinstance(self.body, array) else array("h", self.body)
+        if sys.byteorder == "big":
+            body = array("h", body)
+            body.byteswap()
+        flags = (self.FLAG_GAME_NOT_OVER if self.gameNotOver else 0) | (self.FLAG_NO_PREY if self.prey is None else 0)
+        config = b""
+        if self.config is not None:
+            flags |= self.FLAG_CONFIG
+            config = self.CONFIG.pack(self.config.SPEED, self.config.COLLISION_PROXIMITY, self.config.THRESHOLD)
+        return self.HEADER.pack(self.WINDOW_WIDTH, self.WINDOW_HEIGHT, self.tickCount, self.score, self.direction,
+            flags, self.rngState, *(self.prey if self.prey is not None else (0, 0, 0, 0)), len(body) // 2) + config + body.tobytes()
+
+    @classmethod
+    def fromBuffer(cls, buffer: Union[bytes, bytearray, memoryview]) -> "GameState":
+        """
+            Reads a state packed by toBytes(). On little endian machines the
+            snake coordinates are a view into the buffer rather than a copy.
+        """
+        width, height, tick, score, direction, flags, rngState, *prey, length = cls.HEADER.unpack_from(buffer)
+        start = cls.HEADER.size
+        config = None
+        if flags & cls.FLAG_CONFIG:
+            speed, proximity, threshold = cls.CONFIG.unpack_from(buffer, start)
+            config = GameConfig(speed, proximity, threshold, width, height)
+            start += cls.CONFIG.size
+        view = memoryview(buffer)[start:start + 4 * length]
+        if sys.byteorder == "big":
+            body = array("h", view.tobytes())
+            body.byteswap()
+        else:
+            body = view.cast("h")
+        return cls(width, height, tick, score, direction, bool(flags & cls.FLAG_GAME_NOT_OVER), rngState,
+            None if flags & cls.FLAG_NO_PREY else array("h", prey), body, config)
+
+    @classmethod
+    def packedSize(cls, buffer: Union[bytes, bytearray, memoryview], offset: int = 0) -> int:
+        """
+            Returns the size of the packed state starting at offset.
+        """
+        header = cls.HEADER.unpack_from(buffer, offset)
+        return cls.HEADER.size + (cls.CONFIG.size if header[5] & cls.FLAG_CONFIG else 0) + 4 * header[-1]
+
+
+class BatchGame():
+    '''
+        This class runs many headless games at once.
+        The state of every game lives in NumPy arrays and all games
+        are advanced together by a single vectorized step() call,
+        following the same rules as Game.move, Game.calculateNewCoordinates,
+        Game.isGameOver and Game.createNewPrey.
+    '''
+    def __init__(self, numberOfGames: int, WINDOW_WIDTH: int, WINDOW_HEIGHT: int, seed: int = None, config: GameConfig = None):
+        """
+            The initializer allocates the arrays holding the state of all
+            games and resets them to the starting position.
+            Snake coordinates are stored as grid cells; a cell (column, row)
+            is the pixel (X_OFFSET + STEP * column, Y_OFFSET + STEP * row).
+            config holds the gameplay constants, as in Game.
+        """
+        global np
+        if np is None:
+            try:
+                import numpy as np
+            except ImportError:
+                raise ImportError("BatchGame requires numpy") from None
+        self.numberOfGames = numberOfGames
+        self.config = config = configForBoard(config, WINDOW_WIDTH, WINDOW_HEIGHT)
+        self.COLLISION_PROXIMITY = config.COLLISION_PROXIMITY # same as in Game.move
+        self.WINDOW_WIDTH = WINDOW_WIDTH
+        self.WINDOW_HEIGHT = WINDOW_HEIGHT
+        self.random = np.random.default_rng(seed)
+
+        self.columns = (WINDOW_WIDTH - X_OFFSET) // STEP + 1
+        self.rows = (WINDOW_HEIGHT - Y_OFFSET) // STEP + 1
+        self.capacity = self.columns * self.rows + 1 # the snake can never be longer than the board
+
+        self.columnSteps = np.array([dx // STEP for dx, dy in DIRECTION_STEPS], dtype=np.int16)
+        self.rowSteps = np.array([dy // STEP for dx, dy in DIRECTION_STEPS], dtype=np.int16)
+
+        # body ring buffers, the head of game i is at bodyColumns[i, headIndex[i]]
+        self.bodyColumns = np.zeros((numberOfGames, self.capacity), dtype=np.int16)
+        self.bodyRows = np.zeros((numberOfGames, self.capacity), dtype=np.int16)
+        self.headIndex = np.zeros(numberOfGames, dtype=np.int64)
+        self.length = np.zeros(numberOfGames, dtype=np.int64)
+        self.occupancy = np.zeros((numberOfGames, self.rows, self.columns), dtype=np.uint8)
+        #cells a prey can be placed on (flat indices row * columns + column), as Game.freeCells
+        self.preyCells = np.array([(y - Y_OFFSET) // STEP * self.columns + (x - X_OFFSET) // STEP 
+            for x, y in gridCells(WINDOW_WIDTH, WINDOW_HEIGHT, X_OFFSET, Y_OFFSET, STEP, config.THRESHOLD)], dtype=np.int64)
+
+        self.direction = np.zeros(numberOfGames, dtype=np.int8)
+        self.preyX = np.zeros(numberOfGames, dtype=np.int64) # centre of the prey
+        self.preyY = np.zeros(numberOfGames, dtype=np.int64)
+        self.score = np.zeros(numberOfGames, dtype=np.int64)
+        self.ticks = np.zeros(numberOfGames, dtype=np.int64)
+        self.alive = np.zeros(numberOfGames, dtype=bool)
+        self.reset()
+
+    @classmethod
+    def fromConfig(cls, numberOfGames: int, config: GameConfig, seed: int = None) -> "BatchGame":
+        """
+            Creates the games on a board of the size the config gives.
+            Raises ValueError if the config cannot be played.
+        """
+        config.validate()
+        return cls(numberOfGames, config.WINDOW_WIDTH, config.WINDOW_HEIGHT, seed, config)
+
+    def reset(self) -> None:
+        """
+            This method puts every game back to the starting position
+            and creates a new prey for each of them.
+        """
+        self.occupancy.fill(0)
+        for i, (x, y) in enumerate(INITIAL_SNAKE):
+            column, row = (x - X_OFFSET) // STEP, (y - Y_OFFSET) // STEP
+            self.bodyColumns[:, i] = column
+            self.bodyRows[:, i] = row
+            self.occupancy[:, row, column] = 1
+        self.headIndex.fill(len(INITIAL_SNAKE) - 1)
+        self.length.fill(len(INITIAL_SNAKE))
+        self.direction.fill(DIRECTIONS.index("Left"))
+        self.score.fill(0)
+        self.ticks.fill(0)
+        self.alive.fill(True)
+        self.createNewPrey(np.arange(self.numberOfGames))
+
+    def createNewPrey(self, games) -> None:
+        """
+            This method places a new prey for the given games on a random
+            cell that is THRESHOLD away from the walls and not covered by
+            the snake. Random cells are tried a few times for all games
+            at once; the rare games that are left pick from their exact
+            list of free cells. As in Game.createNewPrey, a game without
+            a free cell is over.
+        """
+        PICKS = 8 # random tries before listing the free cells
+        games = np.asarray(games)
+        for _ in range(PICKS):
+            if not len(games):
+                return
+            cells = self.preyCells[self.random.integers(0, len(self.preyCells), size=len(games))]
+            rows, columns = np.divmod(cells, self.columns)
+            free = self.occupancy[games, rows, columns] == 0
+            self.setPrey(games[free], rows[free], columns[free])
+            games = games[~free]
+        for game in games:
+            cells = self.preyCells[self.occupancy[game].ravel()[self.preyCells] == 0]
+            if len(cells):
+                row, column = divmod(int(cells[self.random.integers(0, len(cells))]), self.columns)
+                self.setPrey(game, row, column)
+            else: # the snake filled the board
+                self.alive[game] = False
+
+    def setPrey(self, games, rows, columns) -> None:
+        self.preyX[games] = X_OFFSET + STEP * columns
+        self.preyY[games] = Y_OFFSET + STEP * rows
+
+    def step(self, actions=None):
+        """
+            This method advances every game that is still running by one tick.
+            actions holds one direction code (an index into DIRECTIONS) per
+            game, or -1 to keep the current direction. As in
+            Game.whenAnArrowKeyIsPressed, reversing into the body is ignored.
+            It returns the alive mask.
+        """
+        if actions is not None:
+            actions = np.asarray(actions)
+            valid = (actions >= 0) & (actions != (self.direction ^ 1)) & self.alive
+            self.direction[valid] = actions[valid]
+
+        games = np.flatnonzero(self.alive)
+        if len(games) == 0:
+            return self.alive
+
+        # calculate the new head of every running game
+        direction = self.direction[games]
+        headIndex = self.headIndex[games]
+        columns = self.bodyColumns[games, headIndex] + self.columnSteps[direction]
+        rows = self.bodyRows[games, headIndex] + self.rowSteps[direction]
+
+        # check if the game is over, the tail still counts as part of the body
+        inside = (columns >= 0) & (columns < self.columns) & (rows >= 0) & (rows < self.rows)
+        over = ~inside
+        over[inside] = self.occupancy[games[inside], rows[inside], columns[inside]] != 0
+        self.alive[games[over]] = False
+        self.ticks[games[over]] += 1 # Game.tickCount counts the fatal move too
+
+        running = ~over
+        games, columns, rows = games[running], columns[running], rows[running]
+        headIndex = (headIndex[running] + 1) % self.capacity
+        self.bodyColumns[games, headIndex] = columns
+        self.bodyRows[games, headIndex] = rows
+        self.headIndex[games] = headIndex
+        self.occupancy[games, rows, columns] = 1
+        self.ticks[games] += 1
+
+        # grow the snakes that ate their prey, move the tail of the others
+        x = X_OFFSET + STEP * columns.astype(np.int64)
+        y = Y_OFFSET + STEP * rows.astype(np.int64)
+        eaten = (np.abs(x - self.preyX[games]) < self.COLLISION_PROXIMITY) & (np.abs(y - self.preyY[games]) < self.COLLISION_PROXIMITY)
+
+        fed = games[eaten]
+        self.score[fed] += 1
+        self.length[fed] += 1
+        self.createNewPrey(fed)
+
+        moved = games[~eaten]
+        tailIndex = (headIndex[~eaten] - self.length[moved]) % self.capacity
+        self.occupancy[moved, self.bodyRows[moved, tailIndex], self.bodyColumns[moved, tailIndex]] = 0
+
+        return self.alive
+
+    def snakeCoordinates(self, game: int) -> list:
+        """
+            Returns the snake of one game as a list of pixel coordinates,
+            from tail to head, like Game.snakeCoordinates.
+        """
+        length, headIndex = int(self.length[game]), int(self.headIndex[game])
+        indices = [(headIndex - length + 1 + i) % self.capacity for i in range(length)]
+        return [(X_OFFSET + STEP * int(self.bodyColumns[game, i]), Y_OFFSET + STEP * int(self.bodyRows[game, i])) for i in indices]
@@ -0,0 +1,143 @@
+import json
+import threading
+import time
+from functools import wraps
+from typing import Callable, Dict
+
+from metrics import Histogram
+
+
+class Profiler():
+    """
+        Times the hot paths of the game: Game.move, EventManager.Post and
+        each Gui event handler. attach() replaces those methods on the given
+        instances by timed wrappers and detach() puts the originals back, so
+        when the profiler is not attached the game runs exactly the code it
+        runs without one.
+        The timings go into histograms that are never reset. Each consumer
+        (the HUD, the exporter) reads them through its own ProfileWindow,
+        so closing a window for one does not take the timings from another.
+    """
+    def __init__(self, windowSeconds: float = 1.0) -> None:
+        self.windowSeconds = windowSeconds # default length of the windows
+        self.histograms: Dict[str, Histogram] = {}
+        self.patched = [] # (object, attribute name, original) to restore on detach
+
+    def timed(self, name: str, function: Callable) -> Callable:
+        """
+            Returns a wrapper of function that records its duration under name.
+        """
+        histogram = self.histograms.setdefault(name, Histogram())
+        clock = time.perf_counter
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            start = clock()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                histogram.record(clock() - start)
+        return wrapper
+
+    def patch(self, target: object, attribute: str, name: str) -> None:
+        original = getattr(target, attribute)
+        self.patched.append((target, attribute, target.__dict__.get(attribute)))
+        setattr(target, attribute, self.timed(name, original))
+
+    def attach(self, game=None, eventManager=None, gui=None) -> None:
+        if game is not None:
+            self.patch(game, "move", "Game.move")
+        if eventManager is not None:
+            self.patch(eventManager, "Post", "EventManager.Post")
+        if gui is not None:
+            for eventClass, handler in list(gui.eventHandlers.items()):
+                self.patched.append((gui.eventHandlers, eventClass, handler))
+                gui.eventHandlers[eventClass] = self.timed(f"Gui.notify[{eventClass.__name__}]", handler)
+
+    def detach(self) -> None:
+        for target, attribute, original in reversed(self.patched):
+            if isinstance(target, dict):
+                target[attribute] = original
+            elif original is None:
+                delattr(target, attribute) # the method came from the class
+            else:
+                setattr(target, attribute, original)
+        self.patched = []
+
+    def window(self, windowSeconds: float = None) -> "ProfileWindow":
+        """
+            Returns a new window on the timings, for one consumer.
+        """
+        return ProfileWindow(self, windowSeconds or self.windowSeconds)
+
+
+class ProfileWindow():
+    """
+        One consumer's view of a Profiler: it remembers a copy of the
+        histograms taken when its last window closed, and rollover()
+        summarizes what was recorded since. The summaries of the last
+        closed window are in lastWindow.
+    """
+    def __init__(self, profiler: Profiler, windowSeconds: float) -> None:
+        self.profiler = profiler
+        self.windowSeconds = windowSeconds
+        self.windowStart = time.perf_counter()
+        self.start = self.copyHistograms()
+        self.lastWindow: Dict[str, dict] = {}
+        self.lastWindowSeconds = windowSeconds
+
+    def copyHistograms(self) -> Dict[str, Histogram]:
+        return {name: histogram.copy() for name, histogram in list(self.profiler.histograms.items())}
+
+    def rollover(self, force: bool = False) -> bool:
+        """
+            Closes the current window if it is windowSeconds old (or if
+            force is set) and starts a new one. Returns whether it did.
+        """
+        now = time.perf_counter()
+        if not force and now - self.windowStart < self.windowSeconds:
+            return False
+        current = self.copyHistograms()
+        self.lastWindowSeconds = now - self.windowStart
+        self.lastWindow = {name: histogram.since(self.start.get(name) or Histogram()).summary()
+            for name, histogram in current.items()}
+        self.start = current
+        self.windowStart = now
+        return True
+
+    def rate(self, name: str) -> float:
+        """
+            Calls per second of name in the last window.
+        """
+        return self.lastWindow.get(name, {}).get("count", 0) / self.lastWindowSeconds
+
+
+class MetricsExporter():
+    """
+        Appends what the profiler timed in the last interval seconds to a
+        file as one JSON line, on a background thread.
+    """
+    def __init__(self, profiler: Profiler, path: str, interval: float = 5.0, extra: Callable[[], dict] = None) -> None:
+        self.profiler = profiler
+        self.window = profiler.window(interval)
+        self.path = path
+        self.interval = interval
+        self.extra = extra # returns more values to export, such as the snake length
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def start(self) -> None:
+        self.thread.start()
+
+    def stop(self) -> None:
+        self.stopped.set()
+        self.thread.join()
+
+    def run(self) -> None:
+        with open(self.path, "a") as file:
+            while not self.stopped.wait(self.interval):
+                self.window.rollover(force=True)
+                record = {"time": time.time(), "window": self.window.lastWindowSeconds, "metrics": self.window.lastWindow}
+                if self.extra is not None:
+                    record.update(self.extra())
+                file.write(json.dumps(record) + "\n")
+                file.flush()
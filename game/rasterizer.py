@@ -0,0 +1,283 @@
+"""
+    Draws games into RGB frames with NumPy, the way Gui shows them but
+    without Tk, to export them as image sequences or raw video.
+
+    Usage:
+        python rasterizer.py game.snkr --format raw | ffmpeg -f rawvideo -pix_fmt rgb24 -s 500x300 -r 20 -i - game.mp4
+        python rasterizer.py game.snkr --format ppm --output frames/%06d.ppm
+        python rasterizer.py --autopilot --seed 1 --format raw --output game.rgb
+"""
+
+import argparse
+import sys
+import time
+from typing import BinaryIO, Iterable, Iterator, Optional, Tuple
+
+import numpy as np
+
+from display import BACKGROUND_COLOUR, ICON_COLOUR, SNAKE_ICON_WIDTH
+from event_manager import EventManager
+from model import DEFAULT_CONFIG, Game, KeyPress
+
+# (snake coordinates from tail to head, prey rectangle, score)
+FrameState = Tuple[Iterable[Tuple[int, int]], Tuple[int, int, int, int], int]
+
+COLOURS = {
+    "black": (0, 0, 0),
+    "white": (255, 255, 255),
+    "green": (0, 128, 0),
+    "yellow": (255, 255, 0),
+    "red": (255, 0, 0),
+    "blue": (0, 0, 255)}
+
+# 3x5 glyphs of the characters of the score text, one string per row
+GLYPHS = {
+    " ": ("   ", "   ", "   ", "   ", "   "),
+    ":": ("   ", " # ", "   ", " # ", "   "),
+    "Y": ("# #", "# #", " # ", " # ", " # "),
+    "o": ("   ", "###", "# #", "# #", "###"),
+    "u": ("   ", "# #", "# #", "# #", "###"),
+    "r": ("   ", "## ", "#  ", "#  ", "#  "),
+    "S": ("###", "#  ", "###", "  #", "###"),
+    "c": ("   ", "###", "#  ", "#  ", "###"),
+    "e": ("   ", "###", "###", "#  ", "###"),
+    "0": ("###", "# #", "# #", "# #", "###"),
+    "1": (" # ", "## ", " # ", " # ", "###"),
+    "2": ("###", "  #", "###", "#  ", "###"),
+    "3": ("###", "  #", "###", "  #", "###"),
+    "4": ("# #", "# #", "###", "  #", "  #"),
+    "5": ("###", "#  ", "###", "  #", "###"),
+    "6": ("###", "#  ", "###", "# #", "###"),
+    "7": ("###", "  #", "  #", "  #", "  #"),
+    "8": ("###", "# #", "###", "# #", "###"),
+    "9": ("###", "# #", "###", "  #", "###")}
+
+
+def colourToRgb(colour: str) -> Tuple[int, int, int]:
+    """
+        Converts a Tk colour name (of the few in COLOURS) or "#rrggbb" to RGB.
+    """
+    if colour.startswith("#") and len(colour) == 7:
+        return tuple(int(colour[i:i + 2], 16) for i in (1, 3, 5))
+    try:
+        return COLOURS[colour]
+    except KeyError:
+        raise ValueError(f"unknown colour {colour!r}") from None
+
+
+class FrameRasterizer():
+    """
+        This class draws game states into a batch of preallocated frames,
+        height x width x RGB arrays of uint8, like Gui draws the canvas:
+        the background, the snake as a line SNAKE_ICON_WIDTH wide with
+        round joins, the prey rectangle and the score text.
+        The snake is drawn as one rectangle per straight run plus round
+        joins at its turns, so a frame costs a few NumPy operations per
+        turn, not per cell, and the pixels of the joins and the text are
+        offsets computed once.
+        The frames are reused by every batch, so nothing is allocated
+        per frame; copy a frame to keep it past the next render().
+    """
+    SCORE_POSITION = (60, 15) # centre of the score text, as in Gui
+    SCORE_SCALE = 2 # pixels per glyph dot
+
+    def __init__(self, WINDOW_WIDTH: int, WINDOW_HEIGHT: int, BACKGROUND_COLOUR: str, ICON_COLOUR: str,
+        SNAKE_ICON_WIDTH: int, textColour: str = "white", batchSize: int = 64) -> None:
+        self.WINDOW_WIDTH = WINDOW_WIDTH
+        self.WINDOW_HEIGHT = WINDOW_HEIGHT
+        self.batchSize = batchSize
+        self.frames = np.empty((batchSize, WINDOW_HEIGHT, WINDOW_WIDTH, 3), dtype=np.uint8)
+        self.background = np.empty((WINDOW_HEIGHT, WINDOW_WIDTH, 3), dtype=np.uint8)
+        self.background[:] = colourToRgb(BACKGROUND_COLOUR)
+        self.iconColour = np.array(colourToRgb(ICON_COLOUR), dtype=np.uint8)
+        self.iconRow = np.tile(self.iconColour, (WINDOW_WIDTH, 1)) # filling with whole rows is much faster than broadcasting a colour
+        self.textColour = np.array(colourToRgb(textColour), dtype=np.uint8)
+
+        # offsets (dx, dy) of the pixels of the round join drawn at the turns and ends of the snake
+        self.half = (SNAKE_ICON_WIDTH - 1) // 2
+        radius = SNAKE_ICON_WIDTH / 2
+        span = np.arange(-self.half, self.half + 1)
+        dx, dy = np.meshgrid(span, span)
+        disc = dx ** 2 + dy ** 2 <= radius ** 2
+        self.pointOffsets = np.stack([dx[disc], dy[disc]], axis=1)
+        self.text = None # (score, pixel coordinates) of the last score text drawn
+
+    def stamp(self, frame: np.ndarray, anchors: np.ndarray, offsets: np.ndarray, colour: np.ndarray) -> None:
+        """
+            Colours the pixels anchors + offsets (all pairs) that are on the frame.
+        """
+        xs = (anchors[:, 0:1] + offsets[:, 0]).ravel()
+        ys = (anchors[:, 1:2] + offsets[:, 1]).ravel()
+        inside = (xs >= 0) & (xs < self.WINDOW_WIDTH) & (ys >= 0) & (ys < self.WINDOW_HEIGHT)
+        frame[ys[inside], xs[inside]] = colour
+
+    def fill(self, frame: np.ndarray, x1: int, y1: int, x2: int, y2: int) -> None:
+        """
+            Colours the rectangle [x1, x2) x [y1, y2), clipped to the frame.
+        """
+        x1, y1 = max(0, x1), max(0, y1)
+        x2, y2 = min(self.WINDOW_WIDTH, x2), min(self.WINDOW_HEIGHT, y2)
+        if x1 < x2 and y1 < y2:
+            frame[y1:y2, x1:x2] = self.iconRow[:x2 - x1]
+
+    def textPixels(self, score: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+            Returns the pixel coordinates (ys, xs) of the score text.
+        """
+        if self.text is None or self.text[0] != score:
+            text = f"Your Score: {score}"
+            scale = self.SCORE_SCALE
+            width, height = (4 * len(text) - 1) * scale, 5 * scale
+            left, top = self.SCORE_POSITION[0] - width // 2, self.SCORE_POSITION[1] - height // 2
+            ys, xs = [], []
+            for i, character in enumerate(text):
+                for row, line in enumerate(GLYPHS.get(character, GLYPHS[" "])):
+                    for column, dot in enumerate(line):
+                        if dot == "#":
+                            for sy in range(scale):
+                                for sx in range(scale):
+                                    ys.append(top + row * scale + sy)
+                                    xs.append(left + (4 * i + column) * scale + sx)
+            ys, xs = np.array(ys, dtype=np.intp), np.array(xs, dtype=np.intp)
+            inside = (xs >= 0) & (xs < self.WINDOW_WIDTH) & (ys >= 0) & (ys < self.WINDOW_HEIGHT)
+            self.text = (score, ys[inside], xs[inside])
+        return self.text[1], self.text[2]
+
+    def draw(self, frame: np.ndarray, state: FrameState) -> None:
+        """
+            Draws one game state into a frame.
+        """
+        snake, prey, score = state
+        np.copyto(frame, self.background)
+
+        points = np.asarray(snake if isinstance(snake, np.ndarray) else list(snake), dtype=np.intp).reshape(-1, 2)
+        if len(points):
+            # the snake's straight runs are filled as rectangles, its turns and ends get round joins
+            vectors = points[1:] - points[:-1]
+            turns = np.flatnonzero((vectors[1:] != vectors[:-1]).any(axis=1)) + 1
+            corners = points[np.concatenate(([0], turns, [len(points) - 1]))]
+            self.stamp(frame, corners, self.pointOffsets, self.iconColour)
+            half = self.half
+            for (x1, y1), (x2, y2) in zip(corners[:-1].tolist(), corners[1:].tolist()):
+                if y1 == y2:
+                    self.fill(frame, min(x1, x2), y1 - half, max(x1, x2) + 1, y1 + half + 1)
+                elif x1 == x2:
+                    self.fill(frame, x1 - half, min(y1, y2), x1 + half + 1, max(y1, y2) + 1)
+
+        if prey:
+            x1, y1, x2, y2 = (int(value) for value in prey)
+            self.fill(frame, x1, y1, x2 + 1, y2 + 1)
+
+        ys, xs = self.textPixels(score)
+        frame[ys, xs] = self.textColour
+
+    def render(self, states: Iterable[FrameState]) -> np.ndarray:
+        """
+            Draws up to batchSize states and returns the frames, a view
+            into the reused buffer.
+        """
+        count = 0
+        for state in states:
+            self.draw(self.frames[count], state)
+            count += 1
+        return self.frames[:count]
+
+    def batches(self, states: Iterable[FrameState]) -> Iterator[np.ndarray]:
+        """
+            Renders a stream of states batchSize frames at a time.
+        """
+        states = iter(states)
+        while True:
+            frames = self.render(state for _, state in zip(range(self.batchSize), states))
+            if not len(frames):
+                return
+            yield frames
+
+
+def gameStates(game: Game, policy=None, maxTicks: int = None) -> Iterator[FrameState]:
+    """
+        Plays a headless game, steered by a tournament style policy, and
+        yields its state before the first move and after every move.
+    """
+    if not game.preyCoordinates:
+        game.createNewPrey()
+    yield (list(game.snakeCoordinates), game.preyCoordinates, game.score)
+    while game.gameNotOver and (maxTicks is None or game.tickCount < maxTicks):
+        if policy is not None:
+            direction = policy(game)
+            if direction is not None:
+                game.whenAnArrowKeyIsPressed(KeyPress(direction))
+        game.move()
+        yield (list(game.snakeCoordinates), game.preyCoordinates, game.score)
+
+
+def replayStates(player, maxTicks: int = None) -> Iterator[FrameState]:
+    """
+        Yields the state of a replay.ReplayPlayer game at every tick.
+    """
+    game = player.game
+    yield (list(game.snakeCoordinates), game.preyCoordinates, game.score)
+    while game.gameNotOver and (maxTicks is None or game.tickCount < maxTicks):
+        player.step()
+        yield (list(game.snakeCoordinates), game.preyCoordinates, game.score)
+
+
+def writeRaw(file: BinaryIO, frames: np.ndarray) -> None:
+    """
+        Writes frames as raw rgb24 video, for example to ffmpeg's standard input.
+    """
+    file.write(memoryview(np.ascontiguousarray(frames)).cast("B"))
+
+
+def writePpm(pattern: str, index: int, frame: np.ndarray) -> None:
+    """
+        Writes one frame as a binary PPM image to pattern % index.
+    """
+    height, width, _ = frame.shape
+    with open(pattern % index, "wb") as file:
+        file.write(b"P6 %d %d 255\n" % (width, height))
+        file.write(memoryview(frame).cast("B"))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export a game as images or raw video")
+    parser.add_argument("replay", nargs="?", help="replay file to export (default: play a new game)")
+    parser.add_argument("--seed", type=int, help="seed of the new game")
+    parser.add_argument("--autopilot", action="store_true", help="let the bot play the new game")
+    parser.add_argument("--max-ticks", type=int, help="stop after this many ticks")
+    parser.add_argument("--format", choices=("raw", "ppm"), default="raw")
+    parser.add_argument("--output", default="-", help="file for raw video (- for standard output), or a pattern like frames/%%06d.ppm")
+    parser.add_argument("--batch-size", type=int, default=64)
+    args = parser.parse_args()
+
+    if args.replay:
+        from replay import ReplayPlayer
+        player = ReplayPlayer(open(args.replay, "rb"))
+        width, height = player.game.WINDOW_WIDTH, player.game.WINDOW_HEIGHT
+        states = replayStates(player, args.max_ticks)
+    else:
+        game = Game.fromConfig(EventManager(), DEFAULT_CONFIG, args.seed)
+        policy = None
+        if args.autopilot:
+            from autopilot import Autopilot
+            policy = Autopilot(game)
+        width, height = game.WINDOW_WIDTH, game.WINDOW_HEIGHT
+        states = gameStates(game, policy, args.max_ticks)
+
+    rasterizer = FrameRasterizer(width, height, BACKGROUND_COLOUR, ICON_COLOUR, SNAKE_ICON_WIDTH, batchSize=args.batch_size)
+    output: Optional[BinaryIO] = None
+    if args.format == "raw":
+        output = sys.stdout.buffer if args.output == "-" else open(args.output, "wb")
+    start = time.perf_counter()
+    count = 0
+    for frames in rasterizer.batches(states):
+        if output is not None:
+            writeRaw(output, frames)
+        else:
+            for i, frame in enumerate(frames):
+                writePpm(args.output, count + i, frame)
+        count += len(frames)
+    if output is not None:
+        output.flush()
+    elapsed = time.perf_counter() - start
+    print(f"{count} frames of {width}x{height} in {elapsed:.2f}s ({count / elapsed:.0f} frames/s)", file=sys.stderr)
@@ -0,0 +1,62 @@
+"""
+    Renderer backends show a game while it runs and feed it the player's
+    key presses. Each backend lives in its own module, which is only
+    imported when that backend is selected, so a headless game never
+    loads tkinter or curses.
+        tk          a Tk window (view.Gui)
+        terminal    the game drawn with curses in the terminal
+        null        nothing is shown, the game runs in the calling thread
+"""
+
+import importlib
+from typing import Callable
+
+from event_manager import EventManager
+from model import Game
+from scheduler import FixedTimestepScheduler
+
+
+BACKENDS = {
+    "tk": "view:TkRenderer",
+    "terminal": "terminal_view:TerminalRenderer",
+    "null": "renderers:NullRenderer"}
+
+
+class Renderer():
+    """
+        The interface of a renderer backend. The constructor sets up the
+        display; options a backend has no use for are ignored, so every
+        backend can be given the same ones.
+    """
+    def __init__(self, game: Game, eventManager: EventManager, **options) -> None:
+        self.game = game
+        self.eventManager = eventManager
+
+    def run(self, run: Callable[[FixedTimestepScheduler], None], scheduler: FixedTimestepScheduler) -> None:
+        """
+            Plays the game by calling run(scheduler) (Game.superloop or
+            ReplayPlayer.play) and shows it until the display is closed.
+        """
+        raise NotImplementedError
+
+    def summary(self) -> str:
+        """
+            Returns a line of statistics to print once the display is closed.
+        """
+        return ""
+
+
+class NullRenderer(Renderer):
+    """
+        Shows nothing: the game runs in the calling thread.
+    """
+    def run(self, run: Callable[[FixedTimestepScheduler], None], scheduler: FixedTimestepScheduler) -> None:
+        run(scheduler)
+
+
+def loadRenderer(name: str) -> type:
+    """
+        Imports the module of a backend and returns its renderer class.
+    """
+    moduleName, attribute = BACKENDS[name].split(":")
+    return getattr(importlib.import_module(moduleName), attribute)
@@ -0,0 +1,167 @@
+"""
+    Replay files are a header, the RULES of the game (since version 3),
+    and a stream of records, each one starting with a one byte tag. The
+    first record is the keyframe of the starting position.
+        b"D" tick, direction       the direction used from move number tick on
+        b"K" state                 a keyframe: a Game.snapshot() of the state after tick moves
+    All numbers are little endian.
+"""
+
+import argparse
+import struct
+import time
+from bisect import bisect_right
+from typing import BinaryIO
+
+from event_manager import *
+from model import DEFAULT_CONFIG, DIRECTIONS, Game, GameState
+from scheduler import FixedTimestepScheduler
+
+
+MAGIC = b"SNKR"
+VERSION = 3
+HEADER = struct.Struct("<4sBQHHH")      # magic, version, seed, width, height, keyframe interval
+RULES = struct.Struct("<hh")            # config COLLISION_PROXIMITY, THRESHOLD (version 2 files use the defaults)
+DIRECTION_RECORD = struct.Struct("<IB") # tick, direction code
+
+
+class ReplayRecorder():
+    """
+        This class records a game to a binary replay file as it is played.
+        Only the seed, the direction changes and a keyframe every
+        keyframeInterval ticks are written, straight to the file, so
+        nothing is buffered in memory besides the file's own buffer.
+    """
+    def __init__(self, game: Game, eventManager: EventManager, file: BinaryIO, keyframeInterval: int = 500) -> None:
+        self.game = game
+        self.file = file
+        self.keyframeInterval = keyframeInterval
+        file.write(HEADER.pack(MAGIC, VERSION, game.seed, game.WINDOW_WIDTH, game.WINDOW_HEIGHT, keyframeInterval))
+        file.write(RULES.pack(game.config.COLLISION_PROXIMITY, game.config.THRESHOLD))
+        eventManager.Subscribe(GameStartEvent, self.onGameStart)
+        eventManager.Subscribe(DirectionChangeEvent, self.onDirectionChange)
+        eventManager.Subscribe(TickEvent, self.onTick)
+        eventManager.Subscribe(GameOverEvent, self.onGameOver)
+
+    def onGameStart(self, event: GameStartEvent) -> None:
+        writeKeyframe(self.file, self.game) # the starting position, once the first prey is placed
+
+    def onDirectionChange(self, event: DirectionChangeEvent) -> None:
+        # posted by move() before the move is made, so tickCount is the number of this move
+        self.file.write(b"D" + DIRECTION_RECORD.pack(self.game.tickCount, DIRECTIONS.index(self.game.appliedDirection)))
+
+    def onTick(self, event: TickEvent) -> None:
+        if self.game.tickCount % self.keyframeInterval == 0 and self.game.gameNotOver:
+            writeKeyframe(self.file, self.game)
+
+    def onGameOver(self, event: GameOverEvent) -> None:
+        self.file.flush()
+
+
+def writeKeyframe(file: BinaryIO, game: Game) -> None:
+    """
+        Writes the full state of a game as a keyframe record.
+    """
+    file.write(b"K" + game.snapshot())
+
+
+def readKeyframe(file: BinaryIO, game: Game) -> None:
+    """
+        Reads a keyframe record (after its tag) into a game.
+    """
+    header = file.read(GameState.HEADER.size)
+    game.restore(header + file.read(GameState.packedSize(header) - len(header)))
+
+
+class ReplayPlayer():
+    """
+        This class plays a replay file back by running a Game with the
+        recorded seed and direction changes. The file is scanned once to
+        index the direction changes and the keyframe positions, so seek()
+        only has to replay the ticks after the closest keyframe.
+    """
+    def __init__(self, file: BinaryIO, eventManager: EventManager = None) -> None:
+        self.file = file
+        magic, version, self.seed, width, height, self.keyframeInterval = HEADER.unpack(file.read(HEADER.size))
+        if magic != MAGIC or version not in (2, VERSION):
+            raise ValueError("not a replay file")
+        config = DEFAULT_CONFIG._replace(WINDOW_WIDTH=width, WINDOW_HEIGHT=height)
+        if version >= 3:
+            proximity, threshold = RULES.unpack(file.read(RULES.size))
+            config = config._replace(COLLISION_PROXIMITY=proximity, THRESHOLD=threshold)
+        self.eventManager = eventManager or EventManager()
+        self.game = Game.fromConfig(self.eventManager, config, self.seed)
+
+        self.directionTicks, self.directions = [], [] # direction changes, sorted by tick
+        self.keyframeTicks, self.keyframeOffsets = [], [] # keyframe positions in the file
+        self.indexFile()
+        if not self.keyframeTicks:
+            raise ValueError("the replay file has no keyframes")
+        self.seek(0)
+
+    def indexFile(self) -> None:
+        file = self.file
+        while True:
+            tag = file.read(1)
+            if tag == b"D":
+                tick, direction = DIRECTION_RECORD.unpack(file.read(DIRECTION_RECORD.size))
+                self.directionTicks.append(tick)
+                self.directions.append(DIRECTIONS[direction])
+            elif tag == b"K":
+                offset = file.tell()
+                header = file.read(GameState.HEADER.size)
+                if len(header) < GameState.HEADER.size: # the recording was cut short
+                    break
+                self.keyframeTicks.append(GameState.HEADER.unpack(header)[2]) # tickCount
+                self.keyframeOffsets.append(offset)
+                file.seek(GameState.packedSize(header) - len(header), 1)
+            else:
+                break
+
+    def seek(self, tick: int) -> None:
+        """
+            Puts the game in the state it had after the given number of moves
+            (or at the end of the game, if that came first).
+        """
+        i = max(bisect_right(self.keyframeTicks, tick), 1) # there is always a keyframe at tick 0
+        self.file.seek(self.keyframeOffsets[i - 1])
+        readKeyframe(self.file, self.game)
+        while self.game.tickCount < tick and self.game.gameNotOver:
+            self.step()
+        self.game.publishFrame()
+
+    def step(self) -> None:
+        """
+            Plays the next move of the replay.
+        """
+        i = bisect_right(self.directionTicks, self.game.tickCount)
+        if i:
+            self.game.direction = self.directions[i - 1]
+        self.game.tick()
+
+    def play(self, scheduler: FixedTimestepScheduler = None) -> None:
+        """
+            Plays the rest of the replay, as fast as possible or at the
+            rate of the given scheduler.
+        """
+        self.eventManager.Post(GAME_START_EVENT) # the position it starts from, for a recorder
+        if scheduler is None:
+            while self.game.gameNotOver:
+                self.step()
+        else:
+            scheduler.run(self.step, lambda: self.game.gameNotOver)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Play a replay file back headless")
+    parser.add_argument("path")
+    parser.add_argument("--seek", type=int, default=0, help="start from this tick")
+    args = parser.parse_args()
+
+    with open(args.path, "rb") as file:
+        player = ReplayPlayer(file)
+        start = time.perf_counter()
+        player.seek(args.seek)
+        player.play()
+        elapsed = time.perf_counter() - start
+    print(f"Replayed {player.game.tickCount - args.seek} ticks in {elapsed:.3f}s, score: {player.game.score}")
@@ -0,0 +1,29 @@
+import random
+
+
+class SplitMix64():
+    """
+        A small seedable random number generator whose whole state is a
+        single 64-bit integer, so it can be saved and restored cheaply
+        (for example in replay keyframes).
+    """
+    MASK = (1 << 64) - 1
+
+    def __init__(self, seed: int = None) -> None:
+        self.state = (random.getrandbits(64) if seed is None else seed) & self.MASK
+
+    def next(self) -> int:
+        """
+            Returns the next random 64-bit integer.
+        """
+        self.state = (self.state + 0x9E3779B97F4A7C15) & self.MASK
+        z = self.state
+        z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & self.MASK
+        z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & self.MASK
+        return z ^ (z >> 31)
+
+    def randint(self, a: int, b: int) -> int:
+        """
+            Returns a random integer N such that a <= N <= b.
+        """
+        return a + self.next() % (b - a + 1)
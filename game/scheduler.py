@@ -0,0 +1,97 @@
+import time
+from typing import Callable
+
+from metrics import Histogram
+
+
+class FixedTimestepScheduler():
+    """
+        Runs a tick function at a fixed rate on a monotonic clock.
+        Every tick has a scheduled time that is a whole number of tick
+        periods after the start, so the time spent inside the tick
+        function does not make the game drift. If the caller falls
+        behind, the missed ticks are run back to back, up to
+        maxCatchUpTicks at once; older ticks are dropped.
+    """
+    def __init__(
+        self, 
+        tickRate: float, 
+        maxCatchUpTicks: int = 5, 
+        clock: Callable[[], float] = time.monotonic, 
+        sleep: Callable[[float], None] = time.sleep) -> None:
+        self.clock = clock
+        self.sleep = sleep
+        self.maxCatchUpTicks = maxCatchUpTicks
+        self.period = 1 / tickRate
+        self.nextTickTime = None
+        self.ticks = 0          # number of ticks run so far
+        self.droppedTicks = 0   # number of ticks skipped because we were too far behind
+        self.lastLateness = 0.0 # how late (sec) the last tick was run
+        self.lateness = Histogram()
+        self.running = False
+
+    @property
+    def tickRate(self) -> float:
+        return 1 / self.period
+
+    @tickRate.setter
+    def tickRate(self, tickRate: float) -> None:
+        """
+            Changes the tick rate. The next tick is rescheduled one
+            new period after the last one.
+        """
+        period = 1 / tickRate
+        if self.nextTickTime is not None:
+            self.nextTickTime += period - self.period
+        self.period = period
+
+    def start(self) -> None:
+        """
+            Schedules the first tick for now.
+        """
+        self.nextTickTime = self.clock()
+
+    def poll(self) -> int:
+        """
+            Returns how many ticks are due now and moves the schedule past
+            them. Use this to drive the ticks from another loop (for example
+            Tk's after() or asyncio); run() uses it as well.
+        """
+        if self.nextTickTime is None:
+            self.start()
+        now = self.clock()
+        if now < self.nextTickTime:
+            return 0
+        due = int((now - self.nextTickTime) / self.period) + 1
+        if due > self.maxCatchUpTicks:
+            self.droppedTicks += due - self.maxCatchUpTicks
+            self.nextTickTime += (due - self.maxCatchUpTicks) * self.period
+            due = self.maxCatchUpTicks
+        self.lastLateness = now - self.nextTickTime
+        self.lateness.record(self.lastLateness)
+        self.nextTickTime += due * self.period
+        self.ticks += due
+        return due
+
+    def timeUntilNextTick(self) -> float:
+        if self.nextTickTime is None:
+            return 0.0
+        return max(0.0, self.nextTickTime - self.clock())
+
+    def run(self, tick: Callable[[], None], isRunning: Callable[[], bool]) -> None:
+        """
+            Calls tick() at the tick rate for as long as isRunning()
+            returns True and stop() has not been called.
+        """
+        self.running = True
+        self.start()
+        while self.running and isRunning():
+            for _ in range(self.poll()):
+                tick()
+                if not isRunning():
+                    break
+            self.sleep(self.timeUntilNextTick())
+        self.running = False
+
+    def stop(self) -> None:
+        self.running = False
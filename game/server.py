@@ -0,0 +1,172 @@
+"""
+    Headless game server: many Game sessions driven by one asyncio event
+    loop. Clients connect over TCP or a Unix socket, send one direction
+    per line ("Left", "Right", "Up" or "Down") and receive one line of
+    state per tick:
+        tick <tick> <x> <y> <length> <score> <prey x> <prey y>
+    The snake is the last <length> heads received. When a client connects,
+    and whenever it fell too far behind to be sent every tick, a line
+        snake <x1> <y1> <x2> <y2> ...
+    with the whole snake (tail first) is sent before the next tick line.
+    The prey is "- -" once the board is full. Ticks are skipped for a
+    client that reads too slowly, except the last one: the last lines
+    sent are always the final tick and "over <score>".
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+
+from event_manager import *
+from metrics import Histogram
+from model import DEFAULT_CONFIG, DIRECTIONS, Game, KeyPress
+from scheduler import FixedTimestepScheduler
+
+
+WINDOW_WIDTH = DEFAULT_CONFIG.WINDOW_WIDTH
+WINDOW_HEIGHT = DEFAULT_CONFIG.WINDOW_HEIGHT
+TICK_RATE = 20
+WHEEL_SLOTS = 10             # sessions are spread over this many slots of each tick period
+MAX_WRITE_BUFFER = 64 * 1024 # bytes queued for a client before its ticks are skipped
+
+log = logging.getLogger("snake.server")
+
+
+class SessionWriter():
+    """
+        Listener that writes the state of one session's game to its client.
+    """
+    def __init__(self, game: Game, eventManager: EventManager, writer: asyncio.StreamWriter) -> None:
+        self.game = game
+        self.writer = writer
+        self.needsSnake = True
+        self.skippedTicks = 0
+        eventManager.Subscribe(TickEvent, self.onTick)
+
+    def onTick(self, event: TickEvent) -> None:
+        game, writer = self.game, self.writer
+        if writer.is_closing():
+            return
+        if writer.transport.get_write_buffer_size() > MAX_WRITE_BUFFER and game.gameNotOver: # slow client, skip this tick
+            self.skippedTicks += 1
+            self.needsSnake = True
+            return
+        if self.needsSnake:
+            writer.write(("snake " + " ".join(f"{x} {y}" for x, y in game.snakeCoordinates) + "\n").encode())
+            self.needsSnake = False
+        x, y = game.snakeCoordinates[-1]
+        prey = game.preyCoordinates
+        prey = f"{prey[0] + 5} {prey[1] + 5}" if prey else "- -"
+        writer.write(f"tick {game.tickCount} {x} {y} {len(game.snakeCoordinates)} {game.score} {prey}\n".encode())
+        if not game.gameNotOver:
+            writer.write(f"over {game.score}\n".encode())
+
+
+class Session():
+    """
+        One client and its game.
+    """
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, slot: int) -> None:
+        self.reader = reader
+        self.writer = writer
+        self.slot = slot
+        self.eventManager = EventManager()
+        self.game = Game(self.eventManager, WINDOW_WIDTH, WINDOW_HEIGHT)
+        self.sessionWriter = SessionWriter(self.game, self.eventManager, writer)
+        self.game.createNewPrey()
+
+    async def readInputs(self) -> None:
+        """
+            Applies the directions sent by the client until it disconnects.
+        """
+        async for line in self.reader:
+            keysym = line.strip().decode(errors="replace")
+            if keysym in DIRECTIONS:
+                self.game.whenAnArrowKeyIsPressed(KeyPress(keysym))
+
+
+class GameServer():
+    """
+        Runs every session on a shared tick wheel: the tick period is split
+        into WHEEL_SLOTS slots and each session belongs to one of them, so
+        the work of a tick is spread evenly over the period instead of
+        arriving all at once.
+    """
+    def __init__(self, tickRate: float = TICK_RATE, slots: int = WHEEL_SLOTS) -> None:
+        self.slots = [set() for _ in range(slots)]
+        self.scheduler = FixedTimestepScheduler(tickRate * slots)
+        self.slotDuration = Histogram() # time spent ticking one slot
+        self.overruns = 0               # slots that took longer than their share of the period
+        self.nextSlot = 0
+
+    @property
+    def sessionCount(self) -> int:
+        return sum(len(slot) for slot in self.slots)
+
+    async def handleClient(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        slot = min(range(len(self.slots)), key=lambda i: len(self.slots[i])) # least loaded slot
+        session = Session(reader, writer, slot)
+        self.slots[slot].add(session)
+        try:
+            await session.readInputs()
+        except ConnectionError:
+            pass
+        finally:
+            self.slots[slot].discard(session)
+            writer.close()
+
+    def tickSlot(self, slot: set) -> None:
+        start = time.perf_counter()
+        finished = []
+        for session in slot:
+            if session.game.gameNotOver:
+                session.game.tick()
+            else:
+                finished.append(session)
+        for session in finished: # the game is over and its last state was sent
+            slot.discard(session)
+            session.writer.close()
+        elapsed = time.perf_counter() - start
+        self.slotDuration.record(elapsed)
+        if elapsed > self.scheduler.period:
+            self.overruns += 1
+
+    async def runTickWheel(self) -> None:
+        scheduler = self.scheduler
+        scheduler.start()
+        while True:
+            for _ in range(scheduler.poll()):
+                self.tickSlot(self.slots[self.nextSlot])
+                self.nextSlot = (self.nextSlot + 1) % len(self.slots)
+            await asyncio.sleep(scheduler.timeUntilNextTick())
+
+    async def reportStats(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            log.info("sessions: %d, slot time: %s, overruns: %d, dropped ticks: %d, lateness: %s",
+                self.sessionCount, self.slotDuration.summary(), self.overruns,
+                self.scheduler.droppedTicks, self.scheduler.lateness.summary())
+            self.slotDuration.reset()
+            self.scheduler.lateness.reset()
+
+    async def serve(self, host: str = None, port: int = None, unixPath: str = None, statsInterval: float = 10) -> None:
+        if unixPath:
+            server = await asyncio.start_unix_server(self.handleClient, unixPath)
+        else:
+            server = await asyncio.start_server(self.handleClient, host, port)
+        async with server:
+            await asyncio.gather(server.serve_forever(), self.runTickWheel(), self.reportStats(statsInterval))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Headless snake game server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", metavar="PATH", help="listen on a Unix socket instead of TCP")
+    parser.add_argument("--tick-rate", type=float, default=TICK_RATE)
+    parser.add_argument("--stats-interval", type=float, default=10, help="seconds between stats log lines")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    asyncio.run(GameServer(args.tick_rate).serve(args.host, args.port, args.unix, args.stats_interval))
@@ -0,0 +1,194 @@
+from collections import deque
+from typing import Dict, Iterable, Iterator, Tuple
+
+from free_cells import FreeCellIndex
+
+
+class SnakeBody():
+    """
+        This class stores the coordinates of the snake, from its
+        tail (index 0) to its head (index -1).
+        The coordinates are kept in a deque so that adding a new head
+        and removing the tail are O(1), and an occupancy index (a
+        dictionary counting how many segments sit on each coordinate)
+        is kept in sync so that collision checks are O(1) as well.
+        If a FreeCellIndex is given, the cells covered by the snake are
+        kept marked as occupied in it.
+        Several snakes can share one occupancy dictionary (see Arena); a
+        membership test then tells whether any of them covers the point.
+    """
+    def __init__(self, coordinates: Iterable[Tuple[int, int]] = (), freeCells: FreeCellIndex = None,
+        occupancy: Dict[Tuple[int, int], int] = None) -> None:
+        self.coordinates = deque()
+        self.occupancy: Dict[Tuple[int, int], int] = dict() if occupancy is None else occupancy
+        self.freeCells = freeCells
+        for point in coordinates:
+            self.append(point)
+
+    def append(self, point: Tuple[int, int]) -> None:
+        """
+            Adds a new head to the snake.
+        """
+        self.coordinates.append(point)
+        count = self.occupancy.get(point, 0)
+        self.occupancy[point] = count + 1
+        if not count and self.freeCells is not None:
+            self.freeCells.occupy(point)
+
+    def popTail(self) -> Tuple[int, int]:
+        """
+            Removes and returns the tail of the snake.
+        """
+        point = self.coordinates.popleft()
+        count = self.occupancy[point] - 1
+        if count:
+            self.occupancy[point] = count
+        else:
+            del self.occupancy[point]
+            if self.freeCells is not None:
+                self.freeCells.release(point)
+        return point
+
+    def head(self) -> Tuple[int, int]:
+        return self.coordinates[-1]
+
+    def tail(self) -> Tuple[int, int]:
+        return self.coordinates[0]
+
+    def __contains__(self, point: Tuple[int, int]) -> bool:
+        return point in self.occupancy
+
+    def __len__(self) -> int:
+        return len(self.coordinates)
+
+    def __iter__(self) -> Iterator[Tuple[int, int]]:
+        return iter(self.coordinates)
+
+    def __getitem__(self, index: int) -> Tuple[int, int]:
+        return self.coordinates[index]
+
+
+class RunLengthSnakeBody():
+    """
+        A snake body for very long snakes that stores straight runs instead
+        of one coordinate per cell, so it takes O(number of turns) memory.
+        Each run is [x, y, dx, dy, length]: the cells (x + i * dx, y + i * dy)
+        for i in range(length), listed from the tail towards the head.
+        It has the same interface as SnakeBody, but membership tests and
+        indexing far from the ends walk the runs, so they cost O(turns).
+    """
+    def __init__(self, coordinates: Iterable[Tuple[int, int]] = (), freeCells: FreeCellIndex = None) -> None:
+        self.runs = deque()
+        self.length = 0
+        self.freeCells = freeCells
+        for point in coordinates:
+            self.append(point)
+
+    def append(self, point: Tuple[int, int]) -> None:
+        """
+            Adds a new head to the snake.
+        """
+        x, y = point
+        if self.runs:
+            run = self.runs[-1]
+            headX, headY = run[0] + (run[4] - 1) * run[2], run[1] + (run[4] - 1) * run[3]
+            dx, dy = x - headX, y - headY
+            if run[4] == 1 and (dx or dy):
+                run[2], run[3], run[4] = dx, dy, 2
+            elif (dx, dy) == (run[2], run[3]) and (dx or dy):
+                run[4] += 1
+            else:
+                self.runs.append([x, y, 0, 0, 1])
+        else:
+            self.runs.append([x, y, 0, 0, 1])
+        self.length += 1
+        if self.freeCells is not None:
+            self.freeCells.occupy(point)
+
+    def popTail(self) -> Tuple[int, int]:
+        """
+            Removes and returns the tail of the snake.
+        """
+        run = self.runs[0]
+        point = (run[0], run[1])
+        if run[4] == 1:
+            self.runs.popleft()
+        else:
+            run[0] += run[2]
+            run[1] += run[3]
+            run[4] -= 1
+        self.length -= 1
+        # a snake only overlaps itself where its head bit it, so this is cheaper than point in self
+        if self.freeCells is not None and not (self.length and point == self.head()):
+            self.freeCells.release(point)
+        return point
+
+    def copyRuns(self, other: "RunLengthSnakeBody") -> None:
+        """
+            Makes this body a copy of other, run by run, in O(turns).
+            The free cells of this body are left alone.
+        """
+        self.runs = deque([list(run) for run in other.runs])
+        self.length = other.length
+
+    def head(self) -> Tuple[int, int]:
+        run = self.runs[-1]
+        return (run[0] + (run[4] - 1) * run[2], run[1] + (run[4] - 1) * run[3])
+
+    def tail(self) -> Tuple[int, int]:
+        run = self.runs[0]
+        return (run[0], run[1])
+
+    def turnPoints(self) -> list:
+        """
+            Returns the points where the snake turns, with its tail and head:
+            the polyline through them covers exactly the snake.
+        """
+        points = [self.tail()]
+        for x, y, dx, dy, length in self.runs:
+            # a run starts one cell after the previous one ended, so both of its ends are turn points
+            for point in ((x, y), (x + (length - 1) * dx, y + (length - 1) * dy)):
+                if point != points[-1]:
+                    points.append(point)
+        return points
+
+    def __contains__(self, point: Tuple[int, int]) -> bool:
+        px, py = point
+        for x, y, dx, dy, length in self.runs:
+            if dx:
+                i, remainder = divmod(px - x, dx)
+                if py == y and not remainder and 0 <= i < length:
+                    return True
+            elif dy:
+                i, remainder = divmod(py - y, dy)
+                if px == x and not remainder and 0 <= i < length:
+                    return True
+            elif px == x and py == y:
+                return True
+        return False
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __iter__(self) -> Iterator[Tuple[int, int]]:
+        for x, y, dx, dy, length in list(self.runs):
+            for i in range(length):
+                yield (x + i * dx, y + i * dy)
+
+    def __getitem__(self, index: int) -> Tuple[int, int]:
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError("snake index out of range")
+        if index < self.length // 2: # walk from the tail
+            for x, y, dx, dy, length in self.runs:
+                if index < length:
+                    return (x + index * dx, y + index * dy)
+                index -= length
+        else: # walk from the head
+            index = self.length - 1 - index
+            for x, y, dx, dy, length in reversed(self.runs):
+                if index < length:
+                    i = length - 1 - index
+                    return (x + i * dx, y + i * dy)
+                index -= length
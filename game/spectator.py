@@ -0,0 +1,316 @@
+"""
+    Live spectator streams: the state of one game is broadcast to any
+    number of spectators over TCP or a Unix socket. The stream is a series
+    of messages, each starting with a one byte tag:
+        b"K" state          a keyframe: a Game.snapshot() of the whole state
+        b"D" delta          the move of one tick, DELTA followed by
+                            PREY if FLAG_PREY is set and SCORE if FLAG_SCORE is set
+    A delta adds a new head and, if FLAG_TAIL_DROPPED is set, removes the
+    tail. FLAG_NO_PREY says the prey is gone because the board is full. Keyframes are sent every keyframeInterval ticks; a spectator that
+    joins, or that was too slow to be sent every delta, is sent the last
+    keyframe and the deltas since. All numbers are little endian.
+
+    Usage:
+        python app.py --spectator-port 8766
+        python spectator.py --port 8766
+"""
+
+import argparse
+import asyncio
+import struct
+import threading
+import time
+from collections import deque
+from typing import List, Optional
+
+from event_manager import *
+from model import Game, GameState
+
+
+DELTA = struct.Struct("<IhhB") # tick, new head x, new head y, flags
+PREY = struct.Struct("<hh")    # centre of the new prey
+SCORE = struct.Struct("<i")    # new score
+FLAG_TAIL_DROPPED = 1
+FLAG_PREY = 2
+FLAG_SCORE = 4
+FLAG_GAME_OVER = 8
+FLAG_NO_PREY = 16
+
+MAX_WRITE_BUFFER = 64 * 1024 # bytes queued for a spectator before it is sent nothing until it catches up
+MAX_PAUSE = 10.0             # seconds a spectator may stay that far behind before it is dropped
+
+
+class SpectatorProtocol(asyncio.Protocol):
+    """
+        One spectator's connection. The transport tells it when its write
+        buffer goes over MAX_WRITE_BUFFER and when it drained again.
+    """
+    def __init__(self, server: "SpectatorServer") -> None:
+        self.server = server
+        self.transport = None
+        self.paused = False
+        self.pausedSince = 0.0
+        self.needsResync = True # the spectator must be sent a keyframe before the next delta
+
+    def connection_made(self, transport: asyncio.Transport) -> None:
+        self.transport = transport
+        transport.set_write_buffer_limits(high=MAX_WRITE_BUFFER)
+        self.server.subscribers.add(self)
+        self.server.resync(self)
+
+    def connection_lost(self, exc: Optional[Exception]) -> None:
+        self.server.subscribers.discard(self)
+
+    def data_received(self, data: bytes) -> None:
+        pass # spectators have nothing to say
+
+    def pause_writing(self) -> None:
+        self.paused = True
+        self.pausedSince = time.perf_counter()
+        self.needsResync = True # the deltas it misses meanwhile are replaced by a keyframe
+
+    def resume_writing(self) -> None:
+        self.paused = False
+
+
+class SpectatorServer():
+    """
+        Broadcasts a game to its spectators. On the game thread, every tick
+        is encoded once into a small delta message (and every
+        keyframeInterval ticks into a keyframe), which is handed over to
+        the server's event loop; the loop writes the same bytes to every
+        spectator. A spectator whose connection cannot keep up is paused
+        and resynced with a keyframe once it drained, and dropped if it
+        stays paused for MAX_PAUSE seconds, so slow spectators never hold
+        up the game or the others.
+    """
+    def __init__(self, game: Game, eventManager: EventManager, keyframeInterval: int = 100) -> None:
+        self.game = game
+        self.keyframeInterval = keyframeInterval
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.subscribers = set()
+        # owned by the game thread
+        self.lastTick = None
+        self.lastLength = 0
+        self.lastPrey = None
+        self.lastScore = 0
+        self.lastBody = None
+        # owned by the event loop
+        self.keyframe: Optional[bytes] = None
+        self.deltas: List[bytes] = [] # deltas since the keyframe
+        self.sent = 0
+        self.resyncs = 0
+        self.dropped = 0
+        eventManager.Subscribe(GameStartEvent, self.onGameStart)
+        eventManager.Subscribe(TickEvent, self.onTick)
+
+    # game thread
+
+    def onGameStart(self, event: GameStartEvent) -> None:
+        self.publishKeyframe() # the starting position, once the first prey is placed
+
+    def onTick(self, event: TickEvent) -> None:
+        game = self.game
+        snake = game.snakeCoordinates
+        if self.lastTick is None or game.tickCount != self.lastTick + 1 or snake is not self.lastBody \
+            or game.tickCount % self.keyframeInterval == 0: # a keyframe is due, or the game was restored or seeked
+            self.publishKeyframe()
+            return
+        x, y = snake[-1]
+        flags = 0
+        if len(snake) == self.lastLength:
+            flags |= FLAG_TAIL_DROPPED
+        prey = game.preyCoordinates
+        if prey != self.lastPrey:
+            flags |= FLAG_PREY if prey else FLAG_NO_PREY
+        if game.score != self.lastScore:
+            flags |= FLAG_SCORE
+        if not game.gameNotOver:
+            flags |= FLAG_GAME_OVER
+        message = b"D" + DELTA.pack(game.tickCount, x, y, flags)
+        if flags & FLAG_PREY:
+            message += PREY.pack(prey[0] + 5, prey[1] + 5)
+        if flags & FLAG_SCORE:
+            message += SCORE.pack(game.score)
+        self.remember()
+        self.post(message, False)
+
+    def publishKeyframe(self) -> None:
+        self.remember()
+        self.post(b"K" + self.game.snapshot(), True)
+
+    def remember(self) -> None:
+        game = self.game
+        self.lastTick, self.lastLength, self.lastPrey = game.tickCount, len(game.snakeCoordinates), game.preyCoordinates
+        self.lastScore, self.lastBody = game.score, game.snakeCoordinates
+
+    def post(self, message: bytes, keyframe: bool) -> None:
+        """
+            Hands a message over to the event loop without waiting for it.
+        """
+        loop = self.loop
+        if loop is None:
+            return
+        try:
+            loop.call_soon_threadsafe(self.broadcast, message, keyframe)
+        except RuntimeError: # the loop was closed
+            self.loop = None
+
+    # event loop
+
+    def broadcast(self, message: bytes, keyframe: bool) -> None:
+        if keyframe:
+            self.keyframe = message
+            self.deltas.clear()
+        elif self.keyframe is None:
+            return # nobody could make sense of it
+        else:
+            self.deltas.append(message)
+        now = time.perf_counter()
+        for subscriber in list(self.subscribers):
+            if subscriber.paused:
+                if now - subscriber.pausedSince > MAX_PAUSE:
+                    self.subscribers.discard(subscriber)
+                    self.dropped += 1
+                    subscriber.transport.abort()
+            elif subscriber.needsResync:
+                self.resync(subscriber)
+            else:
+                subscriber.transport.write(message)
+                self.sent += 1
+
+    def resync(self, subscriber: SpectatorProtocol) -> None:
+        """
+            Sends the last keyframe and the deltas since, which bring the
+            spectator up to date whatever it was sent before.
+        """
+        if self.keyframe is None:
+            return
+        subscriber.transport.writelines([self.keyframe, *self.deltas])
+        subscriber.needsResync = False
+        self.resyncs += 1
+
+    async def serve(self, host: str = "127.0.0.1", port: int = None, unixPath: str = None, ready: threading.Event = None) -> None:
+        self.loop = asyncio.get_running_loop()
+        if unixPath:
+            server = await self.loop.create_unix_server(lambda: SpectatorProtocol(self), unixPath)
+        else:
+            server = await self.loop.create_server(lambda: SpectatorProtocol(self), host, port)
+        if ready is not None:
+            ready.set()
+        async with server:
+            await server.serve_forever()
+
+    def start(self, host: str = "127.0.0.1", port: int = None, unixPath: str = None) -> None:
+        """
+            Runs the server on an event loop of its own, on a daemon thread.
+            Returns once it is listening.
+        """
+        ready = threading.Event()
+        threading.Thread(target=asyncio.run, args=(self.serve(host, port, unixPath, ready),), daemon=True).start()
+        ready.wait()
+
+
+class SpectatorView():
+    """
+        Rebuilds the game from a spectator stream: feed it the bytes as
+        they arrive.
+    """
+    def __init__(self) -> None:
+        self.buffer = bytearray()
+        self.synced = False
+        self.tickCount = 0
+        self.score = 0
+        self.gameNotOver = True
+        self.prey = None # centre of the prey
+        self.snakeCoordinates = deque()
+        self.keyframes = 0
+        self.deltas = 0
+
+    def feed(self, data: bytes) -> None:
+        buffer = self.buffer
+        buffer += data
+        offset = 0
+        while offset < len(buffer):
+            tag = buffer[offset:offset + 1]
+            if tag == b"K":
+                start = offset + 1
+                if len(buffer) - start < GameState.HEADER.size:
+                    break
+                size = GameState.packedSize(buffer, start)
+                if len(buffer) - start < size:
+                    break
+                self.applyKeyframe(GameState.fromBuffer(bytes(buffer[start:start + size])))
+                offset = start + size
+            elif tag == b"D":
+                start = offset + 1
+                if len(buffer) - start < DELTA.size:
+                    break
+                tick, x, y, flags = DELTA.unpack_from(buffer, start)
+                size = DELTA.size + (PREY.size if flags & FLAG_PREY else 0) + (SCORE.size if flags & FLAG_SCORE else 0)
+                if len(buffer) - start < size:
+                    break
+                position = start + DELTA.size
+                prey = score = None
+                if flags & FLAG_PREY:
+                    prey = PREY.unpack_from(buffer, position)
+                    position += PREY.size
+                if flags & FLAG_SCORE:
+                    score = SCORE.unpack_from(buffer, position)[0]
+                self.applyDelta(tick, (x, y), flags, prey, score)
+                offset = start + size
+            else:
+                raise ValueError(f"unknown message {bytes(tag)!r}")
+        del buffer[:offset]
+
+    def applyKeyframe(self, state: GameState) -> None:
+        self.synced = True
+        self.tickCount, self.score, self.gameNotOver = state.tickCount, state.score, state.gameNotOver
+        self.prey = (state.prey[0] + 5, state.prey[1] + 5) if state.prey is not None else None
+        body = state.body
+        self.snakeCoordinates = deque(zip(body[0::2], body[1::2]))
+        self.keyframes += 1
+
+    def applyDelta(self, tick: int, head: tuple, flags: int, prey: tuple, score: int) -> None:
+        if not self.synced or tick != self.tickCount + 1:
+            self.synced = False # wait for the next keyframe
+            return
+        self.tickCount = tick
+        self.snakeCoordinates.append(head)
+        if flags & FLAG_TAIL_DROPPED:
+            self.snakeCoordinates.popleft()
+        if prey is not None:
+            self.prey = prey
+        elif flags & FLAG_NO_PREY:
+            self.prey = None
+        if score is not None:
+            self.score = score
+        self.gameNotOver = not flags & FLAG_GAME_OVER
+        self.deltas += 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Watch a game broadcast with --spectator-port")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--unix", metavar="PATH", help="connect to a Unix socket instead of TCP")
+    args = parser.parse_args()
+
+    async def watch() -> None:
+        if args.unix:
+            reader, writer = await asyncio.open_unix_connection(args.unix)
+        else:
+            reader, writer = await asyncio.open_connection(args.host, args.port)
+        view = SpectatorView()
+        lastTick = None
+        while view.gameNotOver:
+            data = await reader.read(65536)
+            if not data:
+                break
+            view.feed(data)
+            if view.synced and view.tickCount != lastTick:
+                lastTick = view.tickCount
+                print(f"tick {view.tickCount} score {view.score} length {len(view.snakeCoordinates)} head {view.snakeCoordinates[-1]} prey {view.prey}")
+        writer.close()
+
+    asyncio.run(watch())
@@ -0,0 +1,210 @@
+"""
+    Tunes the gameplay constants: plays seeded headless games with the
+    Autopilot for every configuration of a grid of GameConfig values, and
+    reports the distribution of the scores and survival times of each.
+    Results are cached on disk per (configuration, seed), so running a
+    sweep again only plays the games it has not played yet, for instance
+    after adding values to the grid or raising --games.
+    Headless games make one move per tick whatever SPEED is, so SPEED does
+    not change the results and cannot be swept.
+
+    Usage:
+        python sweep.py --grid THRESHOLD=15,30,60 --grid COLLISION_PROXIMITY=10,20 --games 500
+"""
+
+import argparse
+import itertools
+import json
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Sequence, Tuple
+
+from autopilot import Autopilot
+from event_manager import EventManager
+from model import DEFAULT_CONFIG, Game, GameConfig, KeyPress
+from tournament import MAX_TICKS, gameSeeds
+
+
+CACHE_DIRECTORY = "sweep-cache"
+CACHE_VERSION = 1 # change it when the rules of the game or the bot change, to play the cached games again
+
+Result = Tuple[int, int, int, bool] # score, final snake length, moves survived, still alive after maxTicks
+
+
+def parseGrid(specs: Sequence[str], base: GameConfig = DEFAULT_CONFIG) -> List[GameConfig]:
+    """
+        Returns every combination of the values given as "NAME=VALUE,VALUE,...",
+        the other constants keeping their value in base.
+        Raises ValueError for SPEED, unknown constants and values a game
+        cannot be played with.
+    """
+    axes = []
+    for spec in specs:
+        name, _, values = spec.partition("=")
+        if name == "SPEED":
+            raise ValueError("SPEED does not change headless games, it cannot be swept")
+        axes.append([f"{name}={value}" for value in values.split(",")])
+    return [base.override(assignments) for assignments in itertools.product(*axes)]
+
+
+def playGame(config: GameConfig, seed: int, maxTicks: int = MAX_TICKS) -> Result:
+    """
+        Plays one headless game with the Autopilot. Its time budget is
+        lifted so that the moves, and the result, only depend on the seed.
+    """
+    game = Game.fromConfig(EventManager(), config, seed)
+    autopilot = Autopilot(game, budget=math.inf)
+    game.createNewPrey()
+    while game.gameNotOver and game.tickCount < maxTicks:
+        direction = autopilot(game)
+        if direction is not None:
+            game.whenAnArrowKeyIsPressed(KeyPress(direction))
+        game.move()
+    return game.score, len(game.snakeCoordinates), game.tickCount, game.gameNotOver
+
+
+def playChunk(config: GameConfig, seeds: Sequence[int], maxTicks: int) -> Tuple[GameConfig, List[Tuple[int, Result]]]:
+    """
+        Work unit run in a worker process: plays one configuration for a chunk of seeds.
+    """
+    return config, [(seed, playGame(config, seed, maxTicks)) for seed in seeds]
+
+
+class ResultCache():
+    """
+        The results of the games played so far, one JSON file per
+        configuration (and maxTicks) mapping seeds to results. Files are
+        replaced atomically, so an interrupted sweep loses at most the
+        chunk it was playing.
+    """
+    def __init__(self, directory: str = CACHE_DIRECTORY) -> None:
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, config: GameConfig, maxTicks: int) -> str:
+        return os.path.join(self.directory, f"{config.WINDOW_WIDTH}x{config.WINDOW_HEIGHT}"
+            f"-proximity{config.COLLISION_PROXIMITY}-threshold{config.THRESHOLD}-ticks{maxTicks}.json")
+
+    def load(self, config: GameConfig, maxTicks: int) -> Dict[int, Result]:
+        try:
+            with open(self.path(config, maxTicks)) as file:
+                entry = json.load(file)
+        except (OSError, ValueError):
+            return {}
+        if entry.get("version") != CACHE_VERSION:
+            return {}
+        return {int(seed): tuple(result) for seed, result in entry["results"].items()}
+
+    def store(self, config: GameConfig, maxTicks: int, results: Dict[int, Result]) -> None:
+        path = self.path(config, maxTicks)
+        entry = {"version": CACHE_VERSION, "config": config._asdict(), "maxTicks": maxTicks,
+            "results": {str(seed): result for seed, result in results.items()}}
+        with open(path + ".tmp", "w") as file:
+            json.dump(entry, file)
+        os.replace(path + ".tmp", path)
+
+
+def percentile(values: Sequence[float], p: float) -> float:
+    """
+        Returns the p-th percentile (0 < p <= 100) of sorted values, by nearest rank.
+    """
+    if not values:
+        return 0
+    return values[max(0, math.ceil(p / 100 * len(values)) - 1)]
+
+
+def summarize(config: GameConfig, results: Sequence[Result]) -> Dict[str, float]:
+    """
+        Returns the score and survival distributions of the games of one configuration.
+    """
+    n = len(results) or 1
+    scores = sorted(result[0] for result in results)
+    ticks = sorted(result[2] for result in results)
+    meanScore, meanTicks = sum(scores) / n, sum(ticks) / n
+    summary = {
+        "config": config,
+        "games": len(results),
+        "meanScore": meanScore,
+        "scoreStdev": math.sqrt(sum((score - meanScore) ** 2 for score in scores) / n),
+        "maxScore": scores[-1] if scores else 0,
+        "meanLength": sum(result[1] for result in results) / n,
+        "meanSurvivalTicks": meanTicks,
+        "survivalStdev": math.sqrt(sum((tick - meanTicks) ** 2 for tick in ticks) / n),
+        "survivedFraction": sum(result[3] for result in results) / n} # games still going after maxTicks
+    for p in (10, 50, 90):
+        summary[f"scoreP{p}"] = percentile(scores, p)
+        summary[f"survivalP{p}"] = percentile(ticks, p)
+    return summary
+
+
+def runSweep(
+    configs: Sequence[GameConfig],
+    games: int,
+    masterSeed: int = 0,
+    cacheDirectory: str = CACHE_DIRECTORY,
+    workers: int = None,
+    chunkSize: int = None,
+    maxTicks: int = MAX_TICKS) -> Tuple[List[Dict[str, float]], int]:
+    """
+        Plays the seeded games of every configuration that are not in the
+        cache yet, on a pool of worker processes, and returns the summary
+        of each configuration, in the order given, with the number of
+        games that had to be played.
+    """
+    workers = workers or os.cpu_count() or 1
+    seeds = gameSeeds(masterSeed, games)
+    cache = ResultCache(cacheDirectory)
+    keys = [config._replace(SPEED=DEFAULT_CONFIG.SPEED) for config in configs] # SPEED does not change headless games, see parseGrid
+    results = {key: cache.load(key, maxTicks) for key in keys}
+    missing = {key: [seed for seed in seeds if seed not in results[key]] for key in results}
+    played = sum(map(len, missing.values()))
+    if played:
+        chunkSize = chunkSize or max(1, math.ceil(played / (workers * 8)))
+        with ProcessPoolExecutor(workers) as pool:
+            futures = [pool.submit(playChunk, key, keySeeds[start:start + chunkSize], maxTicks)
+                for key, keySeeds in missing.items() for start in range(0, len(keySeeds), chunkSize)]
+            for future in as_completed(futures):
+                key, chunk = future.result()
+                results[key].update(chunk)
+                cache.store(key, maxTicks, results[key])
+
+    summaries = [summarize(config, [results[key][seed] for seed in seeds]) for config, key in zip(configs, keys)]
+    return summaries, played
+
+
+def describe(config: GameConfig) -> str:
+    """
+        Names a configuration by the constants it changes.
+    """
+    changes = [f"{name}={value}" for name, value in config._asdict().items() if value != getattr(DEFAULT_CONFIG, name)]
+    return " ".join(changes) or "default"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Play the Autopilot over a grid of gameplay constants")
+    parser.add_argument("--grid", action="append", default=[], metavar="NAME=VALUE,VALUE,...",
+        help="values of a constant to try (COLLISION_PROXIMITY, THRESHOLD, WINDOW_WIDTH, WINDOW_HEIGHT)")
+    parser.add_argument("--games", type=int, default=200, help="seeded games per configuration")
+    parser.add_argument("--seed", type=int, default=0, help="master seed")
+    parser.add_argument("--cache", default=CACHE_DIRECTORY, metavar="DIR", help="where the results of the games are kept")
+    parser.add_argument("--workers", type=int, help="worker processes (default: one per core)")
+    parser.add_argument("--chunk-size", type=int, help="games per work unit")
+    parser.add_argument("--max-ticks", type=int, default=MAX_TICKS)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    try:
+        configs = parseGrid(args.grid)
+    except ValueError as error:
+        parser.error(str(error))
+    results, played = runSweep(configs, args.games, args.seed, args.cache, args.workers, args.chunk_size, args.max_ticks)
+    elapsed = time.perf_counter() - start
+    for result in results:
+        print(f"{describe(result['config']):40} score {result['meanScore']:7.2f} ± {result['scoreStdev']:6.2f}"
+            f" (p10 {result['scoreP10']}, p50 {result['scoreP50']}, p90 {result['scoreP90']}, max {result['maxScore']})"
+            f"  survived {result['meanSurvivalTicks']:8.1f} ticks (p10 {result['survivalP10']}, p50 {result['survivalP50']},"
+            f" p90 {result['survivalP90']}), {result['survivedFraction']:.0%} still alive")
+    total = args.games * len(configs)
+    print(f"{total} games, {played} played and {total - played} from the cache, in {elapsed:.1f}s")
@@ -0,0 +1,80 @@
+import curses
+import threading
+import time
+from typing import Callable
+
+from event_manager import *
+from frames import FrameReader
+from model import STEP, X_OFFSET, Y_OFFSET, Game, KeyPress
+from renderers import Renderer
+from scheduler import FixedTimestepScheduler
+
+
+KEYS = {curses.KEY_LEFT: "Left", curses.KEY_RIGHT: "Right", curses.KEY_UP: "Up", curses.KEY_DOWN: "Down"}
+
+
+class TerminalRenderer(Renderer):
+    """
+        Renderer backend drawing the game in the terminal with curses, one
+        character per cell of the board (whatever does not fit the terminal
+        is cut off). The game runs on a daemon thread; frameRate times per
+        second the terminal reads the arrow keys and draws the newest frame
+        the game published, if it has not drawn it yet. q quits.
+    """
+    SNAKE = "#"
+    PREY = "@"
+
+    def __init__(self, game: Game, eventManager: EventManager, bindKeys: bool = True, frameRate: float = 60, **options) -> None:
+        super().__init__(game, eventManager)
+        self.bindKeys = bindKeys
+        self.frameInterval = 1 / (frameRate or 20)
+        self.frameReader = FrameReader(game.frames)
+        self.frames = 0
+
+    def run(self, run: Callable[[FixedTimestepScheduler], None], scheduler: FixedTimestepScheduler) -> None:
+        curses.wrapper(self.loop, run, scheduler)
+
+    def loop(self, screen, run: Callable[[FixedTimestepScheduler], None], scheduler: FixedTimestepScheduler) -> None:
+        try:
+            curses.curs_set(0)
+        except curses.error: # the terminal cannot hide the cursor
+            pass
+        screen.nodelay(True)
+        screen.keypad(True)
+        threading.Thread(target = run, args = (scheduler,), daemon=True).start()
+        while True:
+            key = screen.getch()
+            while key != -1:
+                if key in (ord("q"), 27): # q or escape
+                    return
+                if key in KEYS and self.bindKeys:
+                    self.game.whenAnArrowKeyIsPressed(KeyPress(KEYS[key]))
+                key = screen.getch()
+            self.draw(screen)
+            time.sleep(self.frameInterval)
+
+    def draw(self, screen) -> None:
+        frame = self.frameReader.poll()
+        if frame is None:
+            return
+        snake, prey, score, gameNotOver = frame.snakeCoordinates, frame.preyCoordinates, frame.score, frame.gameNotOver
+        rows, columns = screen.getmaxyx()
+        screen.erase()
+        status = f"Your Score: {score}" if gameNotOver else f"Game Over! Your Score: {score}  (q to quit)"
+        self.put(screen, 0, 0, status[:columns - 1], rows, columns)
+        for x, y in snake:
+            self.put(screen, 1 + (y - Y_OFFSET) // STEP, (x - X_OFFSET) // STEP, self.SNAKE, rows, columns)
+        if prey:
+            self.put(screen, 1 + (prey[1] + 5 - Y_OFFSET) // STEP, (prey[0] + 5 - X_OFFSET) // STEP, self.PREY, rows, columns)
+        screen.refresh()
+        self.frames += 1
+
+    def put(self, screen, row: int, column: int, text: str, rows: int, columns: int) -> None:
+        if 0 <= row < rows and 0 <= column < columns - 1:
+            try:
+                screen.addstr(row, column, text)
+            except curses.error:
+                pass
+
+    def summary(self) -> str:
+        return f"Frames drawn: {self.frames}"
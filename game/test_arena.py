@@ -0,0 +1,15 @@
+import pytest
+
+from arena import Arena
+from event_manager import EventManager
+from model import DEFAULT_CONFIG
+
+
+def test_the_snakes_follow_the_config_of_the_arena():
+    config = DEFAULT_CONFIG._replace(THRESHOLD=100, COLLISION_PROXIMITY=20)
+    arena = Arena(EventManager(), 500, 300, seed=1, config=config)
+    assert all(100 <= x <= 400 and 100 <= y <= 200 for x, y in arena.freeCells.cells)
+    snake = arena.addSnake(length=3)
+    assert snake.config is config
+    with pytest.raises(ValueError):
+        Arena(EventManager(), 2000, 2000, config=config)
@@ -0,0 +1,86 @@
+import math
+
+from autopilot import INFINITY, Autopilot, autopilotPolicy, autopilots
+from event_manager import EventManager
+from model import DIRECTION_STEPS, DIRECTIONS, Game, KeyPress
+from tournament import playGame
+
+
+def newGame(seed, WINDOW_WIDTH=500, WINDOW_HEIGHT=300):
+    game = Game(EventManager(), WINDOW_WIDTH, WINDOW_HEIGHT, seed)
+    game.createNewPrey()
+    return game
+
+
+def play(game, autopilot, moves, check=None):
+    for _ in range(moves):
+        if not game.gameNotOver:
+            break
+        direction = autopilot(game)
+        if check:
+            check(direction)
+        if direction is not None:
+            game.whenAnArrowKeyIsPressed(KeyPress(direction))
+        game.move()
+
+
+def test_unlimited_budget_is_deterministic():
+    results = []
+    for _ in range(2):
+        game = newGame(4)
+        autopilot = Autopilot(game, budget=math.inf)
+        play(game, autopilot, 1500)
+        results.append((game.tickCount, game.score, list(game.snakeCoordinates)))
+        assert autopilot.fallbacks == 0
+    assert results[0] == results[1]
+    assert results[0][0] == 1500 # the bot survives
+
+
+def test_distance_field_matches_a_rebuild():
+    game = newGame(2)
+    autopilot = Autopilot(game, budget=math.inf)
+    for _ in range(20):
+        play(game, autopilot, 17)
+        autopilot(game) # sync with the last move
+        incremental = list(autopilot.distance)
+        autopilot.startRebuild()
+        autopilot.catchUp(math.inf)
+        assert incremental == autopilot.distance
+
+
+def test_no_budget_still_makes_safe_moves():
+    game = newGame(6)
+    autopilot = Autopilot(game, budget=0)
+
+    def check(direction):
+        if direction is None:
+            return
+        dx, dy = DIRECTION_STEPS[DIRECTIONS.index(direction)]
+        x, y = game.snakeCoordinates[-1]
+        head = (x + dx, y + dy)
+        assert 0 <= head[0] <= game.WINDOW_WIDTH and 0 <= head[1] <= game.WINDOW_HEIGHT
+        assert head not in game.snakeCoordinates or head == game.snakeCoordinates[0]
+
+    play(game, autopilot, 300, check)
+    assert autopilot.fallbacks > 0
+
+
+def test_rebuild_is_spread_over_ticks():
+    game = newGame(8, 2000, 2000)
+    autopilot = Autopilot(game, budget=0)
+    autopilot(game)
+    assert autopilot.rebuilding is not None # one slice per tick
+    calls = 1
+    while autopilot.rebuilding is not None:
+        autopilot(game)
+        calls += 1
+    assert calls > 10
+    assert autopilot.distance[autopilot.preyCell()] == 0
+    assert INFINITY not in (autopilot.distance[cell] for cell in autopilot.neighbours[autopilot.preyCell()])
+
+
+def test_tournament_policy_does_not_depend_on_the_clock():
+    first = playGame(autopilotPolicy, 1, maxTicks=600)
+    autopilot, = autopilots.values()
+    assert autopilot.budget == math.inf
+    assert playGame(autopilotPolicy, 1, maxTicks=600) == first
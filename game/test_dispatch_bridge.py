@@ -0,0 +1,59 @@
+import threading
+
+from dispatch_bridge import TkDispatchBridge
+from event_manager import GAME_OVER_EVENT, TICK_EVENT
+
+
+class TkThreadRoot():
+    """
+        Stands in for a Tk root and fails if it is called from another thread.
+    """
+    def __init__(self):
+        self.thread = threading.get_ident()
+        self.afterCalls = []
+
+    def check(self):
+        assert threading.get_ident() == self.thread, "Tk called from another thread"
+
+    def after(self, delay, callback):
+        self.check()
+        self.afterCalls.append(callback)
+
+    def after_idle(self, callback):
+        self.check()
+        self.afterCalls.append(callback)
+
+
+def test_other_threads_only_queue_events():
+    root = TkThreadRoot()
+    delivered = []
+    bridge = TkDispatchBridge(root, delivered.append)
+    errors = []
+
+    def post():
+        try:
+            for _ in range(3):
+                bridge.notify(TICK_EVENT)
+            bridge.notify(GAME_OVER_EVENT)
+        except AssertionError as error:
+            errors.append(error)
+
+    thread = threading.Thread(target=post)
+    thread.start()
+    thread.join()
+    assert not errors
+    assert bridge.queueDepth == 4 and not delivered
+    bridge.poll() # on the Tk thread
+    assert delivered == [TICK_EVENT, GAME_OVER_EVENT]
+    assert bridge.coalescedTicks == 2
+
+
+def test_events_posted_on_the_tk_thread_are_drained_when_idle():
+    root = TkThreadRoot()
+    delivered = []
+    bridge = TkDispatchBridge(root, delivered.append)
+    bridge.notify(TICK_EVENT)
+    bridge.notify(TICK_EVENT)
+    assert root.afterCalls.count(bridge.drain) == 1
+    bridge.drain()
+    assert delivered == [TICK_EVENT]
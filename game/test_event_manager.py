@@ -0,0 +1,48 @@
+from event_manager import *
+
+
+class Listener():
+    def __init__(self):
+        self.events = []
+
+    def notify(self, event):
+        self.events.append(event)
+
+
+def test_unregistered_listeners_get_nothing():
+    eventManager = EventManager()
+    first, second = Listener(), Listener()
+    eventManager.RegisterListener(first)
+    eventManager.RegisterListener(second)
+    eventManager.RegisterListener(first) # registered once only
+    eventManager.Post(TICK_EVENT)
+    eventManager.UnregisterListener(first)
+    eventManager.Post(GAME_OVER_EVENT)
+    assert first.events == [TICK_EVENT]
+    assert second.events == [TICK_EVENT, GAME_OVER_EVENT]
+    eventManager.UnregisterListener(first) # not registered any more, nothing happens
+
+
+def test_subscribers_get_their_class_and_its_subclasses_in_order():
+    eventManager = EventManager()
+    calls = []
+    eventManager.Subscribe(TickEvent, lambda event: calls.append("tick"))
+    eventManager.Subscribe(Event, lambda event: calls.append("any"))
+    eventManager.Post(TICK_EVENT)
+    eventManager.Post(GAME_OVER_EVENT)
+    assert calls == ["tick", "any", "any"]
+
+
+def test_subscription_changes_clear_the_handler_cache():
+    eventManager = EventManager()
+    ticks = Listener()
+    eventManager.Post(TICK_EVENT)
+    assert eventManager.handlerCache == {TickEvent: ()}
+    eventManager.Subscribe(TickEvent, ticks.notify)
+    assert eventManager.handlerCache == {}
+    eventManager.Post(TICK_EVENT)
+    assert eventManager.handlerCache[TickEvent] == (ticks.notify,)
+    eventManager.Unsubscribe(TickEvent, ticks.notify)
+    assert eventManager.handlerCache == {}
+    eventManager.Post(TICK_EVENT)
+    assert ticks.events == [TICK_EVENT]
@@ -0,0 +1,107 @@
+import threading
+
+import pytest
+
+from autopilot import Autopilot
+from event_manager import EventManager
+from frames import FrameReader, PointRing
+from model import Game, KeyPress
+from snake_body import RunLengthSnakeBody, SnakeBody
+
+
+def play(game, moves, autopilot=None):
+    autopilot = autopilot or Autopilot(game)
+    for _ in range(moves):
+        if not game.gameNotOver:
+            break
+        direction = autopilot(game)
+        if direction is not None:
+            game.whenAnArrowKeyIsPressed(KeyPress(direction))
+        game.tick()
+
+
+def assertFrameMatches(frame, game):
+    assert frame.tickCount == game.tickCount
+    assert frame.score == game.score
+    assert frame.preyCoordinates == game.preyCoordinates
+    assert list(frame.snakeCoordinates) == list(game.snakeCoordinates)
+
+
+def test_point_ring_grows_and_wraps():
+    ring = PointRing(capacity=4)
+    for i in range(10):
+        ring.append((i, -i))
+        if i % 2:
+            ring.popTail()
+    assert list(ring) == [(i, -i) for i in range(5, 10)]
+    assert ring[0] == (5, -5) and ring[-1] == (9, -9)
+    with pytest.raises(IndexError):
+        ring[5]
+
+
+@pytest.mark.parametrize("bodyModel", [SnakeBody, RunLengthSnakeBody])
+def test_reader_follows_the_game(bodyModel):
+    game = Game(EventManager(), 500, 300, seed=3, bodyModel=bodyModel)
+    reader = FrameReader(game.frames)
+    assert reader.poll() is None
+    game.createNewPrey()
+    game.publishFrame()
+    autopilot = Autopilot(game)
+    for moves in (1, 1, 2, 5, 1):
+        play(game, moves, autopilot)
+        assertFrameMatches(reader.poll(), game)
+        assert reader.poll() is None # nothing new
+    assert reader.skipped == (2 - 1) + (5 - 1)
+
+
+def test_run_length_frames_keep_runs():
+    game = Game(EventManager(), 500, 400, seed=1, bodyModel=RunLengthSnakeBody)
+    game.createNewPrey()
+    game.publishFrame()
+    reader = FrameReader(game.frames)
+    play(game, 300)
+    frame = reader.poll()
+    assert isinstance(frame.snakeCoordinates, RunLengthSnakeBody)
+    assert frame.snakeCoordinates.turnPoints() == game.snakeCoordinates.turnPoints()
+    assert frame.snakeCoordinates.runs is not game.snakeCoordinates.runs
+    assertFrameMatches(frame, game)
+
+
+def test_restore_starts_a_new_epoch():
+    game = Game(EventManager(), 500, 300, seed=5)
+    game.createNewPrey()
+    game.publishFrame()
+    reader = FrameReader(game.frames)
+    snapshot = game.snapshot()
+    play(game, 50)
+    reader.poll()
+    game.restore(snapshot)
+    game.publishFrame()
+    assertFrameMatches(reader.poll(), game)
+
+
+def test_concurrent_reader_never_sees_a_torn_frame():
+    game = Game(EventManager(), 500, 300, seed=9)
+    game.createNewPrey()
+    game.publishFrame()
+    reader = FrameReader(game.frames)
+    done = threading.Event()
+    bad = []
+
+    def read():
+        while not done.is_set():
+            frame = reader.poll()
+            if frame is not None:
+                snake = list(frame.snakeCoordinates)
+                if len(snake) != len(frame.snakeCoordinates) or any(
+                    abs(x1 - x2) + abs(y1 - y2) != 10 for (x1, y1), (x2, y2) in zip(snake, snake[1:])):
+                    bad.append(frame.tickCount)
+
+    thread = threading.Thread(target=read)
+    thread.start()
+    try:
+        play(game, 2000)
+    finally:
+        done.set()
+        thread.join()
+    assert not bad
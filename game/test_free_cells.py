@@ -0,0 +1,28 @@
+import random
+
+from free_cells import FreeCellIndex, gridCells
+
+
+def test_sample_only_returns_free_cells():
+    cells = gridCells(100, 60, 5, 0, 10, 10)
+    freeCells = FreeCellIndex(cells)
+    for cell in cells[1:]:
+        freeCells.occupy(cell)
+    rng = random.Random(1)
+    assert {freeCells.sample(rng) for _ in range(20)} == {cells[0]}
+    freeCells.occupy(cells[0])
+    assert freeCells.freeCount == 0
+    assert freeCells.sample(rng) is None
+    freeCells.release(cells[3])
+    assert freeCells.sample(rng) == cells[3]
+
+
+def test_grid_indexes_share_their_layout():
+    first = FreeCellIndex.forGrid(500, 300, 5, 0, 10, 15)
+    second = FreeCellIndex.forGrid(500, 300, 5, 0, 10, 15)
+    assert first.cells is second.cells
+    first.occupy((255, 150))
+    assert not first.isFree((255, 150)) and second.isFree((255, 150))
+    assert second.freeCount == len(gridCells(500, 300, 5, 0, 10, 15))
+    first.reset()
+    assert first.isFree((255, 150)) and first.freeCount == second.freeCount
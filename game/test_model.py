@@ -0,0 +1,169 @@
+import random
+
+import pytest
+
+from event_manager import EventManager
+from model import DEFAULT_CONFIG, DIRECTIONS, STEP, X_OFFSET, Y_OFFSET, BatchGame, Game, GameConfig, GameState, KeyPress
+from tournament import greedyPolicy
+
+
+def newGame(seed=1, config=DEFAULT_CONFIG):
+    return Game.fromConfig(EventManager(), config, seed)
+
+
+def test_snapshot_before_the_first_prey():
+    game = newGame()
+    state = GameState.fromBuffer(game.snapshot())
+    assert state.prey is None
+    restored = Game.fromSnapshot(game.snapshot())
+    assert restored.preyCoordinates == tuple()
+    assert list(restored.snakeCoordinates) == list(game.snakeCoordinates)
+    restored.createNewPrey()
+    assert restored.preyCoordinates
+
+
+def test_snapshot_restores_the_config():
+    config = DEFAULT_CONFIG._replace(THRESHOLD=40, COLLISION_PROXIMITY=5, WINDOW_WIDTH=600, WINDOW_HEIGHT=400)
+    game = newGame(3, config)
+    game.createNewPrey()
+    for _ in range(5):
+        game.move()
+    restored = Game.fromSnapshot(game.snapshot())
+    assert restored.config == config
+    assert (restored.WINDOW_WIDTH, restored.WINDOW_HEIGHT) == (600, 400)
+    assert restored.snapshot() == game.snapshot()
+    other = newGame(3)
+    other.restore(game.snapshot())
+    assert other.config == config
+
+
+def test_forks_play_the_same_game():
+    game = newGame(7)
+    game.createNewPrey()
+    fork = Game.fromSnapshot(game.snapshot())
+    for _ in range(30):
+        game.move()
+        fork.move()
+    assert fork.snapshot() == game.snapshot()
+    assert fork.freeCells is not game.freeCells
+
+
+def test_a_full_board_ends_the_game():
+    game = newGame(1)
+    for cell in game.freeCells.cells: # as if the snake covered every cell the prey can be on
+        game.freeCells.occupy(cell)
+    game.createNewPrey()
+    assert game.preyCoordinates == tuple()
+    assert not game.gameNotOver
+    game.move() # nothing left to eat
+    assert GameState.fromBuffer(game.snapshot()).prey is None
+
+
+@pytest.mark.parametrize("assignment", ["THRESHOLD=160", "THRESHOLD=-1", "COLLISION_PROXIMITY=0", "SPEED=0",
+    "WINDOW_WIDTH=400", "WINDOW_HEIGHT=40000", "LENGTH=3"])
+def test_override_rejects_configs_that_cannot_be_played(assignment):
+    with pytest.raises(ValueError):
+        DEFAULT_CONFIG.override([assignment])
+
+
+def test_configs_are_checked_before_playing():
+    assert DEFAULT_CONFIG.override(["THRESHOLD=145"]).THRESHOLD == 145 # the middle row is left
+    with pytest.raises(ValueError):
+        newGame(1, GameConfig(THRESHOLD=160))
+
+
+def test_the_config_is_for_the_size_of_the_board():
+    assert Game(EventManager(), 600, 400).config == DEFAULT_CONFIG._replace(WINDOW_WIDTH=600, WINDOW_HEIGHT=400)
+    with pytest.raises(ValueError):
+        Game(EventManager(), 600, 400, config=DEFAULT_CONFIG)
+    with pytest.raises(ValueError):
+        BatchGame(10, 600, 400, config=DEFAULT_CONFIG)
+
+
+def test_batch_games_follow_their_config():
+    config = DEFAULT_CONFIG._replace(THRESHOLD=100, COLLISION_PROXIMITY=20)
+    games = BatchGame.fromConfig(50, config, seed=1)
+    assert games.COLLISION_PROXIMITY == 20
+    assert ((games.preyX >= 100) & (games.preyX <= 400) & (games.preyY >= 100) & (games.preyY <= 200)).all()
+
+
+def test_batch_games_follow_the_rules_of_game():
+    rng = random.Random(5)
+    count = 60
+    games = [newGame(seed) for seed in range(count)]
+    batch = BatchGame(count, 500, 300, seed=0)
+
+    def copyPrey(i):
+        # the two use different random generators, so the batch takes the prey of the game
+        x1, y1 = games[i].preyCoordinates[:2]
+        batch.setPrey(i, (y1 + 5 - Y_OFFSET) // STEP, (x1 + 5 - X_OFFSET) // STEP)
+
+    for i, game in enumerate(games):
+        game.createNewPrey()
+        copyPrey(i)
+    for _ in range(400):
+        actions = []
+        for game in games:
+            direction = greedyPolicy(game) if rng.random() < 0.9 else rng.choice(DIRECTIONS)
+            actions.append(-1 if direction is None or not game.gameNotOver else DIRECTIONS.index(direction))
+            if direction is not None and game.gameNotOver:
+                game.whenAnArrowKeyIsPressed(KeyPress(direction))
+        batch.step(actions)
+        for i, game in enumerate(games):
+            if game.gameNotOver:
+                game.move()
+                assert bool(batch.alive[i]) == game.gameNotOver
+                if game.gameNotOver:
+                    assert batch.snakeCoordinates(i) == list(game.snakeCoordinates)
+                    copyPrey(i)
+            assert (int(batch.score[i]), int(batch.ticks[i])) == (game.score, game.tickCount)
+    assert 0 < sum(not game.gameNotOver for game in games) < count # some games died, some are still going
+
+
+def test_a_full_board_ends_a_batch_game():
+    batch = BatchGame(2, 500, 300, seed=1)
+    batch.occupancy[0].fill(1) # as if the snake covered the whole board
+    batch.createNewPrey([0, 1])
+    assert list(batch.alive) == [False, True]
+
+
+def headingRight():
+    game = Game(EventManager(), 500, 300, seed=1, startCoordinates=[(x, 150) for x in range(215, 265, 10)])
+    game.direction = game.appliedDirection = "Right"
+    game.createNewPrey()
+    return game
+
+
+def test_two_keys_in_one_tick_make_two_moves():
+    game = headingRight()
+    game.whenAnArrowKeyIsPressed(KeyPress("Up"))
+    game.whenAnArrowKeyIsPressed(KeyPress("Left")) # not a reversal once Up is applied
+    game.move()
+    assert game.appliedDirection == "Up" and game.snakeCoordinates[-1] == (255, 140)
+    game.move()
+    assert game.appliedDirection == "Left" and game.snakeCoordinates[-1] == (245, 140)
+    assert game.gameNotOver and game.droppedInputs == 0
+
+
+def test_reversing_keys_are_ignored():
+    game = headingRight()
+    game.whenAnArrowKeyIsPressed(KeyPress("Left"))
+    game.whenAnArrowKeyIsPressed(KeyPress("Right")) # same direction
+    game.move()
+    assert game.appliedDirection == "Right" and game.snakeCoordinates[-1] == (265, 150)
+    assert game.gameNotOver and not game.inputs
+
+
+def test_keys_beyond_the_queue_are_dropped():
+    game = headingRight()
+    keys = ["Up", "Left", "Down", "Right", "Left"]
+    for key in keys:
+        game.whenAnArrowKeyIsPressed(KeyPress(key))
+    assert [key for key, pressed in game.inputs] == keys[:Game.MAX_QUEUED_KEYS]
+    assert game.droppedInputs == len(keys) - Game.MAX_QUEUED_KEYS
+    applied = []
+    for _ in range(Game.MAX_QUEUED_KEYS):
+        game.move()
+        applied.append(game.appliedDirection)
+    assert applied == keys[:Game.MAX_QUEUED_KEYS]
+    assert game.inputLatency.count == Game.MAX_QUEUED_KEYS
@@ -0,0 +1,23 @@
+from event_manager import EventManager
+from model import Game
+from profiling import Profiler
+
+
+def test_windows_do_not_take_each_others_timings():
+    game = Game(EventManager(), 500, 300, seed=1)
+    game.createNewPrey()
+    profiler = Profiler()
+    hud, exporter = profiler.window(), profiler.window()
+    profiler.attach(game)
+    for _ in range(10):
+        game.move()
+    assert hud.rollover(force=True)
+    assert hud.lastWindow["Game.move"]["count"] == 10
+    for _ in range(5):
+        game.move()
+    exporter.rollover(force=True)
+    hud.rollover(force=True)
+    assert exporter.lastWindow["Game.move"]["count"] == 15
+    assert hud.lastWindow["Game.move"]["count"] == 5
+    assert 0 < hud.lastWindow["Game.move"]["max"] <= profiler.histograms["Game.move"].max
+    profiler.detach()
@@ -0,0 +1,43 @@
+import io
+
+from autopilot import Autopilot
+from event_manager import EventManager
+from model import Game, KeyPress
+from replay import ReplayPlayer, ReplayRecorder
+
+
+def record(seed, moves, keyframeInterval=100, beforeFirstMove=None):
+    eventManager = EventManager()
+    game = Game(eventManager, 500, 300, seed)
+    file = io.BytesIO()
+    ReplayRecorder(game, eventManager, file, keyframeInterval)
+    autopilot = Autopilot(game)
+    game.start()
+    if beforeFirstMove:
+        beforeFirstMove(game)
+    for _ in range(moves):
+        if not game.gameNotOver:
+            break
+        direction = autopilot(game)
+        if direction is not None:
+            game.whenAnArrowKeyIsPressed(KeyPress(direction))
+        game.tick()
+    file.seek(0)
+    return game, file
+
+
+def test_replay_plays_the_recorded_game():
+    game, file = record(3, 450)
+    player = ReplayPlayer(file)
+    assert player.keyframeTicks == [0, 100, 200, 300, 400]
+    player.seek(450) # the recording stops while the game goes on
+    assert player.game.snapshot() == game.snapshot()
+    player.seek(250)
+    assert player.game.tickCount == 250
+
+
+def test_one_starting_keyframe():
+    # a prey placed again before the first move is done, as when the prey is eaten on move 0
+    game, file = record(5, 10, beforeFirstMove=lambda game: game.createNewPrey())
+    player = ReplayPlayer(file)
+    assert player.keyframeTicks == [0]
@@ -0,0 +1,50 @@
+from event_manager import EventManager
+from model import Game
+from server import MAX_WRITE_BUFFER, SessionWriter
+
+
+class RecordingWriter():
+    """
+        Stands in for an asyncio.StreamWriter whose client reads slowly.
+    """
+    def __init__(self, buffered=0):
+        self.lines = []
+        self.transport = self
+        self.buffered = buffered
+
+    def is_closing(self):
+        return False
+
+    def get_write_buffer_size(self):
+        return self.buffered
+
+    def write(self, data):
+        self.lines.extend(data.decode().splitlines())
+
+
+def playUntilOver(writer):
+    eventManager = EventManager()
+    game = Game(eventManager, 500, 300, seed=1)
+    session = SessionWriter(game, eventManager, writer)
+    game.createNewPrey()
+    while game.gameNotOver: # the snake runs into the left wall
+        game.tick()
+    return game, session
+
+
+def test_client_gets_every_tick():
+    writer = RecordingWriter()
+    game, session = playUntilOver(writer)
+    assert writer.lines[0] == "snake 485 0 475 0 465 0 455 0 445 0" # the snake after the first move
+    ticks = [line for line in writer.lines if line.startswith("tick")]
+    assert len(ticks) == game.tickCount
+    assert writer.lines[-1] == f"over {game.score}"
+
+
+def test_slow_client_still_gets_the_game_over():
+    writer = RecordingWriter(buffered=MAX_WRITE_BUFFER + 1)
+    game, session = playUntilOver(writer)
+    assert session.skippedTicks == game.tickCount - 1
+    assert writer.lines[0].startswith("snake ")
+    assert writer.lines[-2].startswith(f"tick {game.tickCount} ")
+    assert writer.lines[-1] == f"over {game.score}"
@@ -0,0 +1,92 @@
+import random
+
+import pytest
+
+from free_cells import FreeCellIndex, gridCells
+from snake_body import RunLengthSnakeBody, SnakeBody
+
+
+def walk(start, moves):
+    """
+        Returns the points of a snake starting at start and making the given (dx, dy) moves.
+    """
+    points = [start]
+    for dx, dy in moves:
+        x, y = points[-1]
+        points.append((x + dx, y + dy))
+    return points
+
+
+def polylineCells(points, step=10):
+    """
+        Returns the cells covered by a polyline of horizontal and vertical segments.
+    """
+    cells = [points[0]]
+    for (x1, y1), (x2, y2) in zip(points, points[1:]):
+        assert x1 == x2 or y1 == y2, f"diagonal segment {(x1, y1)} -> {(x2, y2)}"
+        dx = (x2 > x1) - (x2 < x1)
+        dy = (y2 > y1) - (y2 < y1)
+        while (x1, y1) != (x2, y2):
+            x1, y1 = x1 + dx * step, y1 + dy * step
+            cells.append((x1, y1))
+    return cells
+
+
+@pytest.mark.parametrize("bodyModel", [SnakeBody, RunLengthSnakeBody])
+def test_append_and_pop_tail(bodyModel):
+    body = bodyModel(walk((100, 100), [(-10, 0)] * 4))
+    body.append((50, 100))
+    assert body.popTail() == (100, 100)
+    assert list(body) == walk((90, 100), [(-10, 0)] * 4)
+    assert body.head() == (50, 100) and body.tail() == (90, 100)
+    assert len(body) == 5
+    assert (70, 100) in body and (100, 100) not in body
+
+
+def test_run_length_body_matches_snake_body():
+    rng = random.Random(1)
+    moves = [rng.choice([(10, 0), (0, 10), (-10, 0), (0, -10)]) for _ in range(300)]
+    points = walk((500, 500), moves)
+    full, runs = SnakeBody(), RunLengthSnakeBody()
+    for i, point in enumerate(points):
+        full.append(point)
+        runs.append(point)
+        if i % 3:
+            assert full.popTail() == runs.popTail()
+        assert list(full) == list(runs)
+        assert [runs[j] for j in range(-len(runs), len(runs))] == list(full) * 2
+        assert all(point in runs for point in full)
+
+
+def test_turn_points_jog():
+    body = RunLengthSnakeBody(walk((100, 100), [(-10, 0), (-10, 0), (0, -10), (-10, 0), (-10, 0)]))
+    assert body.turnPoints() == [(100, 100), (80, 100), (80, 90), (60, 90)]
+    assert polylineCells(body.turnPoints()) == list(body)
+
+
+def test_turn_points_cover_the_snake():
+    body = RunLengthSnakeBody(walk((100, 100), [(0, 10), (10, 0), (0, -10), (0, -10), (10, 0), (0, 10)]))
+    assert polylineCells(body.turnPoints()) == list(body)
+    body = RunLengthSnakeBody([(100, 100)])
+    assert body.turnPoints() == [(100, 100)]
+
+
+@pytest.mark.parametrize("bodyModel", [SnakeBody, RunLengthSnakeBody])
+def test_free_cells_follow_the_snake(bodyModel):
+    freeCells = FreeCellIndex(gridCells(100, 100, 5, 0, 10, 0))
+    total = freeCells.freeCount
+    body = bodyModel(walk((55, 50), [(-10, 0)] * 3), freeCells)
+    assert freeCells.freeCount == total - 4
+    body.append((15, 60))
+    body.popTail()
+    assert freeCells.freeCount == total - 4
+    assert not freeCells.isFree((15, 60)) and freeCells.isFree((55, 50))
+
+
+@pytest.mark.parametrize("bodyModel", [SnakeBody, RunLengthSnakeBody])
+def test_a_bitten_tail_stays_occupied(bodyModel):
+    freeCells = FreeCellIndex(gridCells(100, 100, 5, 0, 10, 0))
+    body = bodyModel(walk((55, 50), [(-10, 0), (0, 10), (10, 0)]), freeCells) # the head is next to the tail
+    body.append((55, 50)) # the head bites the tail, the move that ends the game
+    assert body.popTail() == (55, 50)
+    assert not freeCells.isFree((55, 50))
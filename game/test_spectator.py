@@ -0,0 +1,68 @@
+from autopilot import Autopilot
+from event_manager import EventManager
+from model import Game, KeyPress
+from spectator import SpectatorServer, SpectatorView
+
+
+def broadcast(seed, keyframeInterval=50):
+    """
+        Returns a game and the list its SpectatorServer posts its messages to.
+    """
+    eventManager = EventManager()
+    game = Game(eventManager, 500, 300, seed)
+    server = SpectatorServer(game, eventManager, keyframeInterval)
+    messages = []
+    server.post = lambda message, keyframe: messages.append(message)
+    return game, messages
+
+
+def assertViewMatches(view, game):
+    assert view.synced
+    assert (view.tickCount, view.score, view.gameNotOver) == (game.tickCount, game.score, game.gameNotOver)
+    assert list(view.snakeCoordinates) == list(game.snakeCoordinates)
+    prey = game.preyCoordinates
+    assert view.prey == ((prey[0] + 5, prey[1] + 5) if prey else None)
+
+
+def play(game, autopilot, moves):
+    for _ in range(moves):
+        if not game.gameNotOver:
+            break
+        direction = autopilot(game)
+        if direction is not None:
+            game.whenAnArrowKeyIsPressed(KeyPress(direction))
+        game.tick()
+
+
+def test_spectator_view_follows_the_game():
+    game, messages = broadcast(4)
+    view = SpectatorView()
+    autopilot = Autopilot(game)
+    game.start()
+    snapshot = None
+    for tick in range(400):
+        play(game, autopilot, 1)
+        stream = b"".join(messages)
+        messages.clear()
+        for start in range(0, len(stream), 7): # in pieces, as from a socket
+            view.feed(stream[start:start + 7])
+        assertViewMatches(view, game)
+        if tick == 150:
+            snapshot = game.snapshot()
+        if tick == 300:
+            keyframes = view.keyframes
+            game.restore(snapshot) # the deltas would not fit, a keyframe must follow
+    assert view.keyframes > keyframes
+    assert view.deltas > 300
+
+
+def test_spectators_see_the_prey_go():
+    game, messages = broadcast(1)
+    view = SpectatorView()
+    game.start()
+    game.tick()
+    game.preyCoordinates = tuple() # as when the board fills
+    game.tick()
+    view.feed(b"".join(messages))
+    assert view.prey is None
+    assertViewMatches(view, game)
@@ -0,0 +1,86 @@
+import pytest
+
+from event_manager import EventManager
+from frames import FrameReader
+from model import Game, KeyPress
+from view import FullSnakeRenderer, IncrementalSnakeRenderer
+
+
+class RecordingCanvas():
+    """
+        Stands in for a Tk canvas: keeps the coordinates of the lines.
+    """
+    def __init__(self):
+        self.items = {}
+        self.lastItem = 0
+
+    def create_line(self, start, end, **options):
+        self.lastItem += 1
+        item = self.lastItem
+        self.items[item] = (*start, *end)
+        return item
+
+    def coords(self, item, *coordinates):
+        self.items[item] = coordinates
+
+    def delete(self, item):
+        del self.items[item]
+
+    def tag_raise(self, item, below):
+        pass
+
+    def itemconfigure(self, item, **options):
+        pass
+
+
+def drawnSegments(canvas, renderer):
+    return [canvas.items[item] for item in renderer.segments]
+
+
+def segmentsOf(snake):
+    snake = list(snake)
+    return [(*start, *end) for start, end in zip(snake, snake[1:])]
+
+
+def test_incremental_renderer_finishes_the_segment_it_interpolated():
+    game = Game(EventManager(), 500, 300, seed=1)
+    game.start()
+    reader = FrameReader(game.frames)
+    canvas = RecordingCanvas()
+    renderer = IncrementalSnakeRenderer(canvas, "yellow", 15)
+    renderer.render(reader.poll())
+    for key in ("Left", "Down", "Down", "Right", "Down"):
+        game.whenAnArrowKeyIsPressed(KeyPress(key))
+        game.tick()
+        renderer.render(reader.poll())
+        renderer.interpolate(0.5)
+    game.tick()
+    renderer.render(reader.poll())
+    assert drawnSegments(canvas, renderer) == segmentsOf(game.snakeCoordinates)
+
+
+@pytest.mark.parametrize("rendererClass", [FullSnakeRenderer, IncrementalSnakeRenderer])
+def test_renderers_redraw_a_restored_snake(rendererClass):
+    other = Game(EventManager(), 500, 300, seed=2)
+    other.start()
+    other.whenAnArrowKeyIsPressed(KeyPress("Down"))
+    for _ in range(4):
+        other.tick()
+    snapshot = other.snapshot() # tick 4, heading down
+
+    game = Game(EventManager(), 500, 300, seed=1)
+    game.start()
+    reader = FrameReader(game.frames)
+    canvas = RecordingCanvas()
+    renderer = rendererClass(canvas, "yellow", 15)
+    for _ in range(3):
+        game.tick()
+        renderer.render(reader.poll())
+    game.restore(snapshot) # one tick ahead, but another snake
+    game.publishFrame()
+    renderer.render(reader.poll())
+    assert renderer.motion is None # nothing to interpolate from
+    if rendererClass is IncrementalSnakeRenderer:
+        assert drawnSegments(canvas, renderer) == segmentsOf(game.snakeCoordinates)
+    else:
+        assert canvas.items[renderer.snakeIcon] == tuple(x for point in game.snakeCoordinates for x in point)
@@ -0,0 +1,196 @@
+"""
+    Ranks bot policies by playing seeded headless games across a process
+    pool. A policy is a picklable callable taking the Game and returning
+    the direction to press before the next move ("Left", "Right", "Up",
+    "Down"), or None to keep going; it replaces whenAnArrowKeyIsPressed
+    input from the keyboard.
+
+    Usage:
+        python tournament.py tournament:greedyPolicy mybots:policy --games 1000
+"""
+
+import argparse
+import importlib
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from event_manager import EventManager
+from model import DEFAULT_CONFIG, DIRECTION_STEPS, DIRECTIONS, Game, KeyPress
+from rng import SplitMix64
+
+
+WINDOW_WIDTH = DEFAULT_CONFIG.WINDOW_WIDTH
+WINDOW_HEIGHT = DEFAULT_CONFIG.WINDOW_HEIGHT
+MAX_TICKS = 10000 # a game still running after this many moves is stopped
+
+Policy = Callable[[Game], Optional[str]]
+
+
+def greedyPolicy(game: Game) -> Optional[str]:
+    """
+        Reference policy: heads for the prey, avoiding walls and the body
+        on the next move when it can.
+    """
+    x, y = game.snakeCoordinates[-1]
+    preyX, preyY = game.preyCoordinates[0] + 5, game.preyCoordinates[1] + 5
+    best, bestDistance = None, None
+    for direction, (dx, dy) in zip(DIRECTIONS, DIRECTION_STEPS):
+        if DIRECTIONS.index(direction) ^ 1 == DIRECTIONS.index(game.appliedDirection):
+            continue
+        nx, ny = x + dx, y + dy
+        if nx < 0 or nx > game.WINDOW_WIDTH or ny < 0 or ny > game.WINDOW_HEIGHT or (nx, ny) in game.snakeCoordinates:
+            continue
+        distance = abs(nx - preyX) + abs(ny - preyY)
+        if bestDistance is None or distance < bestDistance:
+            best, bestDistance = direction, distance
+    return best
+
+
+def playGame(policy: Policy, seed: int, maxTicks: int = MAX_TICKS, WINDOW_WIDTH: int = WINDOW_WIDTH, WINDOW_HEIGHT: int = WINDOW_HEIGHT) -> Tuple[int, int, int]:
+    """
+        Plays one headless game and returns its score, final snake length
+        and the number of moves it survived.
+    """
+    game = Game(EventManager(), WINDOW_WIDTH, WINDOW_HEIGHT, seed)
+    game.createNewPrey()
+    while game.gameNotOver and game.tickCount < maxTicks:
+        direction = policy(game)
+        if direction is not None:
+            game.whenAnArrowKeyIsPressed(KeyPress(direction))
+        game.move()
+    return game.score, len(game.snakeCoordinates), game.tickCount
+
+
+class Stats():
+    """
+        Running totals of the games of one policy. Totals of separate
+        chunks of games can be merged, so workers only send these back.
+    """
+    def __init__(self) -> None:
+        self.games = 0
+        self.score = self.scoreSquared = self.maxScore = 0
+        self.length = 0
+        self.ticks = self.ticksSquared = 0
+
+    def add(self, score: int, length: int, ticks: int) -> None:
+        self.games += 1
+        self.score += score
+        self.scoreSquared += score * score
+        self.maxScore = max(self.maxScore, score)
+        self.length += length
+        self.ticks += ticks
+        self.ticksSquared += ticks * ticks
+
+    def merge(self, other: "Stats") -> None:
+        self.games += other.games
+        self.score += other.score
+        self.scoreSquared += other.scoreSquared
+        self.maxScore = max(self.maxScore, other.maxScore)
+        self.length += other.length
+        self.ticks += other.ticks
+        self.ticksSquared += other.ticksSquared
+
+    def summary(self) -> Dict[str, float]:
+        n = self.games or 1
+        meanScore, meanTicks = self.score / n, self.ticks / n
+        return {
+            "games": self.games,
+            "meanScore": meanScore,
+            "scoreStdev": math.sqrt(max(0.0, self.scoreSquared / n - meanScore ** 2)),
+            "maxScore": self.maxScore,
+            "meanLength": self.length / n,
+            "meanSurvivalTicks": meanTicks,
+            "survivalStdev": math.sqrt(max(0.0, self.ticksSquared / n - meanTicks ** 2))}
+
+
+workerPolicies: Sequence[Policy] = ()
+
+
+def initWorker(policies: Sequence[Policy]) -> None:
+    """
+        Sends the policies to a worker process once, instead of with every chunk.
+    """
+    global workerPolicies
+    workerPolicies = policies
+
+
+def playChunk(policyIndex: int, seeds: Sequence[int], maxTicks: int) -> Tuple[int, Stats]:
+    """
+        Work unit run in a worker process: plays the games of one policy
+        for a chunk of seeds and returns only their totals.
+    """
+    stats = Stats()
+    policy = workerPolicies[policyIndex]
+    for seed in seeds:
+        stats.add(*playGame(policy, seed, maxTicks))
+    return policyIndex, stats
+
+
+def gameSeeds(masterSeed: int, games: int) -> List[int]:
+    """
+        Derives the seed of every game from the master seed. All policies
+        play the same seeds, so they are compared on the same prey.
+    """
+    rng = SplitMix64(masterSeed)
+    return [rng.next() >> 1 for _ in range(games)]
+
+
+def runTournament(
+    policies: Sequence[Policy],
+    games: int,
+    masterSeed: int = 0,
+    workers: int = None,
+    chunkSize: int = None,
+    maxTicks: int = MAX_TICKS) -> List[Dict[str, float]]:
+    """
+        Plays games seeded games with every policy on a pool of worker
+        processes and returns the summary of each policy, best first.
+    """
+    workers = workers or os.cpu_count() or 1
+    seeds = gameSeeds(masterSeed, games)
+    chunkSize = chunkSize or max(1, math.ceil(games * len(policies) / (workers * 8)))
+    stats = [Stats() for _ in policies]
+    with ProcessPoolExecutor(workers, initializer=initWorker, initargs=(tuple(policies),)) as pool:
+        futures = [pool.submit(playChunk, i, seeds[start:start + chunkSize], maxTicks)
+            for i in range(len(policies)) for start in range(0, games, chunkSize)]
+        for future in futures:
+            policyIndex, chunkStats = future.result()
+            stats[policyIndex].merge(chunkStats)
+
+    summaries = []
+    for policy, policyStats in zip(policies, stats):
+        summary = policyStats.summary()
+        summary["policy"] = getattr(policy, "__qualname__", repr(policy))
+        summaries.append(summary)
+    summaries.sort(key=lambda summary: (summary["meanScore"], summary["meanSurvivalTicks"]), reverse=True)
+    return summaries
+
+
+def loadPolicy(name: str) -> Policy:
+    """
+        Imports a policy given as "module:attribute".
+    """
+    moduleName, attribute = name.split(":")
+    return getattr(importlib.import_module(moduleName), attribute)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rank bot policies over seeded games")
+    parser.add_argument("policies", nargs="+", metavar="MODULE:POLICY")
+    parser.add_argument("--games", type=int, default=1000, help="games per policy")
+    parser.add_argument("--seed", type=int, default=0, help="master seed")
+    parser.add_argument("--workers", type=int, help="worker processes (default: one per core)")
+    parser.add_argument("--chunk-size", type=int, help="games per work unit")
+    parser.add_argument("--max-ticks", type=int, default=MAX_TICKS)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    results = runTournament([loadPolicy(name) for name in args.policies], args.games, args.seed, args.workers, args.chunk_size, args.max_ticks)
+    elapsed = time.perf_counter() - start
+    for rank, result in enumerate(results, 1):
+        print(f"{rank:3}. {result['policy']:30} score {result['meanScore']:7.2f} ± {result['scoreStdev']:6.2f} (max {result['maxScore']})"
+            f"  length {result['meanLength']:7.1f}  survived {result['meanSurvivalTicks']:8.1f} ticks")
+    print(f"{args.games * len(results)} games in {elapsed:.1f}s")
@@ -1,7 +1,179 @@
+import threading
+import time
+from collections import deque
 from tkinter import Tk, Canvas, Button
+from typing import Callable
 
+from dispatch_bridge import TkDispatchBridge
 from event_manager import *
+from frames import Frame, FrameReader
 from model import Game
+from renderers import Renderer
+from scheduler import FixedTimestepScheduler
+
+
+def lerp(start: tuple, end: tuple, alpha: float) -> tuple:
+    return (start[0] + (end[0] - start[0]) * alpha, start[1] + (end[1] - start[1]) * alpha)
+
+
+def lastMove(snake, tickCount: int, lastTick: int, lastTail: tuple, lastLength: int, sameBody: bool = True):
+    """
+        Returns (tail, head) of the snake before its last move, or None if
+        the snake did not make exactly one move since it was last drawn,
+        or was replaced (sameBody is False, see Frame.epoch).
+    """
+    if not sameBody or lastTick is None or tickCount != lastTick + 1 or len(snake) < 2:
+        return None
+    tail = lastTail if len(snake) == lastLength else snake[0] # the tail stays put when the prey is eaten
+    return (tail, snake[-2])
+
+
+class FullSnakeRenderer():
+    """
+        Draws the snake as a single line through all of its coordinates,
+        redrawing the whole line on every tick. A RunLengthSnakeBody only
+        passes its turn points.
+    """
+    def __init__(self, canvas: Canvas, ICON_COLOUR: str, SNAKE_ICON_WIDTH: int):
+        self.canvas = canvas
+        self.snakeIcon = canvas.create_line((0, 0), (0, 0), fill=ICON_COLOUR, width=SNAKE_ICON_WIDTH)
+        self.points = [] # the points drawn by the last render()
+        self.motion = None # (tail before the move, head before the move) of the last move
+        self.lastTick = None
+        self.lastTail = None
+        self.lastLength = 0
+        self.lastEpoch = None
+
+    def render(self, frame: Frame):
+        snake = frame.snakeCoordinates
+        turnPoints = getattr(snake, "turnPoints", None)
+        self.points = list(turnPoints() if turnPoints else snake)
+        self.canvas.coords(self.snakeIcon, *[x for point in self.points for x in point])
+        self.motion = lastMove(snake, frame.tickCount, self.lastTick, self.lastTail, self.lastLength, frame.epoch == self.lastEpoch)
+        self.lastTick, self.lastTail, self.lastLength, self.lastEpoch = frame.tickCount, snake[0], len(snake), frame.epoch
+
+    def interpolate(self, alpha: float):
+        """
+            Draws the snake alpha of the way through its last move,
+            from the state before it (0.0) to the current one (1.0).
+        """
+        if self.motion is None or len(self.points) < 2:
+            return
+        tail, head = self.motion
+        points = list(self.points)
+        points[-1] = lerp(head, points[-1], alpha)
+        if tail != points[0]:
+            points.insert(0, lerp(tail, points[0], alpha))
+        self.canvas.coords(self.snakeIcon, *[x for point in points for x in point])
+
+
+class IncrementalSnakeRenderer():
+    """
+        Draws the snake as one canvas line per segment. On every tick only
+        the segments of the new head are created and the segments that
+        left the tail are deleted, so the cost of a frame does not grow
+        with the length of the snake.
+    """
+    def __init__(self, canvas: Canvas, ICON_COLOUR: str, SNAKE_ICON_WIDTH: int):
+        self.canvas = canvas
+        self.ICON_COLOUR = ICON_COLOUR
+        self.SNAKE_ICON_WIDTH = SNAKE_ICON_WIDTH
+        self.segments = deque() # canvas items, from tail to head
+        self.lastTick = None    # frame.tickCount when the snake was last drawn
+        self.lastTail = None
+        self.lastLength = 0
+        self.lastEpoch = None   # frame.epoch when the snake was last drawn, it changes when the snake is replaced
+        self.motion = None      # (tail before the move, head before the move) of the last move
+        self.interpolated = None # (item, start, end) of the head segment interpolate() shortened
+        #invisible item marking where the snake sits in the stacking order
+        self.anchor = canvas.create_line((0, 0), (0, 0), state="hidden")
+        #segment of the cell the tail is leaving, drawn while interpolating
+        self.tailSegment = self.createSegment((0, 0), (0, 0))
+        canvas.itemconfigure(self.tailSegment, state="hidden")
+
+    def createSegment(self, start: tuple, end: tuple) -> int:
+        item = self.canvas.create_line(start, end, fill=self.ICON_COLOUR, width=self.SNAKE_ICON_WIDTH, capstyle="round")
+        self.canvas.tag_raise(item, self.anchor) # keep the segment below the prey and the score
+        return item
+
+    def rebuild(self, frame: Frame):
+        """
+            Redraws every segment of the snake.
+        """
+        while self.segments:
+            self.canvas.delete(self.segments.popleft())
+        points = list(frame.snakeCoordinates)
+        for start, end in zip(points, points[1:]):
+            self.segments.append(self.createSegment(start, end))
+
+    def finalize(self):
+        """
+            Gives the head segment shortened by interpolate() back its full
+            length, before the segments of the new heads are added after it.
+        """
+        if self.interpolated is not None:
+            item, start, end = self.interpolated
+            self.canvas.coords(item, *start, *end)
+            self.interpolated = None
+
+    def render(self, frame: Frame):
+        snake = frame.snakeCoordinates
+        self.finalize()
+        newMoves = None if self.lastTick is None or frame.epoch != self.lastEpoch else frame.tickCount - self.lastTick
+        if newMoves is None or newMoves < 0 or newMoves >= len(snake):
+            self.rebuild(frame)
+        else:
+            for i in range(newMoves, 0, -1): # add the segments of the new heads
+                self.segments.append(self.createSegment(snake[-i - 1], snake[-i]))
+            while len(self.segments) > len(snake) - 1: # remove the segments past the tail
+                self.canvas.delete(self.segments.popleft())
+        self.motion = lastMove(snake, frame.tickCount, self.lastTick, self.lastTail, self.lastLength, frame.epoch == self.lastEpoch)
+        self.head = snake[-1]
+        self.tail = snake[0]
+        self.lastTick, self.lastTail, self.lastLength, self.lastEpoch = frame.tickCount, snake[0], len(snake), frame.epoch
+
+    def interpolate(self, alpha: float):
+        """
+            Draws the snake alpha of the way through its last move, from the
+            state before it (0.0) to the current one (1.0). Only the head
+            segment and the segment the tail is leaving are moved.
+        """
+        if self.motion is None or not self.segments:
+            self.canvas.itemconfigure(self.tailSegment, state="hidden")
+            return
+        tail, head = self.motion
+        self.interpolated = (self.segments[-1], head, self.head)
+        self.canvas.coords(self.segments[-1], *head, *lerp(head, self.head, alpha))
+        if tail != self.tail and alpha < 1:
+            self.canvas.coords(self.tailSegment, *lerp(tail, self.tail, alpha), *self.tail)
+            self.canvas.itemconfigure(self.tailSegment, state="normal")
+        else:
+            self.canvas.itemconfigure(self.tailSegment, state="hidden")
+
+
+class PerformanceHud():
+    """
+        Shows the profiler's last window in a corner of the canvas:
+        tick rate, time to draw a frame, time to dispatch an event
+        and the snake length.
+    """
+    REFRESH_INTERVAL = 500 # ms
+
+    def __init__(self, gui: "Gui", profiler) -> None:
+        self.gui = gui
+        self.window = profiler.window()
+        self.text = gui.canvas.create_text(5, gui.WINDOW_HEIGHT - 5, anchor="sw", fill="white", font=("Courier", "9"))
+        self.refresh()
+
+    def refresh(self) -> None:
+        window = self.window
+        window.rollover()
+        frame = window.lastWindow.get("Gui.notify[TickEvent]", {}).get("mean", 0.0)
+        dispatch = window.lastWindow.get("EventManager.Post", {}).get("mean", 0.0)
+        self.gui.canvas.itemconfigure(self.text, text=
+            f"{window.rate('Game.move'):5.1f} ticks/s  frame {frame * 1000:.2f} ms  "
+            f"dispatch {dispatch * 1000:.3f} ms  length {len(self.gui.frameReader.frame.snakeCoordinates)}")
+        self.gui.root.after(self.REFRESH_INTERVAL, self.refresh)
 
 
 class Gui():
@@ -17,16 +189,42 @@ class Gui():
         WINDOW_HEIGHT: int, 
         BACKGROUND_COLOUR: str, 
         ICON_COLOUR: str, 
-        SNAKE_ICON_WIDTH: int):
+        SNAKE_ICON_WIDTH: int,
+        renderMode: str = "incremental",
+        bindKeys: bool = True,
+        frameRate: float = 60):
         """        
             The initializer instantiates the main window and 
             creates the starting icons for the snake and the prey,
             and displays the initial gamer score.
+            renderMode selects how the snake is drawn: "incremental"
+            updates only the head and tail every tick, "full" redraws it.
+            Set bindKeys to False when something else steers the snake.
+            frameRate is how many frames per second are drawn between the
+            ticks, moving the head and tail smoothly from one cell to the
+            next; with 0 the snake is only redrawn when it moves.
         """
         self.eventManager = eventManager
-        eventManager.RegisterListener(self)
-
         self.game = game
+        self.WINDOW_HEIGHT = WINDOW_HEIGHT
+        self.hud = None
+        self.frameInterval = 1 / frameRate if frameRate else None # seconds
+        self.nextFrame = None       # perf_counter time the next frame is due
+        self.lastTickTime = None    # when the last tick was drawn
+        self.lastTickCount = None
+        self.tickInterval = None    # measured time between two moves
+        self.frames = 0
+        self.skippedFrames = 0
+        #the game is drawn from the frames it publishes, never from its attributes that the game thread is changing
+        self.frameReader = FrameReader(game.frames)
+        self.drawnPrey = None
+        self.drawnScore = 0
+        #handler of each event class, used by notify()
+        self.eventHandlers = {
+            TickEvent: self.onTick,
+            CreateNewPreyEvent: self.onCreateNewPrey,
+            GameOverEvent: self.onGameOver,
+            UpdateScoreEvent: self.onUpdateScore}
 
         #some GUI constants
         scoreTextXLocation = 60
@@ -34,16 +232,24 @@ class Gui():
         textColour = "white"
         #instantiate and create gui
         self.root = Tk()
+        #events are posted on the game thread, the bridge hands them to notify() on the Tk thread
+        self.bridge = TkDispatchBridge(self.root, self.notify)
+        eventManager.RegisterListener(self.bridge)
         self.canvas = Canvas(self.root, width = WINDOW_WIDTH, height = WINDOW_HEIGHT, bg = BACKGROUND_COLOUR)
         self.canvas.pack()
         #create starting game icons for snake and the prey
-        self.snakeIcon = self.canvas.create_line((0, 0), (0, 0), fill=ICON_COLOUR, width=SNAKE_ICON_WIDTH)
+        renderers = {"full": FullSnakeRenderer, "incremental": IncrementalSnakeRenderer}
+        self.snakeRenderer = renderers[renderMode](self.canvas, ICON_COLOUR, SNAKE_ICON_WIDTH)
         self.preyIcon = self.canvas.create_rectangle(0, 0, 0, 0, fill=ICON_COLOUR, outline=ICON_COLOUR)
         #display starting score of 0
         self.score = self.canvas.create_text(scoreTextXLocation, scoreTextYLocation, fill=textColour, text='Your Score: 0', font=("Helvetica","11","bold"))
         #binding the arrow keys to be able to control the snake
-        for key in ("Left", "Right", "Up", "Down"):
-            self.root.bind(f"<Key-{key}>", self.game.whenAnArrowKeyIsPressed)
+        if bindKeys:
+            for key in ("Left", "Right", "Up", "Down"):
+                self.root.bind(f"<Key-{key}>", self.game.whenAnArrowKeyIsPressed)
+        if self.frameInterval:
+            self.nextFrame = time.perf_counter()
+            self.root.after(0, self.drawFrame)
 
     def gameOver(self):
         """
@@ -55,16 +261,114 @@ class Gui():
             command=self.root.destroy)
         self.canvas.create_window(200, 100, anchor="nw", window=gameOverButton)
 
+    def showPerformanceHud(self, profiler) -> None:
+        """
+            Displays the timings of an attached profiling.Profiler.
+        """
+        self.hud = PerformanceHud(self, profiler)
+
     def notify(self, event: Event):
         """
         The event manager will send all recieved events here. 
         """
-        if isinstance(event, TickEvent):
-            points = [x for point in self.game.snakeCoordinates for x in point]
-            self.canvas.coords(self.snakeIcon, *points)    
-        elif isinstance(event, CreateNewPreyEvent):
-            self.canvas.coords(self.preyIcon, *self.game.preyCoordinates)   
-        elif isinstance(event, GameOverEvent):
-            self.gameOver()
-        elif isinstance(event, UpdateScoreEvent):
-            self.canvas.itemconfigure(self.score, text=f"Your Score: {self.game.score}")         
\ No newline at end of file
+        handler = self.eventHandlers.get(event.__class__)
+        if handler is not None:
+            handler(event)
+
+    def drawFrame(self):
+        """
+            Draws the snake part of the way between the last two ticks,
+            frameRate times per second. Runs on the Tk thread and never
+            touches the game: the renderer interpolates between the states
+            it saw on the last two ticks. Frames that fell due while Tk was
+            busy are skipped rather than drawn late. A tick waiting in the
+            bridge is drawn first, so the frame starts from it.
+        """
+        now = time.perf_counter()
+        late = now - self.nextFrame
+        if late >= self.frameInterval: # Tk was busy, drop the frames we missed
+            missed = int(late / self.frameInterval)
+            self.skippedFrames += missed
+            self.nextFrame += missed * self.frameInterval
+        self.nextFrame += self.frameInterval
+        if self.bridge.queueDepth:
+            self.bridge.drain()
+        if self.lastTickTime is not None and self.tickInterval:
+            self.snakeRenderer.interpolate(min(1.0, (now - self.lastTickTime) / self.tickInterval))
+            self.frames += 1
+        self.root.after(max(0, round((self.nextFrame - time.perf_counter()) * 1000)), self.drawFrame)
+
+    def refresh(self):
+        """
+            Draws the newest frame published by the game, if it was not
+            drawn yet.
+        """
+        frame = self.frameReader.poll()
+        if frame is None:
+            return
+        self.snakeRenderer.render(frame)
+        if frame.preyCoordinates != self.drawnPrey:
+            self.drawnPrey = frame.preyCoordinates
+            if frame.preyCoordinates:
+                self.canvas.coords(self.preyIcon, *frame.preyCoordinates)
+                self.canvas.itemconfigure(self.preyIcon, state="normal")
+            else: # the board is full
+                self.canvas.itemconfigure(self.preyIcon, state="hidden")
+        if frame.score != self.drawnScore:
+            self.drawnScore = frame.score
+            self.canvas.itemconfigure(self.score, text=f"Your Score: {frame.score}")
+        if self.frameInterval:
+            now, tickCount = time.perf_counter(), frame.tickCount
+            if self.lastTickTime is not None and tickCount > self.lastTickCount:
+                interval = (now - self.lastTickTime) / (tickCount - self.lastTickCount)
+                self.tickInterval = interval if self.tickInterval is None else 0.8 * self.tickInterval + 0.2 * interval
+            self.lastTickTime, self.lastTickCount = now, tickCount
+            if self.tickInterval:
+                self.snakeRenderer.interpolate(0.0) # start from where the last frame left the snake
+
+    def onTick(self, event: TickEvent):
+        self.refresh()
+
+    def onCreateNewPrey(self, event: CreateNewPreyEvent):
+        self.refresh()
+
+    def onGameOver(self, event: GameOverEvent):
+        self.refresh()
+        self.gameOver()
+
+    def onUpdateScore(self, event: UpdateScoreEvent):
+        self.refresh()
+
+
+class TkRenderer(Renderer):
+    """
+        Renderer backend showing the game in a Tk window. The game runs on
+        a daemon thread while Tk's main loop runs in the calling thread.
+        If a profiling.Profiler is given, the Gui is timed too and its
+        timings are shown on the canvas.
+    """
+    def __init__(
+        self,
+        game: Game,
+        eventManager: EventManager,
+        BACKGROUND_COLOUR: str = "green",
+        ICON_COLOUR: str = "yellow",
+        SNAKE_ICON_WIDTH: int = 15,
+        renderMode: str = "incremental",
+        bindKeys: bool = True,
+        frameRate: float = 60,
+        profiler = None,
+        **options) -> None:
+        super().__init__(game, eventManager)
+        self.gui = Gui(game, eventManager, game.WINDOW_WIDTH, game.WINDOW_HEIGHT, BACKGROUND_COLOUR, ICON_COLOUR, SNAKE_ICON_WIDTH,
+            renderMode=renderMode, bindKeys=bindKeys, frameRate=frameRate)
+        if profiler:
+            profiler.attach(gui = self.gui)
+            self.gui.showPerformanceHud(profiler)
+
+    def run(self, run: Callable[[FixedTimestepScheduler], None], scheduler: FixedTimestepScheduler) -> None:
+        threading.Thread(target = run, args = (scheduler,), daemon=True).start()
+        self.gui.root.mainloop()
+
+    def summary(self) -> str:
+        return f"Frames drawn: {self.gui.frames}, skipped: {self.gui.skippedFrames}"